@@ -0,0 +1,38 @@
+"""Motor de cálculo da calculadora de produtividade de baunilha.
+
+Pode ser importado sem o Streamlit; pandas e openpyxl só são carregados
+pelas funções que devolvem DataFrames ou planilhas.
+"""
+
+from .cache import CacheLRU
+from .coortes import (
+    calcular_curva_receita_por_muda,
+    calcular_faturamento_anual_coortes,
+    calcular_faturamento_total_coortes,
+)
+from .exportacao import (
+    exportar_em_partes,
+    exportar_resultados,
+    gerar_excel,
+    gerar_excel_plano,
+)
+from .modelo import (
+    CUSTO_POR_MUDA,
+    MARGEM_LUCRO,
+    MARGEM_LUCRO_PLANO,
+    PRECO_EXTRATO_POR_TONELADA,
+    calcular_area_necessaria,
+    calcular_cumulativo,
+    calcular_produtividade_baunilha,
+    calcular_produtividade_baunilha_vetorizado,
+    obter_cache_curvas,
+    obter_curvas_por_muda,
+    parametros_modelo,
+)
+from .plano import calcular_plano_acao
+from .solver import (
+    resolver_anos_necessarios,
+    resolver_mudas_minimas,
+    resolver_plano,
+    resolver_taxa_crescimento,
+)
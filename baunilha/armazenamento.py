@@ -0,0 +1,236 @@
+"""Armazenamento persistente de resultados em SQLite, endereçado por conteúdo.
+
+A chave de cada resultado é o SHA-256 das entradas da função e de todos os
+parâmetros do modelo (`parametros_modelo`), então qualquer mudança de
+constante invalida os resultados antigos sem precisar apagar o arquivo. Os
+valores (dicionários, DataFrames, bytes do Excel) são gravados com pickle.
+
+O banco usa WAL e um tempo de espera para travas, o que permite vários
+processos do app lendo e gravando o mesmo arquivo. Uma leitura é só um
+SELECT: acertos, falhas e a hora do último acesso ficam em memória e vão para
+o banco de uma vez, numa única transação, a cada `intervalo_descarga`
+segundos (e nas gravações, em `estatisticas` e em `fechar`). Assim leitores
+concorrentes não disputam a trava de escrita do SQLite.
+
+O total de bytes é mantido na tabela `estatisticas`, atualizado a cada
+gravação; quando passa de `tamanho_maximo_bytes`, os itens acessados há mais
+tempo são descartados. Os contadores somam todos os processos.
+"""
+
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+
+from .modelo import parametros_modelo
+
+VERSAO_FORMATO = 1
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS resultados (
+    chave TEXT PRIMARY KEY,
+    tipo TEXT NOT NULL,
+    valor BLOB NOT NULL,
+    tamanho INTEGER NOT NULL,
+    criado REAL NOT NULL,
+    acessado REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS resultados_acessado ON resultados (acessado);
+CREATE TABLE IF NOT EXISTS estatisticas (
+    nome TEXT PRIMARY KEY,
+    valor INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO estatisticas VALUES ('acertos', 0), ('falhas', 0);
+INSERT OR IGNORE INTO estatisticas
+    SELECT 'bytes', COALESCE(SUM(tamanho), 0) FROM resultados;
+"""
+
+
+def calcular_chave(tipo, entradas):
+    """Hash das entradas, dos parâmetros do modelo e da versão do formato."""
+    conteudo = json.dumps(
+        {
+            "tipo": tipo,
+            "entradas": entradas,
+            "modelo": parametros_modelo(),
+            "versao": VERSAO_FORMATO,
+        },
+        sort_keys=True,
+        default=float,
+    )
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+class ArmazenamentoResultados:
+    """Resultados em um arquivo SQLite; use `fechar()` ou `with` ao terminar."""
+
+    def __init__(
+        self, caminho, tamanho_maximo_bytes=256 * 1024 * 1024, intervalo_descarga=5.0
+    ):
+        self.caminho = caminho
+        self.tamanho_maximo_bytes = tamanho_maximo_bytes
+        self.intervalo_descarga = intervalo_descarga
+        self._local = threading.local()
+        self._conexoes = []
+        self._trava = threading.Lock()
+        # Pendentes de descarga: contadores e última leitura de cada chave
+        self._contagens = {"acertos": 0, "falhas": 0}
+        self._acessos = {}
+        self._descarregado = time.monotonic()
+        conexao = self._conexao()
+        with conexao:
+            conexao.executescript(_ESQUEMA)
+
+    def _conexao(self):
+        # sqlite3 não compartilha conexões entre threads: uma por thread. As
+        # conexões ficam registradas para que `fechar` possa encerrá-las.
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=30, check_same_thread=False)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexao = conexao
+            with self._trava:
+                self._conexoes.append(conexao)
+        return conexao
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def fechar(self):
+        """Grava os contadores pendentes e fecha as conexões de todas as threads."""
+        self.descarregar()
+        with self._trava:
+            conexoes, self._conexoes = self._conexoes, []
+        for conexao in conexoes:
+            conexao.close()
+        self._local = threading.local()
+
+    def _pendentes(self):
+        with self._trava:
+            contagens, acessos = self._contagens, self._acessos
+            self._contagens = {"acertos": 0, "falhas": 0}
+            self._acessos = {}
+            self._descarregado = time.monotonic()
+        return contagens, acessos
+
+    def _gravar_pendentes(self, conexao, contagens, acessos):
+        conexao.executemany(
+            "UPDATE estatisticas SET valor = valor + ? WHERE nome = ?",
+            [(valor, nome) for nome, valor in contagens.items() if valor],
+        )
+        conexao.executemany(
+            "UPDATE resultados SET acessado = MAX(acessado, ?) WHERE chave = ?",
+            [(acessado, chave) for chave, acessado in acessos.items()],
+        )
+
+    def descarregar(self):
+        """Grava no banco os contadores e acessos acumulados em memória."""
+        contagens, acessos = self._pendentes()
+        if not acessos and not any(contagens.values()):
+            return
+        conexao = self._conexao()
+        with conexao:
+            self._gravar_pendentes(conexao, contagens, acessos)
+
+    def _registrar(self, nome, chave=None):
+        with self._trava:
+            self._contagens[nome] += 1
+            if chave is not None:
+                self._acessos[chave] = time.time()
+            vencido = time.monotonic() - self._descarregado >= self.intervalo_descarga
+        if vencido:
+            self.descarregar()
+
+    def ler(self, chave):
+        """Valor armazenado em `chave`, ou None se não existir."""
+        linha = (
+            self._conexao()
+            .execute("SELECT valor FROM resultados WHERE chave = ?", (chave,))
+            .fetchone()
+        )
+        if linha is None:
+            self._registrar("falhas")
+            return None
+        self._registrar("acertos", chave)
+        return pickle.loads(linha[0])
+
+    def gravar(self, chave, tipo, valor):
+        dados = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        agora = time.time()
+        contagens, acessos = self._pendentes()
+        conexao = self._conexao()
+        with conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            # A gravação já tem a trava de escrita: leva junto os pendentes
+            self._gravar_pendentes(conexao, contagens, acessos)
+            anterior = conexao.execute(
+                "SELECT tamanho FROM resultados WHERE chave = ?", (chave,)
+            ).fetchone()
+            conexao.execute(
+                "INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?, ?, ?)",
+                (chave, tipo, dados, len(dados), agora, agora),
+            )
+            self._somar_bytes(conexao, len(dados) - (anterior[0] if anterior else 0))
+            self._descartar(conexao)
+
+    def _somar_bytes(self, conexao, diferenca):
+        conexao.execute(
+            "UPDATE estatisticas SET valor = valor + ? WHERE nome = 'bytes'",
+            (diferenca,),
+        )
+
+    def _descartar(self, conexao):
+        (total,) = conexao.execute(
+            "SELECT valor FROM estatisticas WHERE nome = 'bytes'"
+        ).fetchone()
+        if total <= self.tamanho_maximo_bytes:
+            return
+        excesso = total - self.tamanho_maximo_bytes
+        removidos = 0
+        chaves = []
+        for chave, tamanho in conexao.execute(
+            "SELECT chave, tamanho FROM resultados ORDER BY acessado"
+        ):
+            if removidos >= excesso:
+                break
+            chaves.append((chave,))
+            removidos += tamanho
+        conexao.executemany("DELETE FROM resultados WHERE chave = ?", chaves)
+        self._somar_bytes(conexao, -removidos)
+
+    def obter(self, tipo, entradas, calcular):
+        """Resultado armazenado para (`tipo`, `entradas`), calculando se faltar."""
+        chave = calcular_chave(tipo, entradas)
+        valor = self.ler(chave)
+        if valor is None:
+            valor = calcular()
+            self.gravar(chave, tipo, valor)
+        return valor
+
+    def estatisticas(self):
+        self.descarregar()
+        conexao = self._conexao()
+        contagens = dict(conexao.execute("SELECT nome, valor FROM estatisticas"))
+        (itens,) = conexao.execute("SELECT COUNT(*) FROM resultados").fetchone()
+        consultas = contagens["acertos"] + contagens["falhas"]
+        return {
+            "acertos": contagens["acertos"],
+            "falhas": contagens["falhas"],
+            "taxa_acerto": contagens["acertos"] / consultas if consultas else 0.0,
+            "itens": itens,
+            "bytes": contagens["bytes"],
+            "tamanho_maximo_bytes": self.tamanho_maximo_bytes,
+        }
+
+    def limpar(self):
+        self._pendentes()
+        conexao = self._conexao()
+        with conexao:
+            conexao.execute("DELETE FROM resultados")
+            conexao.execute("UPDATE estatisticas SET valor = 0")
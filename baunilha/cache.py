@@ -0,0 +1,51 @@
+"""Cache em memória com descarte LRU usado pelo motor de cálculo."""
+
+import threading
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """Cache limitado com descarte do item menos usado recentemente (LRU).
+
+    Seguro para uso entre threads (cada sessão do Streamlit roda em uma) e
+    conta acertos e falhas para acompanhamento.
+    """
+
+    def __init__(self, tamanho_maximo=128):
+        self.tamanho_maximo = tamanho_maximo
+        self.acertos = 0
+        self.falhas = 0
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+
+    def obter(self, chave, calcular):
+        with self._trava:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return self._itens[chave]
+            self.falhas += 1
+
+        valor = calcular()
+
+        with self._trava:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_maximo:
+                self._itens.popitem(last=False)
+        return valor
+
+    def limpar(self):
+        with self._trava:
+            self._itens.clear()
+            self.acertos = 0
+            self.falhas = 0
+
+    def info(self):
+        with self._trava:
+            return {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "tamanho": len(self._itens),
+                "tamanho_maximo": self.tamanho_maximo,
+            }
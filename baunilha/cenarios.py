@@ -0,0 +1,70 @@
+"""Projeção, plano de ação e cenários em tipos simples (dicionários e listas).
+
+Usados pela linha de comando (`baunilha.cli`) e pelo serviço HTTP
+(`baunilha.servico`); um cenário é um dicionário com `num_mudas`, `anos`,
+`sistema`, `usar_modelo_linear` e, opcionalmente, `faturamento_objetivo` e
+`taxa_crescimento_maxima`.
+"""
+
+from .modelo import calcular_area_necessaria, calcular_cumulativo
+
+SISTEMAS = ("SAF", "Semi-intensivo")
+
+
+def executar_projecao(
+    num_mudas, anos, sistema="SAF", usar_modelo_linear=False, cultura=None
+):
+    resultados_cumulativos, resultados_anuais = calcular_cumulativo(
+        num_mudas, anos, usar_modelo_linear, cultura
+    )
+    return {
+        "area_necessaria": calcular_area_necessaria(num_mudas, sistema, cultura),
+        "cumulativos": resultados_cumulativos,
+        "anuais": {
+            coluna: valores.tolist() for coluna, valores in resultados_anuais.items()
+        },
+    }
+
+
+def executar_plano(
+    num_mudas,
+    faturamento_objetivo,
+    anos,
+    taxa_crescimento_maxima=1.5,
+    cultura=None,
+    tabela_viabilidade=None,
+):
+    from .plano import calcular_plano_acao
+
+    plano_acao, resultados_detalhados, taxa_crescimento, info = calcular_plano_acao(
+        num_mudas,
+        faturamento_objetivo,
+        anos,
+        taxa_crescimento_maxima,
+        cultura=cultura,
+        tabela_viabilidade=tabela_viabilidade,
+    )
+    resultado = {"taxa_crescimento": taxa_crescimento, "info": info}
+    if plano_acao is not None:
+        resultado["plano"] = plano_acao.to_dict("list")
+        resultado["detalhado"] = resultados_detalhados.to_dict("list")
+    return resultado
+
+
+def executar_cenario(cenario, cultura=None):
+    resultado = executar_projecao(
+        cenario["num_mudas"],
+        cenario["anos"],
+        cenario.get("sistema", "SAF"),
+        cenario.get("usar_modelo_linear", False),
+        cultura,
+    )
+    if cenario.get("faturamento_objetivo") is not None:
+        resultado["plano_acao"] = executar_plano(
+            cenario["num_mudas"],
+            cenario["faturamento_objetivo"],
+            cenario["anos"],
+            cenario.get("taxa_crescimento_maxima", 1.5),
+            cultura,
+        )
+    return {"cenario": cenario, **resultado}
@@ -0,0 +1,393 @@
+"""Linha de comando para rodar projeções e planos sem a interface Streamlit.
+
+Exemplos:
+
+    python -m baunilha projecao --mudas 4000 --anos 6 --linear
+    python -m baunilha plano --mudas 4000 --objetivo 10000 --anos 6
+    python -m baunilha cenarios cenarios.json --saida resultados.json
+    python -m baunilha lote fazendas.csv resultados.csv --processos 8
+    python -m baunilha sensibilidade --mudas 4000 --anos 6 --variacao 0.1
+    python -m baunilha superficie superficie.npz --mudas-max 100000 --anos-max 15
+    python -m baunilha portfolio talhoes.csv --anos 20
+    python -m baunilha servico --porta 8000 --processos 4
+    python -m baunilha otimizar --objetivo 1e6 --anos 10 --mudas-max-ano 2000
+    python -m baunilha viabilidade viabilidade.npy --anos-max 50 --processos 4
+    python -m baunilha financeiro --mudas 4000 --anos 15 --taxas 0.08 0.12
+    python -m baunilha --cultura cacau.toml projecao --mudas 4000 --anos 6
+
+O arquivo de cenários é uma lista JSON de objetos com as chaves `num_mudas`,
+`anos`, `sistema`, `usar_modelo_linear` e, opcionalmente,
+`faturamento_objetivo` (que inclui o plano de ação no resultado). Para
+tabelas grandes use `lote`, que lê CSV/Parquet e grava CSV/JSONL (veja
+`baunilha.lote`). `--cultura` troca os parâmetros do modelo por um perfil
+JSON/TOML/YAML (veja `baunilha.cultura`).
+"""
+
+import argparse
+import json
+import sys
+
+from .cenarios import SISTEMAS, executar_cenario, executar_plano, executar_projecao
+from .exportacao import json_finito
+
+
+def executar_portfolio(caminho_talhoes, anos, ano_inicial=None, cultura=None):
+    from .lote import ler_booleano, ler_cenarios
+    from .portfolio import calcular_portfolio
+
+    colunas = {"num_mudas": [], "ano_plantio": [], "sistema": [], "linear": []}
+    for linha in ler_cenarios(caminho_talhoes):
+        colunas["num_mudas"].append(float(linha["num_mudas"]))
+        colunas["ano_plantio"].append(int(linha["ano_plantio"]))
+        colunas["sistema"].append(linha.get("sistema") or "SAF")
+        colunas["linear"].append(ler_booleano(linha.get("usar_modelo_linear", False)))
+
+    totais, linha_do_tempo = calcular_portfolio(
+        colunas["num_mudas"],
+        colunas["ano_plantio"],
+        colunas["sistema"],
+        anos,
+        ano_inicial,
+        colunas["linear"],
+        cultura,
+    )
+    return {
+        "totais": totais,
+        "linha_do_tempo": {
+            coluna: valores.tolist() for coluna, valores in linha_do_tempo.items()
+        },
+    }
+
+
+def executar_otimizacao(
+    faturamento_objetivo,
+    anos,
+    orcamento_custo=None,
+    orcamento_area=None,
+    mudas_maximas_por_ano=None,
+    sistema="SAF",
+    usar_modelo_linear=False,
+    pontos_fronteira=0,
+    cultura=None,
+):
+    import numpy as np
+
+    from .otimizador import explorar_fronteira, otimizar_cronograma
+
+    resultado = otimizar_cronograma(
+        faturamento_objetivo,
+        anos,
+        orcamento_custo,
+        orcamento_area,
+        mudas_maximas_por_ano,
+        sistema,
+        usar_modelo_linear=usar_modelo_linear,
+        cultura=cultura,
+    )
+    resultado["cronograma"] = resultado["cronograma"].tolist()
+    if pontos_fronteira:
+        fronteira = explorar_fronteira(
+            anos,
+            np.linspace(0, faturamento_objetivo, pontos_fronteira + 1)[1:],
+            mudas_maximas_por_ano,
+            usar_modelo_linear=usar_modelo_linear,
+            cultura=cultura,
+        )
+        resultado["fronteira"] = {
+            chave: valores.tolist() for chave, valores in fronteira.items()
+        }
+    return resultado
+
+
+def executar_financeiro(
+    num_mudas,
+    anos,
+    usar_modelo_linear=False,
+    taxas_desconto=None,
+    faturamento_objetivo=None,
+    taxa_crescimento_maxima=1.5,
+    cultura=None,
+):
+    import numpy as np
+
+    from .financeiro import (
+        TAXAS_DESCONTO_PADRAO,
+        avaliar_fluxos,
+        fluxos_plano,
+        fluxos_projecao,
+    )
+
+    taxas_desconto = taxas_desconto or TAXAS_DESCONTO_PADRAO
+    fluxos = fluxos_projecao(num_mudas, anos, usar_modelo_linear, cultura)
+    resultado = {"projecao": fluxos[0]}
+    if faturamento_objetivo is not None:
+        from .plano import calcular_plano_acao
+
+        _, _, taxa_crescimento, _ = calcular_plano_acao(
+            num_mudas,
+            faturamento_objetivo,
+            anos,
+            taxa_crescimento_maxima,
+            cultura=cultura,
+        )
+        if taxa_crescimento is not None:
+            # O plano de ação usa sempre o modelo não linear
+            resultado["plano"] = fluxos_plano(
+                num_mudas, taxa_crescimento, anos, cultura=cultura
+            )[0]
+
+    for nome, fluxo in resultado.items():
+        indicadores = avaliar_fluxos(fluxo, taxas_desconto)
+        resultado[nome] = {"fluxos": fluxo.tolist()}
+        for chave, valores in indicadores.items():
+            valores = valores if chave == "taxas_desconto" else valores[0]
+            # NaN (TIR sem raiz, payback fora do horizonte) vira null no JSON
+            resultado[nome][chave] = np.where(np.isnan(valores), None, valores).tolist()
+    return resultado
+
+
+def _criar_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m baunilha",
+        description="Projeções de produtividade e planos de ação para baunilha.",
+    )
+    parser.add_argument(
+        "--saida", help="Arquivo JSON de saída (padrão: saída padrão)", default=None
+    )
+    parser.add_argument(
+        "--cultura",
+        help="Perfil de cultura em JSON, TOML ou YAML (padrão: baunilha)",
+        default=None,
+    )
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    projecao = subparsers.add_parser("projecao", help="Projeção anual e cumulativa")
+    projecao.add_argument("--mudas", type=float, required=True)
+    projecao.add_argument("--anos", type=int, required=True)
+    projecao.add_argument("--sistema", choices=SISTEMAS, default="SAF")
+    projecao.add_argument(
+        "--linear", action="store_true", help="Usar modelo linear para anos 1 e 2"
+    )
+
+    plano = subparsers.add_parser("plano", help="Plano de ação para um objetivo")
+    plano.add_argument("--mudas", type=float, required=True)
+    plano.add_argument("--objetivo", type=float, required=True)
+    plano.add_argument("--anos", type=int, required=True)
+    plano.add_argument("--taxa-maxima", type=float, default=1.5)
+    plano.add_argument(
+        "--tabela-viabilidade",
+        default=None,
+        help="Tabela de 'viabilidade' (.npy) para responder planos inviáveis",
+    )
+
+    cenarios = subparsers.add_parser("cenarios", help="Roda um arquivo de cenários")
+    cenarios.add_argument("arquivo", help="Lista JSON de cenários")
+
+    lote = subparsers.add_parser("lote", help="Roda uma tabela de cenários em paralelo")
+    lote.add_argument("entrada", help="Tabela CSV ou Parquet")
+    lote.add_argument("saida_lote", metavar="saida", help="Arquivo CSV ou JSONL")
+    lote.add_argument("--processos", type=int, default=None)
+    lote.add_argument("--tamanho-bloco", type=int, default=256)
+
+    sensibilidade = subparsers.add_parser(
+        "sensibilidade", help="Tornado de sensibilidade do faturamento líquido"
+    )
+    sensibilidade.add_argument("--mudas", type=float, required=True)
+    sensibilidade.add_argument("--anos", type=int, required=True)
+    sensibilidade.add_argument("--linear", action="store_true")
+    sensibilidade.add_argument("--variacao", type=float, default=0.1)
+
+    superficie = subparsers.add_parser(
+        "superficie", help="Pré-calcula e salva uma superfície de resposta (.npz)"
+    )
+    superficie.add_argument("arquivo_superficie", metavar="arquivo")
+    superficie.add_argument("--mudas-min", type=float, default=1)
+    superficie.add_argument("--mudas-max", type=float, default=100_000)
+    superficie.add_argument("--pontos", type=int, default=1000)
+    superficie.add_argument("--anos-max", type=int, default=15)
+
+    portfolio = subparsers.add_parser(
+        "portfolio",
+        help="Linha do tempo de uma carteira de talhões (CSV com num_mudas, "
+        "ano_plantio, sistema e, opcionalmente, usar_modelo_linear)",
+    )
+    portfolio.add_argument("talhoes", help="Tabela CSV de talhões")
+    portfolio.add_argument("--anos", type=int, required=True)
+    portfolio.add_argument("--ano-inicial", type=int, default=None)
+
+    servico = subparsers.add_parser(
+        "servico", help="Serviço HTTP/JSON (veja baunilha.servico)"
+    )
+    servico.add_argument("--host", default="127.0.0.1")
+    servico.add_argument("--porta", type=int, default=8000)
+    servico.add_argument("--processos", type=int, default=None)
+
+    otimizar = subparsers.add_parser(
+        "otimizar", help="Cronograma de plantio de menor custo para um objetivo"
+    )
+    otimizar.add_argument("--objetivo", type=float, required=True)
+    otimizar.add_argument("--anos", type=int, required=True)
+    otimizar.add_argument("--orcamento", type=float, default=None, help="US$")
+    otimizar.add_argument("--area-maxima", type=float, default=None, help="ha")
+    otimizar.add_argument("--mudas-max-ano", type=float, default=None)
+    otimizar.add_argument("--sistema", choices=SISTEMAS, default="SAF")
+    otimizar.add_argument("--linear", action="store_true")
+    otimizar.add_argument(
+        "--fronteira",
+        type=int,
+        default=0,
+        help="Número de objetivos na fronteira de Pareto (0 = não calcular)",
+    )
+
+    viabilidade = subparsers.add_parser(
+        "viabilidade",
+        help="Pré-calcula a tabela de viabilidade do plano de ação (.npy)",
+    )
+    viabilidade.add_argument("arquivo_viabilidade", metavar="arquivo")
+    viabilidade.add_argument("--anos-max", type=int, default=50)
+    viabilidade.add_argument("--taxa-min", type=float, default=1.0)
+    viabilidade.add_argument("--taxa-max", type=float, default=3.0)
+    viabilidade.add_argument("--pontos", type=int, default=201)
+    viabilidade.add_argument("--processos", type=int, default=None)
+
+    financeiro = subparsers.add_parser(
+        "financeiro", help="Fluxo de caixa, VPL, TIR e payback"
+    )
+    financeiro.add_argument("--mudas", type=float, required=True)
+    financeiro.add_argument("--anos", type=int, required=True)
+    financeiro.add_argument("--linear", action="store_true")
+    financeiro.add_argument(
+        "--taxas", type=float, nargs="+", default=None, help="Taxas de desconto"
+    )
+    financeiro.add_argument(
+        "--objetivo", type=float, default=None, help="Inclui o fluxo do plano de ação"
+    )
+    financeiro.add_argument("--taxa-maxima", type=float, default=1.5)
+
+    return parser
+
+
+def main(argv=None):
+    parser = _criar_parser()
+    args = parser.parse_args(argv)
+
+    cultura = None
+    if args.cultura:
+        if args.comando == "servico":
+            parser.error(f"--cultura não é suportado por '{args.comando}'")
+        from .cultura import carregar_perfil
+
+        try:
+            cultura = carregar_perfil(args.cultura)
+        except (OSError, ImportError, ValueError) as erro:
+            parser.error(f"Perfil de cultura inválido: {erro}")
+
+    if args.comando == "lote":
+        from .lote import executar_lote
+
+        estatisticas = executar_lote(
+            args.entrada,
+            args.saida_lote,
+            args.processos,
+            args.tamanho_bloco,
+            cultura=cultura,
+        )
+        print(
+            f"{estatisticas['linhas']} linhas em {estatisticas['segundos']:.2f} s "
+            f"({estatisticas['linhas_por_segundo']:,.0f} linhas/s)",
+            file=sys.stderr,
+        )
+        return 0
+
+    if args.comando == "servico":
+        from .servico import executar_servico
+
+        executar_servico(args.host, args.porta, args.processos)
+        return 0
+
+    if args.comando == "viabilidade":
+        import numpy as np
+
+        from .viabilidade import gerar_tabela_viabilidade
+
+        gerar_tabela_viabilidade(
+            args.arquivo_viabilidade,
+            np.linspace(args.taxa_min, args.taxa_max, args.pontos),
+            args.anos_max,
+            args.processos,
+            cultura=cultura,
+        )
+        return 0
+
+    if args.comando == "superficie":
+        import numpy as np
+
+        from .sensibilidade import calcular_superficie
+
+        calcular_superficie(
+            np.linspace(args.mudas_min, args.mudas_max, args.pontos),
+            args.anos_max,
+            cultura,
+        ).salvar(args.arquivo_superficie)
+        return 0
+
+    if args.comando == "projecao":
+        resultado = executar_projecao(
+            args.mudas, args.anos, args.sistema, args.linear, cultura
+        )
+    elif args.comando == "plano":
+        tabela = None
+        if args.tabela_viabilidade:
+            from .viabilidade import carregar_tabela
+
+            try:
+                tabela = carregar_tabela(args.tabela_viabilidade, cultura)
+            except (OSError, ValueError) as erro:
+                parser.error(f"Tabela de viabilidade inválida: {erro}")
+        resultado = executar_plano(
+            args.mudas, args.objetivo, args.anos, args.taxa_maxima, cultura, tabela
+        )
+    elif args.comando == "otimizar":
+        resultado = executar_otimizacao(
+            args.objetivo,
+            args.anos,
+            args.orcamento,
+            args.area_maxima,
+            args.mudas_max_ano,
+            args.sistema,
+            args.linear,
+            args.fronteira,
+            cultura,
+        )
+    elif args.comando == "financeiro":
+        resultado = executar_financeiro(
+            args.mudas,
+            args.anos,
+            args.linear,
+            args.taxas,
+            args.objetivo,
+            args.taxa_maxima,
+            cultura,
+        )
+    elif args.comando == "portfolio":
+        resultado = executar_portfolio(
+            args.talhoes, args.anos, args.ano_inicial, cultura
+        )
+    elif args.comando == "sensibilidade":
+        from .sensibilidade import analise_sensibilidade
+
+        resultado = analise_sensibilidade(
+            args.mudas, args.anos, args.linear, args.variacao, cultura=cultura
+        )
+    else:
+        with open(args.arquivo, encoding="utf-8") as arquivo:
+            cenarios = json.load(arquivo)
+        resultado = [executar_cenario(cenario, cultura) for cenario in cenarios]
+
+    texto = json_finito(resultado, ensure_ascii=False, indent=2)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto + "\n")
+    else:
+        print(texto)
+    return 0
@@ -0,0 +1,45 @@
+"""Motor de coortes: faturamento de plantios sucessivos a partir da curva por muda."""
+
+import numpy as np
+
+from .instrumentacao import contar
+from .modelo import obter_curvas_por_muda
+
+
+def calcular_curva_receita_por_muda(anos, usar_modelo_linear=False, cultura=None):
+    """Valor do extrato (US$) produzido por uma muda em cada idade de 1 a `anos`."""
+    return obter_curvas_por_muda(anos, usar_modelo_linear, cultura)["valor_extrato"]
+
+
+def calcular_faturamento_anual_coortes(
+    mudas_inicial, taxa_crescimento, anos, margem, curva
+):
+    """Faturamento de cada ano do plano somando todas as coortes plantadas.
+
+    As mudas plantadas no ano i seguem a série geométrica
+    `mudas_inicial * taxa_crescimento ** (i - 1)`. Como a receita é linear no
+    número de mudas, o faturamento anual é a convolução dessa série com a
+    curva de receita por muda (`calcular_curva_receita_por_muda`).
+    """
+    contar("coortes.faturamento_anual")
+    if anos <= 0:  # um `anos` negativo cortaria a curva a partir do fim
+        return np.zeros(0)
+    plantio = mudas_inicial * taxa_crescimento ** np.arange(anos)
+    return margem * np.convolve(plantio, curva[:anos])[:anos]
+
+
+def calcular_faturamento_total_coortes(
+    mudas_inicial, taxa_crescimento, anos, margem, curva
+):
+    """Faturamento acumulado do plano após `anos` anos.
+
+    A coorte plantada no ano i contribui com a receita acumulada da curva
+    até a idade `anos - i + 1`, então o total é um único produto escalar.
+    `taxa_crescimento` pode ser um array para avaliar várias taxas de uma vez.
+    """
+    anos = max(anos, 0)
+    taxa = np.asarray(taxa_crescimento, dtype=float)
+    contar("coortes.faturamento_total", taxa.size)
+    receita_acumulada = np.cumsum(curva[:anos])[::-1]
+    potencias = taxa[..., None] ** np.arange(anos)
+    return margem * mudas_inicial * (potencias @ receita_acumulada)
@@ -0,0 +1,349 @@
+"""Perfis de cultura: os parâmetros do modelo em um objeto imutável.
+
+Um perfil descreve uma cultura (preços, produção por idade, favas por pé,
+pesos, margens, área por muda) e pode vir de um arquivo JSON, TOML ou YAML
+(este último exige o PyYAML). `compilar_perfil` valida a definição uma única
+vez e devolve um `PerfilCultura` congelado, que já traz a tabela de produção
+por idade e as curvas por muda dos primeiros `ANOS_PRECALCULADOS` anos. As
+funções do motor recebem o perfil no argumento `cultura`; sem ele usam
+`modelo.CULTURA_PADRAO`, a baunilha com as constantes de `modelo`.
+
+As duas margens continuam separadas, como no modelo original:
+`margem_lucro` (21,30%) nos resultados e `margem_lucro_plano` (22%) na busca
+do plano de ação. Exemplo de perfil em `perfis/baunilha.toml`.
+"""
+
+import json
+import os
+from functools import lru_cache
+from types import MappingProxyType
+
+import numpy as np
+
+ANOS_PRECALCULADOS = 50
+
+# Resultados de `PerfilCultura.produtividade`, na ordem das linhas por idade
+_CHAVES = (
+    "producao_kg",
+    "produtividade_por_pe",
+    "numero_favas",
+    "peso_favas_verdes",
+    "peso_favas_curadas",
+    "valor_favas_verdes",
+    "valor_favas_curadas",
+    "valor_extrato",
+    "volume_extrato",
+)
+
+# Campos numéricos obrigatórios e se podem ser zero
+CAMPOS_NUMERICOS = {
+    "custo_por_muda": True,
+    "preco_extrato_por_tonelada": True,
+    "producao_maxima_por_hectare": True,
+    "mudas_por_hectare": False,
+    "producao_favas_maxima": False,
+    "favas_por_pe_max": True,
+    "peso_fava_verde": True,
+    "peso_fava_curada": True,
+    "preco_fava_verde": True,
+    "preco_fava_curada": True,
+    "proporcao_favas_extrato": False,
+    "margem_lucro": True,
+    "margem_lucro_plano": True,
+}
+CAMPOS_OPCIONAIS = ("nome", "idade_referencia_linear", "area_por_muda_outros")
+
+
+def _numero(valor, campo, zero_permitido=True):
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+        raise ValueError(f"{campo} deve ser um número, não {valor!r}")
+    if valor != valor or valor < 0 or (valor == 0 and not zero_permitido):
+        limite = "maior ou igual a zero" if zero_permitido else "maior que zero"
+        raise ValueError(f"{campo} deve ser {limite}, não {valor!r}")
+    return valor
+
+
+def _tabela(valores, campo, chave=str):
+    if not isinstance(valores, dict) or not valores:
+        raise ValueError(f"{campo} deve ser uma tabela não vazia")
+    tabela = {}
+    for nome, valor in valores.items():
+        try:
+            nome = chave(nome)
+        except ValueError:
+            raise ValueError(f"Chave inválida em {campo}: {nome!r}") from None
+        tabela[nome] = _numero(valor, f"{campo}[{nome!r}]")
+    return dict(sorted(tabela.items()))
+
+
+def validar_definicao(definicao):
+    """Definição normalizada (tipos e chaves conferidos), ou ValueError."""
+    if not isinstance(definicao, dict):
+        raise ValueError("O perfil deve ser um objeto (tabela) de parâmetros.")
+    conhecidos = {*CAMPOS_NUMERICOS, *CAMPOS_OPCIONAIS}
+    conhecidos.update(("producao_por_hectare", "area_por_muda"))
+    desconhecidos = sorted(set(definicao) - conhecidos)
+    if desconhecidos:
+        raise ValueError(f"Parâmetros desconhecidos no perfil: {desconhecidos}")
+    faltando = sorted(
+        {*CAMPOS_NUMERICOS, "producao_por_hectare", "area_por_muda"} - set(definicao)
+    )
+    if faltando:
+        raise ValueError(f"Parâmetros ausentes no perfil: {faltando}")
+
+    normalizada = {"nome": str(definicao.get("nome", "Sem nome"))}
+    for campo, zero_permitido in CAMPOS_NUMERICOS.items():
+        normalizada[campo] = _numero(definicao[campo], campo, zero_permitido)
+    for campo in ("margem_lucro", "margem_lucro_plano", "proporcao_favas_extrato"):
+        if normalizada[campo] > 1:
+            raise ValueError(f"{campo} é uma fração entre 0 e 1")
+
+    producao = _tabela(definicao["producao_por_hectare"], "producao_por_hectare", int)
+    if min(producao) < 1:
+        raise ValueError("As idades de producao_por_hectare começam em 1")
+    normalizada["producao_por_hectare"] = producao
+    normalizada["area_por_muda"] = _tabela(definicao["area_por_muda"], "area_por_muda")
+
+    referencia = definicao.get("idade_referencia_linear", min(producao))
+    if referencia not in producao:
+        raise ValueError("idade_referencia_linear deve ser uma idade da tabela")
+    normalizada["idade_referencia_linear"] = int(referencia)
+    outros = definicao.get("area_por_muda_outros")
+    normalizada["area_por_muda_outros"] = (
+        None if outros is None else _numero(outros, "area_por_muda_outros")
+    )
+    return normalizada
+
+
+class PerfilCultura:
+    """Parâmetros compilados de uma cultura. Imutável; crie com `compilar_perfil`."""
+
+    __slots__ = (
+        *CAMPOS_NUMERICOS,
+        *CAMPOS_OPCIONAIS,
+        "producao_por_hectare",
+        "area_por_muda",
+        "idade_maxima_tabela",
+        "tabela_producao",
+        "chave",
+        "_curvas",
+        "_por_idade",
+        "_definicao",
+    )
+
+    def __init__(self, definicao):
+        definir = object.__setattr__
+        for campo, valor in definicao.items():
+            if campo not in ("producao_por_hectare", "area_por_muda"):
+                definir(self, campo, valor)
+        producao = definicao["producao_por_hectare"]
+        definir(self, "producao_por_hectare", MappingProxyType(dict(producao)))
+        definir(
+            self, "area_por_muda", MappingProxyType(dict(definicao["area_por_muda"]))
+        )
+        definir(self, "idade_maxima_tabela", max(producao))
+
+        # Tabela indexada pela idade (0 até a última da tabela, mais o máximo)
+        tabela = np.array(
+            [producao.get(idade, 0) for idade in range(self.idade_maxima_tabela + 1)]
+            + [self.producao_maxima_por_hectare],
+            dtype=float,
+        )
+        tabela.setflags(write=False)
+        definir(self, "tabela_producao", tabela)
+
+        # Chave de cache: todos os parâmetros que afetam o resultado
+        definir(
+            self,
+            "chave",
+            tuple(
+                (campo, tuple(valor.items()) if isinstance(valor, dict) else valor)
+                for campo, valor in sorted(definicao.items())
+                if campo != "nome"
+            ),
+        )
+        definir(self, "_definicao", definicao)
+
+        idades = np.arange(1, ANOS_PRECALCULADOS + 1)
+        curvas = {}
+        for linear in (False, True):
+            curvas[linear] = self.produtividade(1, idades, linear)
+            for curva in curvas[linear].values():
+                curva.setflags(write=False)
+        definir(self, "_curvas", curvas)
+        # As mesmas curvas em floats do Python, uma linha por idade, para a
+        # versão escalar
+        definir(
+            self,
+            "_por_idade",
+            {
+                linear: list(zip(*(curvas[linear][nome].tolist() for nome in _CHAVES)))
+                for linear in curvas
+            },
+        )
+
+    def __setattr__(self, nome, valor):
+        raise AttributeError("PerfilCultura é imutável")
+
+    def __delattr__(self, nome):
+        raise AttributeError("PerfilCultura é imutável")
+
+    def __reduce__(self):
+        # Recompila no processo de destino (o pool de processos usa pickle)
+        return compilar_perfil, (self._definicao,)
+
+    def __eq__(self, outro):
+        return isinstance(outro, PerfilCultura) and self.chave == outro.chave
+
+    def __hash__(self):
+        return hash(self.chave)
+
+    def __repr__(self):
+        return f"PerfilCultura({self.nome!r})"
+
+    def area_por_muda_m2(self, sistema):
+        area = self.area_por_muda.get(sistema, self.area_por_muda_outros)
+        if area is None:
+            raise ValueError(f"Sistema de cultivo desconhecido: {sistema!r}")
+        return area
+
+    def produtividade(self, num_mudas, anos, usar_modelo_linear=False):
+        """Núcleo de `calcular_produtividade_baunilha_vetorizado` para este perfil."""
+        num_mudas, anos = np.broadcast_arrays(
+            np.asarray(num_mudas, dtype=float), np.asarray(anos)
+        )
+
+        hectares = num_mudas / self.mudas_por_hectare
+
+        producao_tabela = self.tabela_producao[
+            np.clip(anos, 0, self.idade_maxima_tabela + 1)
+        ]
+        if usar_modelo_linear:
+            referencia = self.idade_referencia_linear
+            coef = (self.producao_por_hectare[referencia] - 0) / (referencia - 0)
+            producao_linear = np.maximum(0, coef * (anos - 0))
+            producao_tabela = np.where(
+                anos < referencia, producao_linear, producao_tabela
+            )
+        producao_kg = producao_tabela * hectares
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            produtividade_por_pe = producao_kg / num_mudas
+
+            # Cálculo do número de favas
+            fator_producao = np.minimum(
+                1, producao_kg / (self.producao_favas_maxima * hectares)
+            )
+        favas_por_pe = self.favas_por_pe_max * fator_producao
+        numero_favas = favas_por_pe * num_mudas
+
+        # Cálculo do peso das favas
+        peso_favas_verdes = numero_favas * self.peso_fava_verde / 1000  # em kg
+        peso_favas_curadas = numero_favas * self.peso_fava_curada / 1000  # em kg
+
+        # Cálculo do preço de cada fava
+        unidade_fava_verde = (self.peso_fava_verde * self.preco_fava_verde) / 1000
+        unidade_fava_curada = (self.peso_fava_curada * self.preco_fava_curada) / 1000
+
+        # Cálculo do valor de mercado das favas
+        valor_favas_verdes = unidade_fava_verde * numero_favas  # US$
+        valor_favas_curadas = unidade_fava_curada * numero_favas  # US$
+
+        # Cálculo do volume e valor do extrato
+        volume_extrato = peso_favas_curadas / self.proporcao_favas_extrato  # kg
+        valor_extrato = (volume_extrato / 1000) * self.preco_extrato_por_tonelada
+
+        return {
+            "producao_kg": producao_kg,
+            "produtividade_por_pe": produtividade_por_pe,
+            "numero_favas": numero_favas,
+            "peso_favas_verdes": peso_favas_verdes,
+            "peso_favas_curadas": peso_favas_curadas,
+            "valor_favas_verdes": valor_favas_verdes,
+            "valor_favas_curadas": valor_favas_curadas,
+            "valor_extrato": valor_extrato,
+            "volume_extrato": volume_extrato,
+        }
+
+    def produtividade_na_idade(self, num_mudas, ano, usar_modelo_linear=False):
+        """`produtividade` de uma idade (inteira), com floats no lugar de arrays.
+
+        Tudo, menos a produtividade por pé, é linear no número de mudas: nas
+        idades pré-calculadas o resultado sai das curvas por muda, sem montar
+        arrays a cada chamada.
+        """
+        if ano != int(ano):
+            raise ValueError(f"A idade deve ser um número inteiro de anos: {ano!r}")
+        ano = int(ano)
+        if num_mudas > 0 and 1 <= ano <= ANOS_PRECALCULADOS:
+            por_muda = self._por_idade[bool(usar_modelo_linear)][ano - 1]
+            resultado = {
+                nome: valor * num_mudas for nome, valor in zip(_CHAVES, por_muda)
+            }
+            # A única saída que não escala com as mudas
+            resultado["produtividade_por_pe"] = por_muda[1]
+            return resultado
+        return {
+            nome: float(valor)
+            for nome, valor in self.produtividade(
+                num_mudas, ano, usar_modelo_linear
+            ).items()
+        }
+
+    def curvas_precalculadas(self, anos, usar_modelo_linear=False):
+        """Curvas por muda das idades 1 a `anos` (somente leitura), ou None.
+
+        None quando `anos` passa de `ANOS_PRECALCULADOS`. Com `anos` <= 0 as
+        curvas são vazias (nenhum ano), como no laço `range(1, anos + 1)`.
+        """
+        if anos > ANOS_PRECALCULADOS:
+            return None
+        curvas = self._curvas[bool(usar_modelo_linear)]
+        # Sem o max, um `anos` negativo cortaria a partir do fim do vetor
+        return {nome: curva[: max(anos, 0)] for nome, curva in curvas.items()}
+
+
+def compilar_perfil(definicao):
+    return PerfilCultura(validar_definicao(definicao))
+
+
+def _ler_arquivo(caminho):
+    extensao = os.path.splitext(caminho)[1].lower()
+    with open(caminho, "rb") as arquivo:
+        conteudo = arquivo.read()
+    if extensao == ".json":
+        return json.loads(conteudo)
+    if extensao == ".toml":
+        try:
+            import tomllib
+        except ModuleNotFoundError:  # Python < 3.11
+            import tomli as tomllib
+        return tomllib.loads(conteudo.decode("utf-8"))
+    if extensao in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("Perfis em YAML exigem o pacote PyYAML.") from None
+        return yaml.safe_load(conteudo)
+    raise ValueError(f"Formato de perfil desconhecido: {extensao!r}")
+
+
+@lru_cache(maxsize=32)
+def _carregar(caminho, modificado):
+    return compilar_perfil(_ler_arquivo(caminho))
+
+
+def carregar_perfil(caminho):
+    """Perfil compilado de um arquivo; recompila só se o arquivo mudar."""
+    caminho = os.path.abspath(caminho)
+    return _carregar(caminho, os.stat(caminho).st_mtime_ns)
+
+
+def carregar_perfis(diretorio):
+    """`{nome: perfil}` de todos os arquivos de perfil de um diretório."""
+    perfis = {}
+    for nome in sorted(os.listdir(diretorio)):
+        if os.path.splitext(nome)[1].lower() in (".json", ".toml", ".yaml", ".yml"):
+            perfil = carregar_perfil(os.path.join(diretorio, nome))
+            perfis[perfil.nome] = perfil
+    return perfis
@@ -0,0 +1,209 @@
+"""Exportação dos resultados para planilhas (Excel, CSV e Parquet).
+
+Todas as exportações passam por `exportar_resultados`, que recebe um
+dicionário `{nome da aba: tabela}`. A tabela pode ser uma lista de
+dicionários, um dicionário de colunas, um DataFrame ou qualquer iterável de
+dicionários (por exemplo, um gerador); as linhas são escritas uma a uma, sem
+montar DataFrames intermediários. O Excel usa o modo write-only do openpyxl.
+
+`json_finito` serializa resultados em JSON válido: valores não finitos (as
+mudas mínimas de um plano sem faturamento, por exemplo) viram `null`.
+"""
+
+import csv
+import io
+import json
+import math
+import os
+import tempfile
+from collections.abc import Mapping
+from io import BytesIO
+from itertools import chain, islice
+
+from .instrumentacao import medir
+
+FORMATOS = ("xlsx", "csv", "parquet")
+
+MIME_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def valores_finitos(valor):
+    """Cópia de `valor` com os números não finitos trocados por None."""
+    if isinstance(valor, Mapping):
+        return {chave: valores_finitos(item) for chave, item in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [valores_finitos(item) for item in valor]
+    if valor is None or isinstance(valor, (str, bool, int)):
+        return valor
+    valor = float(valor)
+    return valor if math.isfinite(valor) else None
+
+
+def json_finito(dados, **opcoes):
+    """`json.dumps` que escreve Infinity e NaN como null (JSON válido)."""
+    try:
+        return json.dumps(dados, default=float, allow_nan=False, **opcoes)
+    except ValueError:
+        return json.dumps(valores_finitos(dados), allow_nan=False, **opcoes)
+
+
+def abas_projecao(resultados_anuais, resultados_cumulativos):
+    return {"Anuais": resultados_anuais, "Cumulativos": [resultados_cumulativos]}
+
+
+def abas_plano(plano_acao, resultados_detalhados):
+    return {"Plano de Ação": plano_acao, "Detalhado": resultados_detalhados}
+
+
+def _linhas(tabela):
+    """Colunas e iterador de tuplas de uma tabela em qualquer formato aceito."""
+    if hasattr(tabela, "itertuples"):  # DataFrame
+        return list(tabela.columns), tabela.itertuples(index=False, name=None)
+    if isinstance(tabela, Mapping):  # dicionário de colunas
+        colunas = list(tabela)
+        return colunas, zip(*(tabela[coluna] for coluna in colunas))
+
+    linhas = iter(tabela)
+    primeira = next(linhas, None)
+    if primeira is None:
+        return [], iter(())
+    colunas = list(primeira)
+    return colunas, (
+        tuple(linha.get(coluna) for coluna in colunas)
+        for linha in chain([primeira], linhas)
+    )
+
+
+def _inferir_formato(destino, formato):
+    if formato is None:
+        if not isinstance(destino, (str, os.PathLike)):
+            raise ValueError("Informe o formato ao exportar para um arquivo aberto.")
+        formato = os.path.splitext(os.fspath(destino))[1].lstrip(".").lower()
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de exportação desconhecido: {formato!r}")
+    return formato
+
+
+def _destinos_por_aba(abas, destino):
+    """Um arquivo por aba para formatos sem suporte a várias abas.
+
+    Com uma única aba o destino é usado como está; com várias, o nome da
+    aba é acrescentado ao nome do arquivo (`resultados_Anuais.csv`).
+    """
+    if len(abas) == 1:
+        return [(tabela, destino) for tabela in abas.values()]
+    if not isinstance(destino, (str, os.PathLike)):
+        raise ValueError("Várias abas em CSV/Parquet exigem um caminho de arquivo.")
+    base, extensao = os.path.splitext(os.fspath(destino))
+    return [
+        (tabela, f"{base}_{nome.replace(' ', '_')}{extensao}")
+        for nome, tabela in abas.items()
+    ]
+
+
+def _escrever_xlsx(abas, destino):
+    from openpyxl import Workbook
+
+    planilha = Workbook(write_only=True)
+    for nome, tabela in abas.items():
+        aba = planilha.create_sheet(title=nome[:31])
+        colunas, linhas = _linhas(tabela)
+        aba.append(colunas)
+        for linha in linhas:
+            aba.append(linha)
+    planilha.save(destino)
+
+
+def _escrever_csv(tabela, destino):
+    colunas, linhas = _linhas(tabela)
+
+    def gravar(arquivo):
+        escritor = csv.writer(arquivo)
+        escritor.writerow(colunas)
+        escritor.writerows(linhas)
+
+    if isinstance(destino, (str, os.PathLike)):
+        with open(destino, "w", newline="", encoding="utf-8") as arquivo:
+            gravar(arquivo)
+    else:
+        arquivo = io.TextIOWrapper(destino, newline="", encoding="utf-8")
+        try:
+            gravar(arquivo)
+        finally:
+            arquivo.flush()
+            arquivo.detach()  # não fecha o arquivo de quem chamou
+
+
+def _escrever_parquet(tabela, destino, linhas_por_grupo=65536):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    colunas, linhas = _linhas(tabela)
+
+    def proximo_grupo():
+        grupo = list(islice(linhas, linhas_por_grupo))
+        if not grupo:
+            return None
+        return pa.Table.from_arrays(
+            [pa.array(valores) for valores in zip(*grupo)], names=colunas
+        )
+
+    grupo = proximo_grupo()
+    if grupo is None:
+        grupo = pa.table({coluna: pa.array([]) for coluna in colunas})
+    with pq.ParquetWriter(destino, grupo.schema) as escritor:
+        while grupo is not None:
+            escritor.write_table(grupo)
+            grupo = proximo_grupo()
+
+
+def exportar_resultados(abas, destino, formato=None):
+    """Grava as abas em `destino` (caminho ou arquivo binário aberto).
+
+    O formato é inferido da extensão do caminho quando não informado. CSV e
+    Parquet não têm abas: com mais de uma aba, cada uma vai para um arquivo
+    próprio (veja `_destinos_por_aba`).
+    """
+    formato = _inferir_formato(destino, formato)
+    with medir(f"exportacao.{formato}"):
+        if formato == "xlsx":
+            _escrever_xlsx(abas, destino)
+        elif formato == "csv":
+            for tabela, caminho in _destinos_por_aba(abas, destino):
+                _escrever_csv(tabela, caminho)
+        else:
+            for tabela, caminho in _destinos_por_aba(abas, destino):
+                _escrever_parquet(tabela, caminho)
+
+
+def exportar_em_partes(abas, formato="xlsx", tamanho_parte=1 << 16):
+    """Gera o arquivo exportado em pedaços de bytes, para respostas em streaming.
+
+    O arquivo é montado em um arquivo temporário que só vai para o disco
+    quando passa de alguns megabytes, e então é lido em partes.
+    """
+    if formato != "xlsx" and len(abas) > 1:
+        raise ValueError("A exportação em partes para CSV/Parquet aceita uma aba.")
+    with tempfile.SpooledTemporaryFile(max_size=8 << 20) as temporario:
+        exportar_resultados(abas, temporario, formato)
+        temporario.seek(0)
+        while parte := temporario.read(tamanho_parte):
+            yield parte
+
+
+def gerar_excel(resultados_anuais, resultados_cumulativos):
+    output = BytesIO()
+    exportar_resultados(
+        abas_projecao(resultados_anuais, resultados_cumulativos), output, "xlsx"
+    )
+    output.seek(0)
+
+    return output
+
+
+def gerar_excel_plano(plano_acao, resultados_detalhados):
+    output = BytesIO()
+    exportar_resultados(abas_plano(plano_acao, resultados_detalhados), output, "xlsx")
+    output.seek(0)
+
+    return output
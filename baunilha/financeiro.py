@@ -0,0 +1,199 @@
+"""Fluxo de caixa e indicadores financeiros: VPL, TIR e payback.
+
+Os fluxos têm uma linha por cenário e uma coluna por ano, começando no ano
+0. A compra das mudas de um ano sai no início dele (fim do ano anterior) e o
+lucro bruto de cada ano (faturamento bruto x margem) entra no fim dele.
+Sem desconto, a soma dos fluxos de uma projeção é o faturamento líquido de
+`calcular_cumulativo`. Cenários com horizontes diferentes ficam na mesma
+matriz, com zeros depois do fim, o que não altera nenhum indicador.
+
+Tudo é vetorizado entre cenários: o VPL para várias taxas é um produto de
+matrizes e a TIR de todas as linhas é resolvida junta, por Newton com
+intervalo de segurança (bisseção quando o passo de Newton sai do intervalo),
+sem um solver escalar por cenário.
+"""
+
+import numpy as np
+
+from .coortes import calcular_curva_receita_por_muda
+from .modelo import CULTURA_PADRAO, obter_curvas_por_muda
+
+TAXA_DESCONTO_PADRAO = 0.10
+TAXAS_DESCONTO_PADRAO = (0.05, 0.10, 0.15)
+
+
+def fluxos_projecao(num_mudas, anos, usar_modelo_linear=False, cultura=None):
+    """Fluxos de caixa de projeções (`calcular_cumulativo`), um por cenário.
+
+    `num_mudas`, `anos` e `usar_modelo_linear` são escalares ou arrays,
+    combinados por broadcasting. Forma do resultado: (cenários, max(anos) + 1).
+    Horizontes <= 0 só têm a compra das mudas, como em `calcular_cumulativo`.
+    """
+    cultura = cultura or CULTURA_PADRAO
+    num_mudas, anos, usar_modelo_linear = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(num_mudas, dtype=float)),
+        np.maximum(np.asarray(anos, dtype=np.int64), 0),
+        np.asarray(usar_modelo_linear, dtype=bool),
+    )
+    anos_maximo = int(anos.max())
+    fluxos = np.zeros((len(num_mudas), anos_maximo + 1))
+    fluxos[:, 0] = -num_mudas * cultura.custo_por_muda
+    for linear in (False, True):
+        grupo = usar_modelo_linear == linear
+        if grupo.any():
+            curva = obter_curvas_por_muda(anos_maximo, linear, cultura)
+            lucro_por_muda = curva["valor_extrato"] * cultura.margem_lucro
+            fluxos[grupo, 1:] = num_mudas[grupo, None] * lucro_por_muda
+    fluxos[:, 1:][np.arange(anos_maximo) >= anos[:, None]] = 0.0
+    return fluxos
+
+
+def fluxos_plano(
+    num_mudas_inicial,
+    taxa_crescimento,
+    anos,
+    usar_modelo_linear=False,
+    cultura=None,
+):
+    """Fluxos de caixa do plano de ação (`calcular_plano_acao`), um por taxa.
+
+    A coorte do ano i é comprada no ano i - 1 e o faturamento de todas as
+    coortes do ano t entra no ano t. `taxa_crescimento` pode ser um array.
+    Forma do resultado: (taxas, anos + 1); horizontes <= 0 não têm fluxos,
+    como em `calcular_faturamento_anual_coortes`.
+    """
+    cultura = cultura or CULTURA_PADRAO
+    anos = max(int(anos), 0)  # um `anos` negativo cortaria a curva pelo fim
+    taxas = np.atleast_1d(np.asarray(taxa_crescimento, dtype=float))
+    curva = calcular_curva_receita_por_muda(anos, usar_modelo_linear, cultura)[:anos]
+    plantio = num_mudas_inicial * taxas[:, None] ** np.arange(anos)
+
+    # Matriz de Toeplitz: receita no ano t da coorte plantada no ano i
+    indice_ano, indice_plantio = np.tril_indices(anos)
+    receita_por_coorte = np.zeros((anos, anos))
+    receita_por_coorte[indice_plantio, indice_ano] = curva[indice_ano - indice_plantio]
+    faturamento = cultura.margem_lucro * plantio @ receita_por_coorte
+
+    fluxos = np.zeros((len(taxas), anos + 1))
+    fluxos[:, :anos] -= plantio * cultura.custo_por_muda
+    fluxos[:, 1:] += faturamento
+    return fluxos
+
+
+def _fatores_desconto(taxas, periodos):
+    return (1 + np.asarray(taxas, dtype=float))[..., None] ** -np.arange(periodos)
+
+
+def vpl(fluxos, taxas_desconto=TAXAS_DESCONTO_PADRAO):
+    """Valor presente líquido de cada linha para cada taxa de desconto.
+
+    Forma do resultado: (cenários, taxas); com uma taxa escalar, (cenários,).
+    """
+    fluxos = np.asarray(fluxos, dtype=float)
+    return fluxos @ _fatores_desconto(taxas_desconto, fluxos.shape[-1]).T
+
+
+def vpl_por_cenario(fluxos, taxas_desconto):
+    """VPL de cada linha com a sua própria taxa de desconto (uma por linha)."""
+    fluxos = np.asarray(fluxos, dtype=float)
+    fatores = _fatores_desconto(taxas_desconto, fluxos.shape[-1])
+    return np.einsum("...j,...j->...", fluxos, fatores)
+
+
+def tir(
+    fluxos, taxa_minima=-0.9, taxa_maxima=10.0, tolerancia=1e-10, max_iteracoes=100
+):
+    """Taxa interna de retorno de cada linha, resolvida em bloco.
+
+    Procura a raiz do VPL em [`taxa_minima`, `taxa_maxima`]; linhas sem
+    mudança de sinal do VPL nesse intervalo (por exemplo, sem investimento
+    ou que nunca se pagam) ficam com NaN. Com mais de uma raiz (fluxos com
+    várias trocas de sinal), devolve uma delas.
+    """
+    fluxos = np.asarray(fluxos, dtype=float)
+    forma = fluxos.shape[:-1]
+    fluxos = fluxos.reshape(-1, fluxos.shape[-1])
+    periodos = np.arange(fluxos.shape[-1])
+    ponderados = fluxos[:, 1:] * periodos[1:]
+
+    # Na variável x = 1 / (1 + taxa) o VPL é um polinômio: uma potência de x
+    # por iteração dá o valor e a derivada
+    def avaliar(x):
+        potencias = x[:, None] ** periodos
+        valor = np.einsum("ij,ij->i", fluxos, potencias)
+        derivada = np.einsum("ij,ij->i", ponderados, potencias[:, :-1])
+        return valor, derivada
+
+    with np.errstate(all="ignore"):
+        # x decresce com a taxa: a taxa máxima é o limite inferior de x
+        esquerda = np.full(len(fluxos), 1 / (1 + float(taxa_maxima)))
+        direita = np.full(len(fluxos), 1 / (1 + float(taxa_minima)))
+        valor_esquerda, _ = avaliar(esquerda)
+        valor_direita, _ = avaliar(direita)
+        valido = np.isfinite(valor_esquerda) & np.isfinite(valor_direita)
+        valido &= np.sign(valor_esquerda) * np.sign(valor_direita) <= 0
+        valido &= (fluxos < 0).any(axis=-1) & (fluxos > 0).any(axis=-1)
+        sinal_esquerda = np.sign(valor_esquerda)
+
+        x = np.clip(1 / (1 + TAXA_DESCONTO_PADRAO), esquerda, direita)
+        ativos = valido.copy()
+        for _ in range(max_iteracoes):
+            if not ativos.any():
+                break
+            valor, derivada = avaliar(x)
+            # Mantém a raiz entre `esquerda` e `direita`
+            mesmo_lado = np.sign(valor) == sinal_esquerda
+            esquerda = np.where(ativos & mesmo_lado, x, esquerda)
+            direita = np.where(ativos & ~mesmo_lado, x, direita)
+
+            newton = x - valor / derivada
+            fora = ~np.isfinite(newton) | (newton < esquerda) | (newton > direita)
+            novos = np.where(fora, (esquerda + direita) / 2, newton)
+            novos = np.where(valor == 0, x, novos)
+            convergiu = np.abs(novos - x) <= tolerancia * x
+            x = np.where(ativos, novos, x)
+            ativos &= ~convergiu
+
+    return np.where(valido, 1 / x - 1, np.nan).reshape(forma)
+
+
+def payback(fluxos, taxa_desconto=0.0):
+    """Anos até o fluxo acumulado (descontado, se `taxa_desconto`) ficar >= 0.
+
+    Vale o último cruzamento de negativo para não negativo, a partir do qual o
+    acumulado não volta a ficar negativo (um reinvestimento posterior adia o
+    payback). Fracionário: interpola dentro do ano do cruzamento. NaN para as
+    linhas que terminam o horizonte sem se pagar.
+    """
+    fluxos = np.asarray(fluxos, dtype=float)
+    periodos = fluxos.shape[-1]
+    acumulado = np.cumsum(fluxos * _fatores_desconto(taxa_desconto, periodos), axis=-1)
+    negativo = acumulado < 0
+    # Ano seguinte ao último acumulado negativo (0 se nunca fica negativo)
+    ano = np.where(
+        negativo.any(axis=-1), periodos - np.argmax(negativo[..., ::-1], axis=-1), 0
+    )
+    recuperado = ano < periodos
+    ano = np.minimum(ano, periodos - 1)
+    anterior = np.take_along_axis(
+        acumulado, np.maximum(ano - 1, 0)[..., None], axis=-1
+    )[..., 0]
+    atual = np.take_along_axis(acumulado, ano[..., None], axis=-1)[..., 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fracao = np.where(ano > 0, (ano - 1) - anterior / (atual - anterior), 0.0)
+    return np.where(recuperado, fracao, np.nan)
+
+
+def avaliar_fluxos(fluxos, taxas_desconto=TAXAS_DESCONTO_PADRAO):
+    """VPL por taxa, TIR, payback simples e payback descontado por taxa."""
+    fluxos = np.atleast_2d(np.asarray(fluxos, dtype=float))
+    taxas_desconto = np.atleast_1d(np.asarray(taxas_desconto, dtype=float))
+    return {
+        "taxas_desconto": taxas_desconto,
+        "vpl": vpl(fluxos, taxas_desconto),
+        "tir": tir(fluxos),
+        "payback": payback(fluxos),
+        "payback_descontado": np.stack(
+            [payback(fluxos, taxa) for taxa in taxas_desconto], axis=-1
+        ),
+    }
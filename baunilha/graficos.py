@@ -0,0 +1,102 @@
+"""Dados dos gráficos: só as colunas usadas, com número de pontos limitado.
+
+Cada gráfico do Altair leva a tabela inteira para o navegador. Aqui as
+tabelas são reduzidas antes: `dados_grafico` mantém apenas as colunas
+codificadas e reduz a tabela a no máximo `limite` pontos com o LTTB
+(Largest-Triangle-Three-Buckets), que preserva picos e a forma da curva.
+Várias colunas `y` são reduzidas juntas, somando as áreas de cada uma
+(normalizada). Com `serie`, o limite vale para o gráfico todo e é dividido
+entre as séries, de modo que o tamanho da página não cresce com o horizonte,
+com o número de colunas nem com o número de coortes.
+"""
+
+import numpy as np
+
+LIMITE_PONTOS = 1000
+
+
+def lttb(x, y, limite):
+    """Índices dos pontos escolhidos pelo LTTB, em ordem crescente de `x`.
+
+    O primeiro e o último ponto sempre ficam; os demais são divididos em
+    `limite - 2` baldes e, de cada balde, fica o ponto que forma o maior
+    triângulo com o ponto escolhido no balde anterior e a média do seguinte.
+    Se `y` tem uma coluna por série (n x k), vale a soma das áreas.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float).reshape(len(x), -1)
+    n = len(x)
+    if limite >= n:
+        return np.arange(n)
+    if limite < 3:
+        return np.array([0, n - 1][: max(limite, 0)], dtype=np.int64)
+
+    bordas = np.linspace(1, n - 1, limite - 1).astype(np.int64)
+    escolhidos = np.empty(limite, dtype=np.int64)
+    escolhidos[0], escolhidos[-1] = 0, n - 1
+    anterior = 0
+    for balde in range(limite - 2):
+        inicio, fim = bordas[balde], bordas[balde + 1]
+        proximo_fim = bordas[balde + 2] if balde + 2 < len(bordas) else n
+        x_media = x[fim:proximo_fim].mean()
+        y_media = y[fim:proximo_fim].mean(axis=0)
+        areas = np.abs(
+            (x[anterior] - x_media) * (y[inicio:fim] - y[anterior])
+            - (x[anterior] - x[inicio:fim, None]) * (y_media - y[anterior])
+        ).sum(axis=1)
+        anterior = inicio + int(np.argmax(areas))
+        escolhidos[balde + 1] = anterior
+    return escolhidos
+
+
+def _reduzir(colunas, x, y, limite):
+    """Até `limite` índices, escolhidos pelo LTTB sobre todas as colunas de `y`."""
+    ordem = np.argsort(colunas[x], kind="stable")
+    if len(ordem) <= limite:
+        return ordem
+    # Cada coluna em [0, 1], para que a de maior escala não decida sozinha
+    valores = np.column_stack([colunas[nome][ordem] for nome in y]).astype(float)
+    minimos = valores.min(axis=0)
+    amplitudes = valores.max(axis=0) - minimos
+    valores = (valores - minimos) / np.where(amplitudes > 0, amplitudes, 1.0)
+    return ordem[lttb(colunas[x][ordem], valores, limite)]
+
+
+def _repartir(tamanhos, limite):
+    """Pontos de cada série, somando no máximo `limite`.
+
+    As séries menores que a cota ficam inteiras e a sobra vai para as demais.
+    """
+    cotas = np.zeros(len(tamanhos), dtype=np.int64)
+    restante = limite
+    for posicao, serie in enumerate(np.argsort(tamanhos, kind="stable")):
+        cotas[serie] = min(tamanhos[serie], restante // (len(tamanhos) - posicao))
+        restante -= cotas[serie]
+    return cotas
+
+
+def dados_grafico(tabela, x, y, serie=None, limite=LIMITE_PONTOS, extras=()):
+    """DataFrame só com as colunas `x`, `y`, `serie` e `extras`, reduzido.
+
+    `tabela` é um DataFrame ou um dicionário de colunas; `y` é uma coluna ou
+    uma lista delas (uma por gráfico que compartilha os dados). `extras` são
+    colunas do tooltip, que acompanham os pontos mas não definem a redução.
+    """
+    import pandas as pd
+
+    y = [y] if isinstance(y, str) else list(y)
+    nomes = list(dict.fromkeys([x, *y, *([serie] if serie else []), *extras]))
+    colunas = {nome: np.asarray(tabela[nome]) for nome in nomes}
+
+    if serie is None:
+        indices = _reduzir(colunas, x, y, limite)
+    else:
+        grupos = pd.unique(colunas[serie])
+        posicoes_grupos = [np.flatnonzero(colunas[serie] == grupo) for grupo in grupos]
+        cotas = _repartir([len(posicoes) for posicoes in posicoes_grupos], limite)
+        partes = []
+        for posicoes, cota in zip(posicoes_grupos, cotas):
+            da_serie = {nome: valores[posicoes] for nome, valores in colunas.items()}
+            partes.append(posicoes[_reduzir(da_serie, x, y, cota)])
+        indices = np.concatenate(partes) if partes else np.arange(0)
+    return pd.DataFrame({nome: valores[indices] for nome, valores in colunas.items()})
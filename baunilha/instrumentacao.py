@@ -0,0 +1,313 @@
+"""Instrumentação dos caminhos críticos: tempos, contadores e perfis.
+
+`medir(nome)` cronometra um trecho e `contar(nome)` incrementa um contador.
+Os dois alimentam o registro global `METRICAS`, exportável em formato
+Prometheus (`METRICAS.prometheus()`) ou JSON lines (`METRICAS.exportar_jsonl`),
+e também o registro da requisição aberta com `requisicao()`, se houver. É
+assim que o app sabe quanto tempo cada seção levou e quanto trabalho o motor
+fez em uma execução da página: curvas por muda montadas
+(`modelo.curvas_por_muda`, só nas falhas do cache), avaliações do motor de
+coortes (`coortes.*`) e chamadas às funções de produtividade.
+
+Variáveis de ambiente:
+
+- `BAUNILHA_PERFIL=cprofile|tracemalloc|ambos`: perfila cada requisição; o
+  resultado fica em `Requisicao.perfil` e `Requisicao.memoria`. O tracemalloc
+  é global ao processo, então com várias sessões simultâneas a memória
+  medida inclui a das outras.
+- `BAUNILHA_METRICAS_JSONL=<arquivo>`: acrescenta uma linha por requisição.
+"""
+
+import contextvars
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+
+MODOS_PERFIL = ("cprofile", "tracemalloc", "ambos")
+
+# Limites (em segundos) dos baldes do histograma de duração
+LIMITES_DURACAO = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class RegistroMetricas:
+    """Contadores e histogramas de duração, seguros entre threads.
+
+    Cada thread soma os seus contadores num dicionário próprio, sem trava (o
+    caminho quente: `contar` roda a cada chamada das funções do motor), e a
+    leitura junta os de todas as threads.
+    """
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._locais = threading.local()
+        self._parciais = []  # (thread, contadores) das threads vivas
+        self._encerrados = {}  # somas das threads que já terminaram
+        self._descontados = {}  # valores no último `limpar`
+        self.duracoes = {}
+
+    def _parcial(self):
+        try:
+            return self._locais.contadores
+        except AttributeError:
+            contadores = self._locais.contadores = {}
+            with self._trava:
+                self._parciais.append((threading.current_thread(), contadores))
+            return contadores
+
+    def contar(self, nome, quantidade=1):
+        contadores = self._parcial()
+        contadores[nome] = contadores.get(nome, 0) + quantidade
+
+    def _somar_contadores(self):
+        # Chamado com a trava. Só a thread dona escreve no seu dicionário, e
+        # a cópia é atômica sob o GIL; o de uma thread encerrada não muda mais
+        total = dict(self._encerrados)
+        vivos = []
+        for thread, parcial in self._parciais:
+            copia = parcial.copy()
+            if not thread.is_alive():
+                for nome, valor in copia.items():
+                    self._encerrados[nome] = self._encerrados.get(nome, 0) + valor
+            else:
+                vivos.append((thread, parcial))
+            for nome, valor in copia.items():
+                total[nome] = total.get(nome, 0) + valor
+        self._parciais = vivos
+        return total
+
+    @property
+    def contadores(self):
+        with self._trava:
+            return self._contadores()
+
+    def _contadores(self):
+        total = self._somar_contadores()
+        return {
+            nome: valor - self._descontados.get(nome, 0)
+            for nome, valor in total.items()
+            if valor != self._descontados.get(nome, 0)
+        }
+
+    def registrar_duracao(self, nome, segundos):
+        with self._trava:
+            resumo = self.duracoes.get(nome)
+            if resumo is None:
+                resumo = self.duracoes[nome] = {
+                    "contagem": 0,
+                    "soma": 0.0,
+                    "maximo": 0.0,
+                    "baldes": [0] * len(LIMITES_DURACAO),
+                }
+            resumo["contagem"] += 1
+            resumo["soma"] += segundos
+            resumo["maximo"] = max(resumo["maximo"], segundos)
+            # Baldes cumulativos, como no histograma do Prometheus
+            for i, limite in enumerate(LIMITES_DURACAO):
+                if segundos <= limite:
+                    resumo["baldes"][i] += 1
+
+    def instantaneo(self):
+        with self._trava:
+            return {
+                "contadores": self._contadores(),
+                "duracoes": {
+                    nome: {**resumo, "baldes": list(resumo["baldes"])}
+                    for nome, resumo in self.duracoes.items()
+                },
+            }
+
+    def limpar(self):
+        with self._trava:
+            # As threads seguem somando nos seus dicionários: zerar é
+            # descontar o total de agora
+            self._descontados = self._somar_contadores()
+            self.duracoes.clear()
+
+    def prometheus(self, prefixo="baunilha"):
+        """Métricas no formato de texto do Prometheus."""
+        estado = self.instantaneo()
+        linhas = [f"# TYPE {prefixo}_eventos_total counter"]
+        for nome, valor in sorted(estado["contadores"].items()):
+            linhas.append(f'{prefixo}_eventos_total{{nome="{_rotulo(nome)}"}} {valor}')
+
+        metrica = f"{prefixo}_duracao_segundos"
+        linhas.append(f"# TYPE {metrica} histogram")
+        for nome, resumo in sorted(estado["duracoes"].items()):
+            trecho = f'trecho="{_rotulo(nome)}"'
+            for limite, contagem in zip(LIMITES_DURACAO, resumo["baldes"]):
+                linhas.append(f'{metrica}_bucket{{{trecho},le="{limite}"}} {contagem}')
+            linhas.append(
+                f'{metrica}_bucket{{{trecho},le="+Inf"}} {resumo["contagem"]}'
+            )
+            linhas.append(f"{metrica}_sum{{{trecho}}} {resumo['soma']}")
+            linhas.append(f"{metrica}_count{{{trecho}}} {resumo['contagem']}")
+        return "\n".join(linhas) + "\n"
+
+    def exportar_jsonl(self, caminho):
+        """Acrescenta o estado atual das métricas como uma linha JSON."""
+        _acrescentar_jsonl(caminho, {"momento": time.time(), **self.instantaneo()})
+
+
+def _rotulo(valor):
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _acrescentar_jsonl(caminho, registro):
+    with open(caminho, "a", encoding="utf-8") as arquivo:
+        arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+
+METRICAS = RegistroMetricas()
+
+
+class Requisicao:
+    """Tempos, contadores e perfis de uma execução (por exemplo, um rerun)."""
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.inicio = time.time()
+        self.segundos = None
+        self.trechos = []
+        self.contadores = {}
+        self.perfil = None
+        self.memoria = None
+
+    def como_dicionario(self):
+        return {
+            "requisicao": self.nome,
+            "inicio": self.inicio,
+            "segundos": self.segundos,
+            "trechos": [
+                {"nome": nome, "segundos": segundos} for nome, segundos in self.trechos
+            ],
+            "contadores": self.contadores,
+            "memoria": self.memoria,
+        }
+
+
+_requisicao_atual = contextvars.ContextVar("requisicao_baunilha", default=None)
+
+
+def requisicao_atual():
+    return _requisicao_atual.get()
+
+
+def contar(nome, quantidade=1):
+    METRICAS.contar(nome, quantidade)
+    requisicao = _requisicao_atual.get()
+    if requisicao is not None:
+        requisicao.contadores[nome] = requisicao.contadores.get(nome, 0) + quantidade
+
+
+@contextmanager
+def medir(nome):
+    """Cronometra o bloco e registra a duração sob `nome`."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        segundos = time.perf_counter() - inicio
+        METRICAS.registrar_duracao(nome, segundos)
+        requisicao = _requisicao_atual.get()
+        if requisicao is not None:
+            requisicao.trechos.append((nome, segundos))
+
+
+def medido(nome):
+    """Decorador equivalente a envolver a função inteira em `medir(nome)`."""
+
+    def decorador(funcao):
+        @wraps(funcao)
+        def envolvida(*args, **kwargs):
+            with medir(nome):
+                return funcao(*args, **kwargs)
+
+        return envolvida
+
+    return decorador
+
+
+def modo_perfil():
+    modo = os.environ.get("BAUNILHA_PERFIL", "").lower()
+    return modo if modo in MODOS_PERFIL else None
+
+
+class _Perfilador:
+    def __init__(self, modo):
+        self.cprofile = None
+        self.tracemalloc = False
+        self.iniciou_tracemalloc = False
+        if modo in ("cprofile", "ambos"):
+            self.cprofile = cProfile.Profile()
+            try:
+                self.cprofile.enable()
+            except ValueError:  # outro perfilador já está ativo no processo
+                self.cprofile = None
+        if modo in ("tracemalloc", "ambos"):
+            self.tracemalloc = True
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.iniciou_tracemalloc = True
+            tracemalloc.reset_peak()
+
+    def finalizar(self, requisicao, linhas=25):
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            saida = io.StringIO()
+            pstats.Stats(self.cprofile, stream=saida).sort_stats(
+                "cumulative"
+            ).print_stats(linhas)
+            requisicao.perfil = saida.getvalue()
+        if self.tracemalloc:
+            atual, pico = tracemalloc.get_traced_memory()
+            maiores = tracemalloc.take_snapshot().statistics("lineno")[:10]
+            requisicao.memoria = {
+                "atual_bytes": atual,
+                "pico_bytes": pico,
+                "maiores_alocacoes": [str(estatistica) for estatistica in maiores],
+            }
+            if self.iniciou_tracemalloc:
+                tracemalloc.stop()
+
+
+def iniciar_requisicao(nome, perfil=None):
+    """Abre o registro de uma requisição no contexto atual.
+
+    `perfil` é um de `MODOS_PERFIL`; quando não informado, vem de
+    `BAUNILHA_PERFIL`. Feche com `finalizar_requisicao`.
+    """
+    requisicao = Requisicao(nome)
+    requisicao._token = _requisicao_atual.set(requisicao)
+    modo = perfil or modo_perfil()
+    requisicao._perfilador = _Perfilador(modo) if modo else None
+    requisicao._inicio_relogio = time.perf_counter()
+    return requisicao
+
+
+def finalizar_requisicao(requisicao):
+    requisicao.segundos = time.perf_counter() - requisicao._inicio_relogio
+    if requisicao._perfilador is not None:
+        requisicao._perfilador.finalizar(requisicao)
+    _requisicao_atual.reset(requisicao._token)
+    METRICAS.registrar_duracao(f"requisicao.{requisicao.nome}", requisicao.segundos)
+
+    caminho = os.environ.get("BAUNILHA_METRICAS_JSONL")
+    if caminho:
+        _acrescentar_jsonl(caminho, requisicao.como_dicionario())
+    return requisicao
+
+
+@contextmanager
+def requisicao(nome, perfil=None):
+    registro = iniciar_requisicao(nome, perfil)
+    try:
+        yield registro
+    finally:
+        finalizar_requisicao(registro)
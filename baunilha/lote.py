@@ -0,0 +1,283 @@
+"""Execução em lote de cenários a partir de uma tabela CSV ou Parquet.
+
+Cada linha da tabela descreve uma fazenda (`num_mudas`, `anos`, `sistema`,
+`usar_modelo_linear` e, opcionalmente, `faturamento_objetivo`,
+`taxa_crescimento_maxima` (padrão 1.5) e `taxa_desconto`). As linhas são
+lidas de forma preguiçosa, agrupadas em blocos e distribuídas entre
+processos; os resultados são gravados na ordem de entrada assim que cada
+bloco termina. No máximo `2 * processos` blocos ficam em memória ao mesmo
+tempo, então o consumo não depende do tamanho da tabela. VPL, TIR e payback
+(`baunilha.financeiro`) são calculados de uma vez para o bloco inteiro.
+"""
+
+import csv
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from .coortes import calcular_curva_receita_por_muda, calcular_faturamento_anual_coortes
+from .exportacao import json_finito
+from .financeiro import (
+    TAXA_DESCONTO_PADRAO,
+    fluxos_projecao,
+    payback,
+    tir,
+    vpl_por_cenario,
+)
+from .modelo import CULTURA_PADRAO, calcular_area_necessaria, calcular_cumulativo
+from .solver import resolver_plano
+
+COLUNAS_SAIDA = [
+    "linha",
+    "num_mudas",
+    "anos",
+    "sistema",
+    "usar_modelo_linear",
+    "faturamento_objetivo",
+    "taxa_crescimento_maxima",
+    "taxa_desconto",
+    "area_necessaria",
+    "producao_total_kg",
+    "numero_favas",
+    "faturamento_bruto",
+    "faturamento_liquido",
+    "vpl",
+    "tir",
+    "payback_anos",
+    "plano_possivel",
+    "taxa_crescimento",
+    "faturamento_maximo",
+    "mudas_minimas",
+    "anos_necessarios",
+    "faturamento_plano",
+]
+
+TAXA_CRESCIMENTO_MAXIMA_PADRAO = 1.5
+
+_VERDADEIROS = {"1", "true", "sim", "s", "yes", "y", "verdadeiro"}
+
+
+def ler_booleano(valor):
+    if isinstance(valor, str):
+        return valor.strip().lower() in _VERDADEIROS
+    return bool(valor)
+
+
+def _ler_opcional(valor):
+    if valor is None or valor == "":
+        return None
+    valor = float(valor)
+    return None if valor != valor else valor  # NaN do Parquet/pandas
+
+
+def normalizar_cenario(linha):
+    """Converte uma linha da tabela (strings do CSV ou tipos do Parquet)."""
+    taxa_maxima = _ler_opcional(linha.get("taxa_crescimento_maxima"))
+    return {
+        "num_mudas": float(linha["num_mudas"]),
+        "anos": int(float(linha.get("anos", linha.get("anos_projecao")))),
+        "sistema": linha.get("sistema") or "SAF",
+        "usar_modelo_linear": ler_booleano(linha.get("usar_modelo_linear", False)),
+        "faturamento_objetivo": _ler_opcional(linha.get("faturamento_objetivo")),
+        "taxa_crescimento_maxima": (
+            TAXA_CRESCIMENTO_MAXIMA_PADRAO if taxa_maxima is None else taxa_maxima
+        ),
+        "taxa_desconto": _ler_opcional(linha.get("taxa_desconto")),
+    }
+
+
+def avaliar_cenario(cenario, cultura=None):
+    cultura = cultura or CULTURA_PADRAO
+    num_mudas = cenario["num_mudas"]
+    anos = cenario["anos"]
+    resultados_cumulativos, _ = calcular_cumulativo(
+        num_mudas, anos, cenario["usar_modelo_linear"], cultura
+    )
+    resultado = {
+        **cenario,
+        "area_necessaria": calcular_area_necessaria(
+            num_mudas, cenario["sistema"], cultura
+        ),
+        "producao_total_kg": resultados_cumulativos["Produção Total (kg)"],
+        "numero_favas": resultados_cumulativos["Número de Favas"],
+        "faturamento_bruto": resultados_cumulativos["Faturamento Bruto (US$)"],
+        "faturamento_liquido": resultados_cumulativos["Faturamento Líquido (US$)"],
+    }
+
+    if cenario["faturamento_objetivo"] is not None:
+        # Mesmo critério de calcular_plano_acao, sem montar as tabelas do plano
+        curva = calcular_curva_receita_por_muda(max(anos, 15), cultura=cultura)
+        solucao = resolver_plano(
+            num_mudas,
+            cenario["faturamento_objetivo"],
+            anos,
+            curva,
+            cenario["taxa_crescimento_maxima"],
+            margem=cultura.margem_lucro_plano,
+        )
+        resultado.update(
+            {
+                "plano_possivel": solucao["possivel"],
+                "faturamento_maximo": solucao["faturamento_maximo"],
+                "mudas_minimas": solucao["mudas_minimas"],
+                "anos_necessarios": solucao["anos_necessarios"],
+            }
+        )
+        if solucao["possivel"]:
+            resultado["taxa_crescimento"] = solucao["taxa_crescimento"]
+            resultado["faturamento_plano"] = float(
+                calcular_faturamento_anual_coortes(
+                    num_mudas,
+                    solucao["taxa_crescimento"],
+                    anos,
+                    cultura.margem_lucro,
+                    curva,
+                ).sum()
+            )
+    return resultado
+
+
+def _indicadores_financeiros(cenarios, cultura=None):
+    """VPL, TIR e payback de vários cenários, vetorizados."""
+    fluxos = fluxos_projecao(
+        [cenario["num_mudas"] for cenario in cenarios],
+        [cenario["anos"] for cenario in cenarios],
+        [cenario["usar_modelo_linear"] for cenario in cenarios],
+        cultura,
+    )
+    taxas = [cenario["taxa_desconto"] for cenario in cenarios]
+    indicadores = zip(vpl_por_cenario(fluxos, taxas), tir(fluxos), payback(fluxos))
+    # NaN (TIR sem raiz, payback fora do horizonte) vira campo vazio
+    return [
+        {
+            nome: None if valor != valor else float(valor)
+            for nome, valor in zip(("vpl", "tir", "payback_anos"), valores)
+        }
+        for valores in indicadores
+    ]
+
+
+# Perfil do processo do pool, recebido uma vez pelo `initializer`: enviado
+# com cada bloco, seria recompilado a cada tarefa (veja `PerfilCultura.__reduce__`)
+_cultura_processo = None
+
+
+def _iniciar_processo(cultura):
+    global _cultura_processo
+    _cultura_processo = cultura
+
+
+def _avaliar_bloco(bloco, cultura=None):
+    cultura = cultura or _cultura_processo
+    cenarios = [normalizar_cenario(linha) for _, linha in bloco]
+    for cenario in cenarios:
+        if cenario["taxa_desconto"] is None:
+            cenario["taxa_desconto"] = TAXA_DESCONTO_PADRAO
+    return [
+        {"linha": indice, **avaliar_cenario(cenario, cultura), **indicadores}
+        for (indice, _), cenario, indicadores in zip(
+            bloco, cenarios, _indicadores_financeiros(cenarios, cultura)
+        )
+    ]
+
+
+def ler_cenarios(caminho):
+    """Itera as linhas de um CSV ou Parquet como dicionários, sem carregar tudo."""
+    if caminho.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        arquivo = pq.ParquetFile(caminho)
+        for lote in arquivo.iter_batches():
+            yield from lote.to_pylist()
+    else:
+        with open(caminho, newline="", encoding="utf-8") as arquivo:
+            yield from csv.DictReader(arquivo)
+
+
+class _EscritorResultados:
+    def __init__(self, caminho):
+        self.jsonl = caminho.endswith(".jsonl")
+        self._arquivo = open(caminho, "w", newline="", encoding="utf-8")
+        if not self.jsonl:
+            self._csv = csv.DictWriter(
+                self._arquivo, fieldnames=COLUNAS_SAIDA, extrasaction="ignore"
+            )
+            self._csv.writeheader()
+
+    def escrever(self, resultados):
+        if self.jsonl:
+            # Infinity/NaN (mudas mínimas sem faturamento) viram null
+            for resultado in resultados:
+                self._arquivo.write(json_finito(resultado, ensure_ascii=False) + "\n")
+        else:
+            self._csv.writerows(resultados)
+
+    def fechar(self):
+        self._arquivo.close()
+
+
+def _blocos(linhas, tamanho_bloco):
+    numeradas = enumerate(linhas)
+    while True:
+        bloco = list(islice(numeradas, tamanho_bloco))
+        if not bloco:
+            return
+        yield bloco
+
+
+def executar_lote(
+    caminho_entrada,
+    caminho_saida,
+    processos=None,
+    tamanho_bloco=256,
+    progresso=None,
+    cultura=None,
+):
+    """Avalia todos os cenários da tabela e grava os resultados em CSV ou JSONL.
+
+    `processos=1` roda tudo no processo atual. `progresso`, se informado, é
+    chamado com (linhas processadas, segundos decorridos) a cada bloco.
+    `cultura` é o perfil usado em todos os cenários (padrão: baunilha).
+    Retorna um dicionário com o total de linhas, o tempo e as linhas/s.
+    """
+    processos = processos or os.cpu_count() or 1
+    blocos = _blocos(ler_cenarios(caminho_entrada), tamanho_bloco)
+    escritor = _EscritorResultados(caminho_saida)
+    linhas = 0
+    inicio = time.perf_counter()
+
+    def registrar(resultados):
+        nonlocal linhas
+        escritor.escrever(resultados)
+        linhas += len(resultados)
+        if progresso is not None:
+            progresso(linhas, time.perf_counter() - inicio)
+
+    try:
+        if processos == 1:
+            for bloco in blocos:
+                registrar(_avaliar_bloco(bloco, cultura))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=processos,
+                initializer=_iniciar_processo,
+                initargs=(cultura,),
+            ) as executor:
+                pendentes = deque()
+                for bloco in blocos:
+                    pendentes.append(executor.submit(_avaliar_bloco, bloco))
+                    if len(pendentes) >= 2 * processos:
+                        registrar(pendentes.popleft().result())
+                while pendentes:
+                    registrar(pendentes.popleft().result())
+    finally:
+        escritor.fechar()
+
+    segundos = time.perf_counter() - inicio
+    return {
+        "linhas": linhas,
+        "segundos": segundos,
+        "linhas_por_segundo": linhas / segundos if segundos > 0 else float("inf"),
+    }
@@ -0,0 +1,187 @@
+"""Modelo de produtividade e faturamento da baunilha."""
+
+import numpy as np
+
+from .cache import CacheLRU
+from .cultura import compilar_perfil
+from .instrumentacao import contar
+
+CUSTO_POR_MUDA = 0.85  # US$
+PRECO_EXTRATO_POR_TONELADA = 135435.20  # US$
+
+PRODUCAO_POR_HECTARE = {
+    3: 500,
+    4: 1000,
+    5: 1600,
+    6: 2500,
+}  # kg/ha por ano de idade da muda
+PRODUCAO_MAXIMA_POR_HECTARE = 2750  # kg/ha a partir do sétimo ano
+MUDAS_POR_HECTARE = 4000
+PRODUCAO_FAVAS_MAXIMA = 2500  # kg/ha a partir do qual cada pé dá o máximo de favas
+FAVAS_POR_PE_MAX = 30
+PESO_FAVA_VERDE = 20  # g
+PESO_FAVA_CURADA = 4  # g
+PRECO_FAVA_VERDE = 15  # US$/kg
+PRECO_FAVA_CURADA = 139.75  # US$/kg
+PROPORCAO_FAVAS_EXTRATO = 0.25  # extrato feito com 25% de favas curadas
+MARGEM_LUCRO = 0.2130  # 21.30% do faturamento bruto
+MARGEM_LUCRO_PLANO = 0.22  # margem usada na busca do plano de ação
+
+# Perfil compilado com as constantes acima; usado quando `cultura` não é informada
+CULTURA_PADRAO = compilar_perfil(
+    {
+        "nome": "Baunilha",
+        "custo_por_muda": CUSTO_POR_MUDA,
+        "preco_extrato_por_tonelada": PRECO_EXTRATO_POR_TONELADA,
+        "producao_por_hectare": PRODUCAO_POR_HECTARE,
+        "producao_maxima_por_hectare": PRODUCAO_MAXIMA_POR_HECTARE,
+        "mudas_por_hectare": MUDAS_POR_HECTARE,
+        "producao_favas_maxima": PRODUCAO_FAVAS_MAXIMA,
+        "favas_por_pe_max": FAVAS_POR_PE_MAX,
+        "peso_fava_verde": PESO_FAVA_VERDE,
+        "peso_fava_curada": PESO_FAVA_CURADA,
+        "preco_fava_verde": PRECO_FAVA_VERDE,
+        "preco_fava_curada": PRECO_FAVA_CURADA,
+        "proporcao_favas_extrato": PROPORCAO_FAVAS_EXTRATO,
+        "margem_lucro": MARGEM_LUCRO,
+        "margem_lucro_plano": MARGEM_LUCRO_PLANO,
+        "area_por_muda": {"SAF": 4, "Semi-intensivo": 2.5},  # m² por muda
+        "area_por_muda_outros": 2.5,
+        "idade_referencia_linear": 3,
+    }
+)
+
+
+def calcular_produtividade_baunilha(
+    num_mudas, ano, usar_modelo_linear=False, cultura=None
+):
+    """Produção, favas e valores de `num_mudas` mudas com `ano` anos de idade.
+
+    As contas são as de `PerfilCultura.produtividade`, o núcleo também da
+    versão vetorizada; aqui cada resultado é um float.
+    """
+    contar("calcular_produtividade_baunilha")
+    return (cultura or CULTURA_PADRAO).produtividade_na_idade(
+        num_mudas, ano, usar_modelo_linear
+    )
+
+
+def calcular_produtividade_baunilha_vetorizado(
+    num_mudas, anos, usar_modelo_linear=False, cultura=None
+):
+    """Versão em lote de `calcular_produtividade_baunilha`.
+
+    Recebe arrays (ou escalares) de número de mudas e anos, combinados por
+    broadcasting, e devolve um dicionário com as mesmas nove chaves da versão
+    escalar, cada uma com um array de resultados. Os anos devem ser inteiros.
+    """
+    anos = np.asarray(anos)
+    contar("calcular_produtividade_baunilha_vetorizado")
+    contar(
+        "calcular_produtividade_baunilha_vetorizado.elementos",
+        np.broadcast(np.asarray(num_mudas), anos).size,
+    )
+    return (cultura or CULTURA_PADRAO).produtividade(
+        num_mudas, anos, usar_modelo_linear
+    )
+
+
+# Vive enquanto o módulo estiver importado, ou seja, entre reruns e sessões
+# do Streamlit no mesmo processo
+_cache_curvas = CacheLRU(tamanho_maximo=128)
+
+
+def obter_cache_curvas():
+    return _cache_curvas
+
+
+def parametros_modelo(cultura=None):
+    """Todos os parâmetros do perfil (padrão: baunilha), usados nas chaves de cache."""
+    return (cultura or CULTURA_PADRAO).chave
+
+
+def obter_curvas_por_muda(anos, usar_modelo_linear=False, cultura=None):
+    """Resultados de uma única muda para as idades de 1 a `anos`.
+
+    Todas as saídas do modelo são lineares no número de mudas, então quem
+    chama só precisa multiplicar estes vetores. Os arrays são somente
+    leitura porque são compartilhados entre chamadas. Toda consulta passa
+    pelo cache; numa falha, até `cultura.ANOS_PRECALCULADOS` anos saem prontos
+    do perfil e só horizontes maiores são calculados. `anos` <= 0 dá curvas
+    vazias.
+    """
+    cultura = cultura or CULTURA_PADRAO
+    anos = max(int(anos), 0)
+    chave = (anos, bool(usar_modelo_linear), cultura.chave)
+
+    def calcular():
+        contar("modelo.curvas_por_muda")
+        curvas = cultura.curvas_precalculadas(anos, usar_modelo_linear)
+        if curvas is not None:
+            return curvas
+        curvas = calcular_produtividade_baunilha_vetorizado(
+            1, np.arange(1, anos + 1), usar_modelo_linear, cultura
+        )
+        for curva in curvas.values():
+            curva.setflags(write=False)
+        return curvas
+
+    return obter_cache_curvas().obter(chave, calcular)
+
+
+# Colunas dos resultados anuais e a curva por muda de onde cada uma vem
+COLUNAS_CURVAS = {
+    "Produção Total (kg)": "producao_kg",
+    "Número de Favas": "numero_favas",
+    "Peso Favas Verdes (kg)": "peso_favas_verdes",
+    "Peso Favas Curadas (kg)": "peso_favas_curadas",
+    "Valor Favas Verdes (US$)": "valor_favas_verdes",
+    "Valor Favas Curadas (US$)": "valor_favas_curadas",
+    "Valor Extrato (US$)": "valor_extrato",
+    "Volume Extrato (kg)": "volume_extrato",
+    "Faturamento Bruto (US$)": "valor_extrato",
+}
+
+
+def calcular_cumulativo(num_mudas, anos, usar_modelo_linear=False, cultura=None):
+    """Resultados cumulativos e anuais de `num_mudas` mudas ao longo de `anos`.
+
+    Os resultados anuais são colunares: um dicionário de arrays NumPy (um
+    valor por ano), pronto para `pd.DataFrame`. Os cumulativos são floats.
+    """
+    cultura = cultura or CULTURA_PADRAO
+    curvas = obter_curvas_por_muda(anos, usar_modelo_linear, cultura)
+
+    resultados_anuais = {"Ano": np.arange(1, anos + 1, dtype=np.int64)}
+    for coluna, curva in COLUNAS_CURVAS.items():
+        resultados_anuais[coluna] = curvas[curva] * num_mudas
+
+    lucro_bruto = resultados_anuais["Faturamento Bruto (US$)"] * cultura.margem_lucro
+    if len(lucro_bruto):  # sem anos, o custo só entra no total
+        lucro_bruto[0] -= (
+            num_mudas * cultura.custo_por_muda
+        )  # custo das mudas no primeiro ano
+    resultados_anuais["Faturamento Líquido (US$)"] = lucro_bruto
+
+    resultados_cumulativos = {
+        coluna: float(resultados_anuais[coluna].sum()) for coluna in COLUNAS_CURVAS
+    }
+    resultados_cumulativos["Custo Inicial Mudas (US$)"] = (
+        num_mudas * cultura.custo_por_muda
+    )
+
+    # Calcular o faturamento líquido cumulativo
+    faturamento_bruto_total = resultados_cumulativos["Faturamento Bruto (US$)"]
+    custo_inicial_mudas = resultados_cumulativos["Custo Inicial Mudas (US$)"]
+    lucro_bruto = faturamento_bruto_total * cultura.margem_lucro  # 21.30% na baunilha
+    lucro_liquido = lucro_bruto - custo_inicial_mudas
+
+    resultados_cumulativos["Faturamento Líquido (US$)"] = lucro_liquido
+
+    return resultados_cumulativos, resultados_anuais
+
+
+def calcular_area_necessaria(num_mudas, sistema, cultura=None):
+    # 4m² por muda no SAF e 2.5m² no semi-intensivo, na baunilha
+    area_por_muda = (cultura or CULTURA_PADRAO).area_por_muda_m2(sistema)
+    return (num_mudas * area_por_muda) / 10000
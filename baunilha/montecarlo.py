@@ -0,0 +1,255 @@
+"""Simulação de Monte Carlo para preços, produtividade e margem.
+
+Cada sorteio recebe seus próprios valores de preço do extrato, margem,
+fator de produtividade (multiplica a tabela de kg/ha), peso da fava curada e
+custo da muda. O modelo é avaliado como álgebra de arrays (sorteios x anos),
+em blocos de tamanho fixo para limitar a memória. Os sorteios vêm de grupos de
+`SORTEIOS_POR_GERADOR`, cada um com seu próprio gerador derivado da semente,
+então o resultado é o mesmo qualquer que seja o tamanho dos blocos e com ou
+sem processos paralelos.
+
+As distribuições são dadas como `{parametro: (tipo, *argumentos)}`:
+
+- `("fixo", valor)`
+- `("uniforme", minimo, maximo)`
+- `("triangular", minimo, moda, maximo)`
+- `("normal", media, desvio)`
+- `("lognormal", media, desvio)` (da variável, não do logaritmo)
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .modelo import (
+    CULTURA_PADRAO,
+    CUSTO_POR_MUDA,
+    MARGEM_LUCRO,
+    PESO_FAVA_CURADA,
+    PRECO_EXTRATO_POR_TONELADA,
+    obter_curvas_por_muda,
+)
+
+DISTRIBUICOES_PADRAO = {
+    "preco_extrato": (
+        "triangular",
+        0.8 * PRECO_EXTRATO_POR_TONELADA,
+        PRECO_EXTRATO_POR_TONELADA,
+        1.2 * PRECO_EXTRATO_POR_TONELADA,
+    ),
+    "margem": ("triangular", 0.18, MARGEM_LUCRO, 0.24),
+    "fator_produtividade": ("normal", 1.0, 0.15),
+    "peso_fava_curada": ("triangular", 3.5, PESO_FAVA_CURADA, 4.5),
+    "custo_por_muda": ("fixo", CUSTO_POR_MUDA),
+}
+
+QUANTIS_PADRAO = (0.1, 0.5, 0.9)
+
+# Tamanho dos grupos de sorteios com gerador próprio
+SORTEIOS_POR_GERADOR = 16_384
+
+
+def _amostrar(distribuicao, n, gerador):
+    tipo, *argumentos = distribuicao
+    if tipo == "fixo":
+        return np.full(n, float(argumentos[0]))
+    if tipo == "uniforme":
+        return gerador.uniform(*argumentos, size=n)
+    if tipo == "triangular":
+        return gerador.triangular(*argumentos, size=n)
+    if tipo == "normal":
+        return gerador.normal(*argumentos, size=n)
+    if tipo == "lognormal":
+        media, desvio = argumentos
+        sigma2 = np.log1p((desvio / media) ** 2)
+        return gerador.lognormal(np.log(media) - sigma2 / 2, np.sqrt(sigma2), size=n)
+    raise ValueError(f"Distribuição desconhecida: {tipo!r}")
+
+
+def amostrar_parametros(n, gerador, distribuicoes=None):
+    """Sorteia `n` valores de cada parâmetro; os ausentes usam o padrão."""
+    distribuicoes = {**DISTRIBUICOES_PADRAO, **(distribuicoes or {})}
+    amostras = {
+        nome: _amostrar(distribuicao, n, gerador)
+        for nome, distribuicao in distribuicoes.items()
+    }
+    # Valores fisicamente impossíveis são truncados em vez de descartados
+    amostras["preco_extrato"] = np.maximum(amostras["preco_extrato"], 0)
+    amostras["margem"] = np.clip(amostras["margem"], 0, 1)
+    amostras["fator_produtividade"] = np.maximum(amostras["fator_produtividade"], 0)
+    amostras["peso_fava_curada"] = np.maximum(amostras["peso_fava_curada"], 0)
+    return amostras
+
+
+def _curvas_sorteadas(amostras, anos, usar_modelo_linear, cultura=None):
+    """Produção (kg) e valor do extrato (US$) por muda, por sorteio e idade."""
+    cultura = cultura or CULTURA_PADRAO
+    producao_por_hectare = (
+        obter_curvas_por_muda(anos, usar_modelo_linear, cultura)["producao_kg"]
+        * cultura.mudas_por_hectare
+    )
+    producao_ha = amostras["fator_produtividade"][:, None] * producao_por_hectare
+    fator_producao = np.minimum(1, producao_ha / cultura.producao_favas_maxima)
+    favas_por_pe = cultura.favas_por_pe_max * fator_producao
+    volume_extrato = (
+        favas_por_pe
+        * amostras["peso_fava_curada"][:, None]
+        / 1000
+        / cultura.proporcao_favas_extrato
+    )
+    valor_extrato = (volume_extrato / 1000) * amostras["preco_extrato"][:, None]
+    return producao_ha / cultura.mudas_por_hectare, valor_extrato
+
+
+def avaliar_cumulativo(num_mudas, anos, usar_modelo_linear, parametros, cultura=None):
+    """Totais de `calcular_cumulativo` para vários conjuntos de parâmetros.
+
+    `parametros` tem um array por parâmetro (as chaves de
+    `DISTRIBUICOES_PADRAO`), todos do mesmo tamanho; cada posição é um
+    cenário avaliado na mesma passada vetorizada. `cultura` dá as constantes
+    que não são sorteadas (padrão: baunilha).
+    """
+    producao, valor_extrato = _curvas_sorteadas(
+        parametros, anos, usar_modelo_linear, cultura
+    )
+    faturamento_bruto = valor_extrato.sum(axis=1) * num_mudas
+    custo_mudas = num_mudas * parametros["custo_por_muda"]
+    return {
+        "producao_total_kg": producao.sum(axis=1) * num_mudas,
+        "faturamento_bruto": faturamento_bruto,
+        "faturamento_liquido": faturamento_bruto * parametros["margem"] - custo_mudas,
+    }
+
+
+def _amostrar_intervalo(entropia, inicio, fim, distribuicoes):
+    """Parâmetros dos sorteios `inicio` a `fim - 1`.
+
+    O sorteio i sempre sai do grupo i // `SORTEIOS_POR_GERADOR`, sorteado
+    inteiro com o gerador do grupo, e não depende de como os blocos foram
+    divididos.
+    """
+    primeiro = inicio // SORTEIOS_POR_GERADOR
+    ultimo = (fim - 1) // SORTEIOS_POR_GERADOR
+    grupos = [
+        amostrar_parametros(
+            SORTEIOS_POR_GERADOR,
+            np.random.default_rng(np.random.SeedSequence(entropia, spawn_key=(i,))),
+            distribuicoes,
+        )
+        for i in range(primeiro, ultimo + 1)
+    ]
+    deslocamento = primeiro * SORTEIOS_POR_GERADOR
+    return {
+        nome: np.concatenate([grupo[nome] for grupo in grupos])[
+            inicio - deslocamento : fim - deslocamento
+        ]
+        for nome in grupos[0]
+    }
+
+
+def _simular_bloco_cumulativo(
+    entropia, inicio, fim, num_mudas, anos, usar_modelo_linear, distribuicoes
+):
+    amostras = _amostrar_intervalo(entropia, inicio, fim, distribuicoes)
+    return avaliar_cumulativo(num_mudas, anos, usar_modelo_linear, amostras)
+
+
+def _simular_bloco_plano(
+    entropia, inicio, fim, mudas_inicial, taxa_crescimento, anos, distribuicoes
+):
+    amostras = _amostrar_intervalo(entropia, inicio, fim, distribuicoes)
+    _, valor_extrato = _curvas_sorteadas(amostras, anos, False)
+    # Mesma conta de calcular_faturamento_total_coortes, para todos os sorteios
+    receita_acumulada = np.cumsum(valor_extrato, axis=1)[:, ::-1]
+    potencias = taxa_crescimento ** np.arange(anos)
+    faturamento_bruto = mudas_inicial * (receita_acumulada @ potencias)
+    # Equivale ao "Faturamento Acumulado (US$)" do último ano do plano
+    return {
+        "faturamento_bruto": faturamento_bruto,
+        "faturamento_plano": faturamento_bruto * amostras["margem"],
+    }
+
+
+def _executar(funcao, argumentos, sorteios, semente, processos, tamanho_bloco):
+    # A entropia é fixada aqui para que `semente=None` dê um único fluxo
+    entropia = np.random.SeedSequence(semente).entropy
+    tarefas = [
+        (entropia, inicio, min(inicio + tamanho_bloco, sorteios), *argumentos)
+        for inicio in range(0, sorteios, tamanho_bloco)
+    ]
+
+    processos = processos or os.cpu_count() or 1
+    if processos == 1 or len(tarefas) == 1:
+        blocos = [funcao(*tarefa) for tarefa in tarefas]
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            blocos = list(executor.map(funcao, *zip(*tarefas)))
+
+    return {
+        chave: np.concatenate([bloco[chave] for bloco in blocos]) for chave in blocos[0]
+    }
+
+
+def simular_cumulativo(
+    num_mudas,
+    anos,
+    usar_modelo_linear=False,
+    sorteios=10_000,
+    distribuicoes=None,
+    semente=0,
+    processos=1,
+    tamanho_bloco=100_000,
+):
+    """Distribuição dos totais de `calcular_cumulativo` sob incerteza.
+
+    Retorna um dicionário com um array de `sorteios` valores para
+    `producao_total_kg`, `faturamento_bruto` e `faturamento_liquido`.
+    """
+    return _executar(
+        _simular_bloco_cumulativo,
+        (num_mudas, anos, usar_modelo_linear, distribuicoes),
+        sorteios,
+        semente,
+        processos,
+        tamanho_bloco,
+    )
+
+
+def simular_plano(
+    mudas_inicial,
+    taxa_crescimento,
+    anos,
+    sorteios=10_000,
+    distribuicoes=None,
+    semente=0,
+    processos=1,
+    tamanho_bloco=100_000,
+):
+    """Distribuição do faturamento total do modelo de coortes do plano de ação."""
+    return _executar(
+        _simular_bloco_plano,
+        (mudas_inicial, taxa_crescimento, anos, distribuicoes),
+        sorteios,
+        semente,
+        processos,
+        tamanho_bloco,
+    )
+
+
+def tabela_quantis(amostras, quantis=QUANTIS_PADRAO):
+    """`{métrica: {"P10": ..., "P50": ..., "P90": ..., "media": ...}}`."""
+    tabela = {}
+    for metrica, valores in amostras.items():
+        linha = {
+            f"P{round(q * 100)}": valor
+            for q, valor in zip(quantis, np.quantile(valores, quantis))
+        }
+        linha["media"] = float(valores.mean())
+        tabela[metrica] = {chave: float(valor) for chave, valor in linha.items()}
+    return tabela
+
+
+def histograma(valores, classes=50):
+    contagens, bordas = np.histogram(valores, bins=classes)
+    return {"contagens": contagens, "bordas": bordas}
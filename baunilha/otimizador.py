@@ -0,0 +1,209 @@
+"""Planejamento inverso: cronogramas de plantio mais baratos para um objetivo.
+
+Um cronograma é o número de mudas plantadas em cada ano do horizonte. Como a
+receita é linear nas mudas, o faturamento de qualquer cronograma é um
+produto escalar com o vetor `pesos_cronograma` (faturamento de uma muda
+plantada em cada ano até o fim do horizonte), e milhares de cronogramas são
+avaliados com uma única multiplicação de matrizes. Custo (`custo_por_muda`)
+e área (`calcular_area_necessaria`) dependem só do total de mudas. Todas as
+funções aceitam um perfil de cultura (`cultura`); sem `margem`, usam a margem
+do plano de ação do perfil.
+
+Minimizar o custo para atingir um faturamento, com limite de mudas por ano,
+é uma mochila fracionária: plantar o máximo possível nos anos de maior peso
+(os primeiros) é a solução exata. O mesmo vale para maximizar o faturamento
+com orçamento de custo e área.
+"""
+
+import numpy as np
+
+from .coortes import calcular_curva_receita_por_muda
+from .modelo import CULTURA_PADRAO, calcular_area_necessaria
+from .sensibilidade import SISTEMAS
+
+
+def pesos_cronograma(anos, margem=None, usar_modelo_linear=False, cultura=None):
+    """Faturamento, até o fim de `anos`, de uma muda plantada em cada ano."""
+    cultura = cultura or CULTURA_PADRAO
+    if margem is None:
+        margem = cultura.margem_lucro_plano
+    curva = calcular_curva_receita_por_muda(anos, usar_modelo_linear, cultura)
+    return margem * np.cumsum(curva[:anos])[::-1]
+
+
+def avaliar_cronogramas(
+    cronogramas,
+    anos,
+    sistema="SAF",
+    margem=None,
+    usar_modelo_linear=False,
+    cultura=None,
+):
+    """Faturamento, custo e área de vários cronogramas (um por linha)."""
+    cultura = cultura or CULTURA_PADRAO
+    cronogramas = np.atleast_2d(np.asarray(cronogramas, dtype=float))
+    total_mudas = cronogramas.sum(axis=1)
+    pesos = pesos_cronograma(anos, margem, usar_modelo_linear, cultura)
+    return {
+        "faturamento": cronogramas @ pesos,
+        "custo": total_mudas * cultura.custo_por_muda,
+        "area": total_mudas * calcular_area_necessaria(1, sistema, cultura),
+        "mudas": total_mudas,
+    }
+
+
+def cronogramas_geometricos(mudas_iniciais, taxas_crescimento, anos):
+    """Cronogramas da família do plano de ação (`mudas * taxa ** ano`).
+
+    Uma linha para cada combinação de mudas iniciais e taxa de crescimento.
+    """
+    mudas, taxas = np.meshgrid(
+        np.asarray(mudas_iniciais, dtype=float),
+        np.asarray(taxas_crescimento, dtype=float),
+        indexing="ij",
+    )
+    return mudas.reshape(-1, 1) * taxas.reshape(-1, 1) ** np.arange(anos)
+
+
+def _limites_por_ano(mudas_maximas_por_ano, anos):
+    if mudas_maximas_por_ano is None:
+        return np.full(anos, np.inf)
+    return np.broadcast_to(
+        np.asarray(mudas_maximas_por_ano, dtype=float), (anos,)
+    ).copy()
+
+
+def _preencher(pesos, limites, faturamento_objetivo, mudas_disponiveis):
+    """Preenche os anos em ordem de peso até atingir o objetivo ou as mudas."""
+    cronograma = np.zeros(len(pesos))
+    faturamento = 0.0
+    for ano in np.argsort(-pesos, kind="stable"):
+        if pesos[ano] <= 0 or mudas_disponiveis <= 0:
+            break
+        if faturamento >= faturamento_objetivo:
+            break
+        mudas = min(
+            limites[ano],
+            mudas_disponiveis,
+            (faturamento_objetivo - faturamento) / pesos[ano],
+        )
+        cronograma[ano] = mudas
+        faturamento += mudas * pesos[ano]
+        mudas_disponiveis -= mudas
+    return cronograma
+
+
+def otimizar_cronograma(
+    faturamento_objetivo,
+    anos,
+    orcamento_custo=None,
+    orcamento_area=None,
+    mudas_maximas_por_ano=None,
+    sistema="SAF",
+    margem=None,
+    usar_modelo_linear=False,
+    cultura=None,
+):
+    """Cronograma de menor custo que atinge `faturamento_objetivo` em `anos`.
+
+    `mudas_maximas_por_ano` limita o plantio de cada ano (um valor ou um por
+    ano). Se o objetivo não couber nos orçamentos de custo (US$) e área
+    (hectares), o resultado traz `possivel=False` e o cronograma de maior
+    faturamento dentro deles.
+    """
+    cultura = cultura or CULTURA_PADRAO
+    pesos = pesos_cronograma(anos, margem, usar_modelo_linear, cultura)
+    limites = _limites_por_ano(mudas_maximas_por_ano, anos)
+
+    mudas_disponiveis = np.inf
+    if orcamento_custo is not None:
+        mudas_disponiveis = min(
+            mudas_disponiveis, orcamento_custo / cultura.custo_por_muda
+        )
+    if orcamento_area is not None:
+        mudas_disponiveis = min(
+            mudas_disponiveis,
+            orcamento_area / calcular_area_necessaria(1, sistema, cultura),
+        )
+
+    cronograma = _preencher(pesos, limites, faturamento_objetivo, mudas_disponiveis)
+    avaliacao = avaliar_cronogramas(
+        cronograma, anos, sistema, margem, usar_modelo_linear, cultura
+    )
+    # Tolerância relativa para o arredondamento da divisão no último ano
+    possivel = bool(faturamento_objetivo <= avaliacao["faturamento"][0] * (1 + 1e-12))
+    if not possivel:
+        # Objetivo fora de alcance: o maior faturamento dentro dos limites
+        cronograma = _preencher(pesos, limites, np.inf, mudas_disponiveis)
+        avaliacao = avaliar_cronogramas(
+            cronograma, anos, sistema, margem, usar_modelo_linear, cultura
+        )
+    return {
+        "possivel": possivel,
+        "cronograma": cronograma,
+        **{chave: float(valores[0]) for chave, valores in avaliacao.items()},
+    }
+
+
+def fronteira_pareto(custo, faturamento, area):
+    """Máscara dos pontos não dominados (menor custo e área, maior faturamento)."""
+    pontos = np.column_stack(
+        [np.asarray(custo), -np.asarray(faturamento), np.asarray(area)]
+    ).astype(float)
+    restantes = np.lexsort(pontos.T[::-1])
+    nao_dominados = np.zeros(len(pontos), dtype=bool)
+    while restantes.size:
+        # O primeiro na ordem lexicográfica não é dominado por nenhum restante;
+        # ele sai para a fronteira levando junto tudo o que domina (e cópias)
+        ponto = pontos[restantes[0]]
+        nao_dominados[restantes[0]] = True
+        restantes = restantes[~np.all(pontos[restantes] >= ponto, axis=1)]
+    return nao_dominados
+
+
+def explorar_fronteira(
+    anos,
+    faturamentos_alvo,
+    mudas_maximas_por_ano=None,
+    sistemas=SISTEMAS,
+    candidatos=None,
+    margem=None,
+    usar_modelo_linear=False,
+    cultura=None,
+):
+    """Fronteira de Pareto de custo x faturamento x área.
+
+    Para cada sistema avalia o cronograma ótimo de cada faturamento alvo e,
+    se informados, os `candidatos` (matriz de cronogramas, por exemplo de
+    `cronogramas_geometricos`). Retorna colunas só com os não dominados.
+
+    Custo e área são proporcionais ao total de mudas de cada sistema: o
+    compromisso está entre custo e faturamento (com retornos decrescentes
+    quando `mudas_maximas_por_ano` empurra o plantio para anos mais tardios),
+    e a área só distingue os sistemas.
+    """
+    pesos = pesos_cronograma(anos, margem, usar_modelo_linear, cultura)
+    limites = _limites_por_ano(mudas_maximas_por_ano, anos)
+    otimos = np.array(
+        [_preencher(pesos, limites, alvo, np.inf) for alvo in faturamentos_alvo]
+    ).reshape(-1, anos)
+    if candidatos is not None:
+        otimos = np.vstack([otimos, np.asarray(candidatos, dtype=float)])
+
+    colunas = {chave: [] for chave in ("sistema", "cronograma", "faturamento")}
+    colunas.update(custo=[], area=[])
+    for sistema in sistemas:
+        avaliacao = avaliar_cronogramas(
+            otimos, anos, sistema, margem, usar_modelo_linear, cultura
+        )
+        colunas["sistema"].append(np.full(len(otimos), sistema, dtype=object))
+        colunas["cronograma"].append(otimos)
+        for chave in ("faturamento", "custo", "area"):
+            colunas[chave].append(avaliacao[chave])
+    colunas = {chave: np.concatenate(valores) for chave, valores in colunas.items()}
+
+    mascara = fronteira_pareto(
+        colunas["custo"], colunas["faturamento"], colunas["area"]
+    )
+    ordem = np.argsort(colunas["custo"][mascara], kind="stable")
+    return {chave: valores[mascara][ordem] for chave, valores in colunas.items()}
@@ -0,0 +1,136 @@
+"""Plano de ação para atingir um faturamento objetivo."""
+
+import os
+import time
+
+import numpy as np
+
+from .coortes import calcular_curva_receita_por_muda, calcular_faturamento_anual_coortes
+from .instrumentacao import medir
+from .modelo import CULTURA_PADRAO
+from .solver import resolver_plano
+
+
+def calcular_plano_acao(
+    num_mudas_inicial,
+    faturamento_objetivo,
+    anos,
+    taxa_crescimento_maxima=1.5,
+    tolerancia=1e-8,
+    cultura=None,
+    tabela_viabilidade=None,
+):
+    """Plano (DataFrames, taxa de crescimento e informações) para o objetivo.
+
+    `tabela_viabilidade`, o caminho de uma tabela de
+    `viabilidade.gerar_tabela_viabilidade` (ou a tabela já carregada),
+    responde o caso inviável sem o solver. Horizontes e taxas fora da grade
+    da tabela continuam no solver.
+    """
+    cultura = cultura or CULTURA_PADRAO
+    if tabela_viabilidade is not None:
+        info = _consultar_tabela(
+            tabela_viabilidade,
+            num_mudas_inicial,
+            faturamento_objetivo,
+            anos,
+            taxa_crescimento_maxima,
+            cultura,
+        )
+        if info is not None and not info["possivel"]:
+            return None, None, None, info
+
+    # Curva de receita por muda calculada uma única vez para todo o plano
+    curva = calcular_curva_receita_por_muda(max(anos, 15), cultura=cultura)
+
+    with medir("plano.solver"):
+        solucao = resolver_plano(
+            num_mudas_inicial,
+            faturamento_objetivo,
+            anos,
+            curva,
+            taxa_crescimento_maxima=taxa_crescimento_maxima,
+            margem=cultura.margem_lucro_plano,
+            tolerancia=tolerancia,
+        )
+    estatisticas = {
+        "iteracoes": solucao["iteracoes"],
+        "tempos": solucao["tempos"],
+    }
+
+    if not solucao["possivel"]:
+        return (
+            None,
+            None,
+            None,
+            {
+                "possivel": False,
+                "faturamento_maximo": solucao["faturamento_maximo"],
+                "mudas_minimas": solucao["mudas_minimas"],
+                "anos_necessarios": solucao["anos_necessarios"],
+                **estatisticas,
+            },
+        )
+
+    taxa_crescimento = solucao["taxa_crescimento"]
+
+    # Calcular o plano com a taxa de crescimento encontrada, em colunas
+    import pandas as pd
+
+    anos_plano = np.arange(1, anos + 1, dtype=np.int64)
+    faturamento_anual = calcular_faturamento_anual_coortes(
+        num_mudas_inicial, taxa_crescimento, anos, cultura.margem_lucro, curva
+    )
+    resultados_plano = pd.DataFrame(
+        {
+            "Ano": anos_plano,
+            "Número de Mudas": num_mudas_inicial * taxa_crescimento ** (anos_plano - 1),
+            "Faturamento Líquido (US$)": faturamento_anual,
+            "Faturamento Acumulado (US$)": np.cumsum(faturamento_anual),
+        }
+    )
+
+    # Uma linha por coorte e ano (triângulo inferior de ano x ano de implementação)
+    indice_ano, indice_impl = np.tril_indices(anos)
+    mudas_impl = num_mudas_inicial * taxa_crescimento**indice_impl
+    resultados_detalhados = pd.DataFrame(
+        {
+            "Ano de Implementação": (indice_impl + 1).astype(np.int64),
+            "Ano": (indice_ano + 1).astype(np.int64),
+            "Número de Mudas": mudas_impl,
+            "Faturamento Líquido (US$)": (
+                mudas_impl * curva[indice_ano - indice_impl] * cultura.margem_lucro
+            ),
+        }
+    )
+
+    return (
+        resultados_plano,
+        resultados_detalhados,
+        taxa_crescimento,
+        {"possivel": True, **estatisticas},
+    )
+
+
+def _consultar_tabela(
+    tabela, num_mudas, faturamento_objetivo, anos, taxa_crescimento_maxima, cultura
+):
+    """Informações do plano lidas da tabela de viabilidade, ou None fora da grade."""
+    if isinstance(tabela, (str, os.PathLike)):
+        from .viabilidade import carregar_tabela
+
+        tabela = carregar_tabela(tabela, cultura)
+    inicio = time.perf_counter()
+    try:
+        with medir("plano.tabela_viabilidade"):
+            info = tabela.consultar(
+                num_mudas,
+                faturamento_objetivo,
+                anos,
+                taxa_crescimento_maxima,
+                margem=cultura.margem_lucro_plano,
+            )
+    except ValueError:
+        return None
+    tempos = {"tabela_viabilidade": time.perf_counter() - inicio}
+    return {**info, "iteracoes": {}, "tempos": tempos}
@@ -0,0 +1,268 @@
+"""Varreduras de parâmetros: superfícies de resposta e análise de sensibilidade.
+
+`calcular_superficie` avalia o modelo para toda a grade de mudas x anos x
+modelo linear x sistema de cultivo de uma vez. Como todos os totais são
+lineares no número de mudas, a grade inteira sai de produtos externos das
+curvas acumuladas por muda, e consultas entre pontos da grade são
+interpolações exatas.
+
+`analise_sensibilidade` varia cada constante do modelo para baixo e para
+cima e mede o efeito em um total (gráfico de tornado). A superfície também
+guarda esses cenários, por muda, para cada variação de `VARIACOES_PADRAO` e
+cada horizonte: `SuperficieResposta.tornado` devolve o mesmo resultado com
+uma multiplicação, sem avaliar o modelo.
+"""
+
+import numpy as np
+
+from .modelo import CULTURA_PADRAO, calcular_area_necessaria, obter_curvas_por_muda
+from .montecarlo import _curvas_sorteadas, avaliar_cumulativo
+
+SISTEMAS = ("SAF", "Semi-intensivo")
+METRICAS = ("producao_total_kg", "faturamento_bruto", "faturamento_liquido")
+# Variações pré-calculadas na superfície: o controle do app vai de 1% a 50%
+VARIACOES_PADRAO = np.arange(1, 51) / 100
+
+# Constante do modelo -> parâmetro de avaliar_cumulativo e atributo do perfil
+# que dá o valor de referência (None: fator multiplicativo, referência 1)
+PARAMETROS_SENSIBILIDADE = {
+    "CUSTO_POR_MUDA": ("custo_por_muda", "custo_por_muda"),
+    "PRECO_EXTRATO_POR_TONELADA": ("preco_extrato", "preco_extrato_por_tonelada"),
+    "MARGEM_LUCRO": ("margem", "margem_lucro"),
+    "PESO_FAVA_CURADA": ("peso_fava_curada", "peso_fava_curada"),
+    "Fator de produtividade": ("fator_produtividade", None),
+}
+
+
+def _valores_base(cultura):
+    return [
+        1.0 if atributo is None else float(getattr(cultura, atributo))
+        for _, atributo in PARAMETROS_SENSIBILIDADE.values()
+    ]
+
+
+def _parametros_sensibilidade(variacoes, cultura):
+    """Cenários (base e dois por constante) para cada variação, em sequência."""
+    variacoes = np.asarray(variacoes, dtype=float).reshape(-1)
+    cenarios = 1 + 2 * len(PARAMETROS_SENSIBILIDADE)
+    parametros = {}
+    for posicao, ((chave, _), valor) in enumerate(
+        zip(PARAMETROS_SENSIBILIDADE.values(), _valores_base(cultura))
+    ):
+        valores = np.full((len(variacoes), cenarios), valor)
+        valores[:, 1 + 2 * posicao] = valor * (1 - variacoes)
+        valores[:, 2 + 2 * posicao] = valor * (1 + variacoes)
+        parametros[chave] = valores.reshape(-1)
+    return parametros
+
+
+def _tornado(valores_base, resultados):
+    """Lista do gráfico de tornado a partir dos resultados dos cenários."""
+    base = float(resultados[0])
+    tornado = []
+    for posicao, (nome, valor) in enumerate(
+        zip(PARAMETROS_SENSIBILIDADE, valores_base)
+    ):
+        baixo = float(resultados[1 + 2 * posicao])
+        alto = float(resultados[2 + 2 * posicao])
+        tornado.append(
+            {
+                "parametro": nome,
+                "valor_base": valor,
+                "resultado_base": base,
+                "resultado_baixo": baixo,
+                "resultado_alto": alto,
+                "amplitude": abs(alto - baixo),
+            }
+        )
+    tornado.sort(key=lambda linha: linha["amplitude"], reverse=True)
+    return tornado
+
+
+class SuperficieResposta:
+    """Totais do modelo pré-calculados sobre uma grade de entradas.
+
+    `metricas[nome]` tem forma (mudas, anos, modelo linear) e `area` tem
+    forma (mudas, sistema). Os eixos são `mudas`, `anos` (1 a `anos_maximo`),
+    `(False, True)` e `SISTEMAS`. `sensibilidade[nome]` tem os cenários de
+    `analise_sensibilidade` para uma muda, com forma (variação, cenário, anos,
+    modelo linear), e `valores_base` os valores de referência das constantes.
+    """
+
+    def __init__(
+        self, mudas, anos, metricas, area, variacoes, sensibilidade, valores_base
+    ):
+        self.mudas = mudas
+        self.anos = anos
+        self.metricas = metricas
+        self.area = area
+        self.variacoes = variacoes
+        self.sensibilidade = sensibilidade
+        self.valores_base = valores_base
+
+    def consultar(self, num_mudas, anos, usar_modelo_linear=False, sistema="SAF"):
+        """Totais para qualquer número de mudas dentro da grade (interpolado)."""
+        if not self.mudas[0] <= num_mudas <= self.mudas[-1]:
+            raise ValueError("Número de mudas fora da grade da superfície.")
+        if not 1 <= anos <= self.anos[-1]:
+            raise ValueError("Horizonte fora da grade da superfície.")
+        indice_linear = int(bool(usar_modelo_linear))
+        resultado = {
+            nome: float(
+                np.interp(num_mudas, self.mudas, valores[:, anos - 1, indice_linear])
+            )
+            for nome, valores in self.metricas.items()
+        }
+        resultado["area_necessaria"] = float(
+            np.interp(num_mudas, self.mudas, self.area[:, SISTEMAS.index(sistema)])
+        )
+        return resultado
+
+    def tornado(
+        self,
+        num_mudas,
+        anos,
+        usar_modelo_linear=False,
+        variacao=0.1,
+        metrica="faturamento_liquido",
+    ):
+        """Mesmo resultado de `analise_sensibilidade`, lido da superfície.
+
+        Os totais são lineares no número de mudas, então qualquer número de
+        mudas é exato. Entre duas variações da grade o resultado é
+        interpolado (exato nas variações da grade).
+        """
+        if not 1 <= anos <= self.anos[-1]:
+            raise ValueError("Horizonte fora da grade da superfície.")
+        variacoes = self.variacoes
+        if not variacoes[0] <= variacao <= variacoes[-1]:
+            raise ValueError("Variação fora da grade da superfície.")
+        cenarios = self.sensibilidade[metrica][
+            :, :, anos - 1, int(bool(usar_modelo_linear))
+        ]
+        direita = min(int(np.searchsorted(variacoes, variacao)), len(variacoes) - 1)
+        if np.isclose(variacoes[direita], variacao):
+            por_muda = cenarios[direita]
+        else:
+            esquerda = direita - 1
+            peso = (variacao - variacoes[esquerda]) / (
+                variacoes[direita] - variacoes[esquerda]
+            )
+            por_muda = (1 - peso) * cenarios[esquerda] + peso * cenarios[direita]
+        return _tornado(self.valores_base, num_mudas * por_muda)
+
+    def salvar(self, caminho):
+        np.savez_compressed(
+            caminho,
+            mudas=self.mudas,
+            anos=self.anos,
+            area=self.area,
+            variacoes=self.variacoes,
+            valores_base=self.valores_base,
+            **self.metricas,
+            **{f"sensibilidade_{nome}": v for nome, v in self.sensibilidade.items()},
+        )
+
+    @classmethod
+    def carregar(cls, caminho):
+        with np.load(caminho) as dados:
+            metricas = {nome: dados[nome] for nome in METRICAS}
+            sensibilidade = {nome: dados[f"sensibilidade_{nome}"] for nome in METRICAS}
+            return cls(
+                dados["mudas"],
+                dados["anos"],
+                metricas,
+                dados["area"],
+                dados["variacoes"],
+                sensibilidade,
+                dados["valores_base"].tolist(),
+            )
+
+
+def _sensibilidade_por_muda(anos_maximo, variacoes, cultura):
+    """Totais acumulados de uma muda em cada cenário, variação e horizonte."""
+    parametros = _parametros_sensibilidade(variacoes, cultura)
+    forma = (len(variacoes), 1 + 2 * len(PARAMETROS_SENSIBILIDADE), anos_maximo, 2)
+    sensibilidade = {nome: np.empty(forma) for nome in METRICAS}
+    for indice, usar_modelo_linear in enumerate((False, True)):
+        producao, valor_extrato = _curvas_sorteadas(
+            parametros, anos_maximo, usar_modelo_linear, cultura
+        )
+        faturamento_bruto = np.cumsum(valor_extrato, axis=1)
+        totais = {
+            "producao_total_kg": np.cumsum(producao, axis=1),
+            "faturamento_bruto": faturamento_bruto,
+            "faturamento_liquido": faturamento_bruto * parametros["margem"][:, None]
+            - parametros["custo_por_muda"][:, None],
+        }
+        for nome, valores in totais.items():
+            sensibilidade[nome][..., indice] = valores.reshape(forma[:3])
+    return sensibilidade
+
+
+def calcular_superficie(
+    mudas, anos_maximo=15, cultura=None, variacoes=VARIACOES_PADRAO
+):
+    """Superfície de resposta para os números de mudas dados (em ordem crescente).
+
+    `cultura` é o perfil avaliado (padrão: baunilha); `variacoes` são as
+    frações pré-calculadas para `SuperficieResposta.tornado`.
+    """
+    cultura = cultura or CULTURA_PADRAO
+    mudas = np.asarray(mudas, dtype=float)
+    anos = np.arange(1, anos_maximo + 1)
+    variacoes = np.asarray(variacoes, dtype=float)
+
+    # Totais acumulados de uma muda: forma (anos, modelo linear)
+    producao = np.empty((anos_maximo, 2))
+    faturamento = np.empty((anos_maximo, 2))
+    for indice, usar_modelo_linear in enumerate((False, True)):
+        curvas = obter_curvas_por_muda(anos_maximo, usar_modelo_linear, cultura)
+        producao[:, indice] = np.cumsum(curvas["producao_kg"])
+        faturamento[:, indice] = np.cumsum(curvas["valor_extrato"])
+
+    faturamento_bruto = mudas[:, None, None] * faturamento
+    metricas = {
+        "producao_total_kg": mudas[:, None, None] * producao,
+        "faturamento_bruto": faturamento_bruto,
+        "faturamento_liquido": faturamento_bruto * cultura.margem_lucro
+        - (mudas * cultura.custo_por_muda)[:, None, None],
+    }
+    area = np.stack(
+        [calcular_area_necessaria(mudas, sistema, cultura) for sistema in SISTEMAS],
+        axis=1,
+    )
+    return SuperficieResposta(
+        mudas,
+        anos,
+        metricas,
+        area,
+        variacoes,
+        _sensibilidade_por_muda(anos_maximo, variacoes, cultura),
+        _valores_base(cultura),
+    )
+
+
+def analise_sensibilidade(
+    num_mudas,
+    anos,
+    usar_modelo_linear=False,
+    variacao=0.1,
+    metrica="faturamento_liquido",
+    cultura=None,
+):
+    """Efeito de variar cada constante em ±`variacao` (fração) sobre `metrica`.
+
+    Todos os cenários (base e dois por constante) são avaliados em uma única
+    chamada vetorizada. Retorna uma lista ordenada da maior para a menor
+    amplitude, pronta para um gráfico de tornado.
+    """
+    cultura = cultura or CULTURA_PADRAO
+    resultados = avaliar_cumulativo(
+        num_mudas,
+        anos,
+        usar_modelo_linear,
+        _parametros_sensibilidade([variacao], cultura),
+        cultura,
+    )[metrica]
+    return _tornado(_valores_base(cultura), resultados)
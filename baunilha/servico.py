@@ -0,0 +1,402 @@
+"""Serviço HTTP/JSON assíncrono para projeções, área e planos de ação.
+
+Usa só a biblioteca padrão (`asyncio.start_server` e um parser HTTP/1.1
+mínimo, com keep-alive), para rodar onde o app roda:
+
+    python -m baunilha servico --porta 8000 --processos 4
+
+Rotas (corpo e resposta em JSON; valores não finitos, como as mudas mínimas
+de um plano sem faturamento, viram `null`):
+
+- `POST /cumulativo` `{num_mudas, anos, usar_modelo_linear}`
+- `POST /area` `{num_mudas, sistema}`
+- `POST /plano` `{num_mudas, faturamento_objetivo, anos, taxa_crescimento_maxima}`
+- `POST /lote` `{"cenarios": [...]}`, cenários no formato de `executar_cenario`
+- `GET /saude` e `GET /metricas` (formato Prometheus)
+
+Campos inválidos dão 400 em todas as rotas (no lote, o erro aponta o cenário):
+`anos` é um inteiro de 1 a `ANOS_MAXIMO`, `num_mudas` e `faturamento_objetivo`
+não são negativos, `taxa_crescimento_maxima` é pelo menos 1 e
+`usar_modelo_linear` é um booleano JSON.
+
+Projeção e área custam microssegundos e rodam no próprio laço de eventos. A
+busca do plano e os lotes vão para um pool de processos, que devolve o JSON
+já serializado. Se `BAUNILHA_VIABILIDADE` aponta para uma tabela de
+`python -m baunilha viabilidade`, cada processo a abre uma vez (mapeada em
+memória) e responde os planos inviáveis por ela. Requisições idênticas que
+chegam enquanto outra igual ainda está em andamento esperam o mesmo resultado
+em vez de recalculá-lo.
+"""
+
+import asyncio
+import json
+import math
+import os
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+
+from .cenarios import SISTEMAS, executar_cenario, executar_plano
+from .exportacao import json_finito
+from .instrumentacao import METRICAS, contar, medir
+from .modelo import calcular_area_necessaria, calcular_cumulativo
+from .viabilidade import carregar_tabela
+
+TAMANHO_MAXIMO_CORPO = 16 * 1024 * 1024
+CENARIOS_POR_TAREFA = 64
+ANOS_MAXIMO = 100
+
+
+class ErroRequisicao(Exception):
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+        self.mensagem = mensagem
+
+
+def _json(dados):
+    return json_finito(dados, ensure_ascii=False).encode("utf-8")
+
+
+def _numero(dados, nome, tipo=float, padrao=None, minimo=None):
+    valor = dados.get(nome, padrao)
+    if valor is None:
+        raise ErroRequisicao(400, f"Campo obrigatório ausente: {nome}")
+    invalido = ErroRequisicao(400, f"Valor inválido para {nome}: {valor!r}")
+    if isinstance(valor, bool):
+        raise invalido
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError, OverflowError):
+        raise invalido from None
+    if not math.isfinite(numero):
+        raise invalido
+    if tipo is int:
+        # 6 e 6.0 valem; 6.5 seria truncado em silêncio
+        if not numero.is_integer():
+            raise invalido
+        numero = int(numero)
+    if minimo is not None and numero < minimo:
+        raise ErroRequisicao(400, f"{nome} deve ser pelo menos {minimo}: {valor!r}")
+    return numero
+
+
+def _anos(dados):
+    anos = _numero(dados, "anos", int)
+    if not 1 <= anos <= ANOS_MAXIMO:
+        raise ErroRequisicao(400, f"anos deve estar entre 1 e {ANOS_MAXIMO}: {anos}")
+    return anos
+
+
+def _booleano(dados, nome, padrao=False):
+    # bool("false") seria True: só booleanos JSON
+    valor = dados.get(nome, padrao)
+    if not isinstance(valor, bool):
+        raise ErroRequisicao(400, f"{nome} deve ser true ou false: {valor!r}")
+    return valor
+
+
+def _sistema(dados):
+    sistema = dados.get("sistema", "SAF")
+    if sistema not in SISTEMAS:
+        raise ErroRequisicao(400, f"Sistema desconhecido: {sistema!r}")
+    return sistema
+
+
+def _cenario(dados):
+    """Cenário validado, com os campos convertidos e os padrões preenchidos."""
+    if not isinstance(dados, dict):
+        raise ErroRequisicao(400, "Cada cenário deve ser um objeto JSON.")
+    cenario = {
+        **dados,
+        "num_mudas": _numero(dados, "num_mudas", minimo=0),
+        "anos": _anos(dados),
+        "sistema": _sistema(dados),
+        "usar_modelo_linear": _booleano(dados, "usar_modelo_linear"),
+    }
+    if dados.get("faturamento_objetivo") is not None:
+        cenario["faturamento_objetivo"] = _numero(
+            dados, "faturamento_objetivo", minimo=0
+        )
+        cenario["taxa_crescimento_maxima"] = _numero(
+            dados, "taxa_crescimento_maxima", padrao=1.5, minimo=1
+        )
+    return cenario
+
+
+def _carregar_tabela_viabilidade():
+    caminho = os.environ.get("BAUNILHA_VIABILIDADE")
+    if not caminho or not os.path.exists(caminho):
+        return None
+    return carregar_tabela(caminho)
+
+
+# Aberta no import do módulo, uma vez por processo do pool; o mmap compartilha
+# as páginas entre os processos
+TABELA_VIABILIDADE = _carregar_tabela_viabilidade()
+
+
+# Executadas nos processos do pool: recebem e devolvem tipos simples
+
+
+def _aquecer():
+    # Importa o pandas e preenche o cache de curvas antes do primeiro pedido,
+    # para que a primeira busca de cada processo não pague esse custo
+    executar_plano(1000, 1e5, 15)
+
+
+def _plano_json(num_mudas, faturamento_objetivo, anos, taxa_crescimento_maxima):
+    return _json(
+        executar_plano(
+            num_mudas,
+            faturamento_objetivo,
+            anos,
+            taxa_crescimento_maxima,
+            tabela_viabilidade=TABELA_VIABILIDADE,
+        )
+    )
+
+
+def _cenarios_json(cenarios):
+    return b",".join(_json(executar_cenario(cenario)) for cenario in cenarios)
+
+
+class ServicoBaunilha:
+    def __init__(self, processos=None):
+        self.processos = processos or os.cpu_count() or 1
+        self._executor = None
+        self._servidor = None
+        self._em_andamento = {}
+
+    async def iniciar(self, host="127.0.0.1", porta=8000):
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processos, initializer=_aquecer
+        )
+        # Sobe (e aquece) todos os processos antes de aceitar conexões
+        await asyncio.gather(*(self._no_pool(int) for _ in range(self.processos)))
+        self._servidor = await asyncio.start_server(self._tratar_conexao, host, porta)
+        return self._servidor
+
+    @property
+    def endereco(self):
+        return self._servidor.sockets[0].getsockname()[:2]
+
+    async def fechar(self):
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+
+    async def _no_pool(self, funcao, *argumentos):
+        laco = asyncio.get_running_loop()
+        return await laco.run_in_executor(self._executor, funcao, *argumentos)
+
+    async def _coalescer(self, chave, calcular):
+        """Resultado de `calcular()`, compartilhado com pedidos iguais em andamento."""
+        tarefa = self._em_andamento.get(chave)
+        if tarefa is None:
+            tarefa = asyncio.ensure_future(calcular())
+            self._em_andamento[chave] = tarefa
+            tarefa.add_done_callback(lambda _: self._em_andamento.pop(chave, None))
+        else:
+            contar("servico.coalescidas")
+        # shield: um cliente que desconecta não cancela o cálculo dos outros
+        return await asyncio.shield(tarefa)
+
+    async def _cumulativo(self, dados):
+        num_mudas = _numero(dados, "num_mudas", minimo=0)
+        anos = _anos(dados)
+        linear = _booleano(dados, "usar_modelo_linear")
+        resultados_cumulativos, resultados_anuais = calcular_cumulativo(
+            num_mudas, anos, linear
+        )
+        return _json(
+            {
+                "cumulativos": resultados_cumulativos,
+                "anuais": {
+                    coluna: valores.tolist()
+                    for coluna, valores in resultados_anuais.items()
+                },
+            }
+        )
+
+    async def _area(self, dados):
+        num_mudas = _numero(dados, "num_mudas", minimo=0)
+        sistema = _sistema(dados)
+        return _json({"area_necessaria": calcular_area_necessaria(num_mudas, sistema)})
+
+    async def _plano(self, dados):
+        argumentos = (
+            _numero(dados, "num_mudas", minimo=0),
+            _numero(dados, "faturamento_objetivo", minimo=0),
+            _anos(dados),
+            _numero(dados, "taxa_crescimento_maxima", padrao=1.5, minimo=1),
+        )
+        return await self._no_pool(_plano_json, *argumentos)
+
+    async def _lote(self, dados):
+        cenarios = dados.get("cenarios")
+        if not isinstance(cenarios, list):
+            raise ErroRequisicao(400, "O corpo deve ter uma lista em 'cenarios'.")
+        # Tudo validado antes de ir ao pool: um cenário ruim não vira um 500
+        validados = []
+        for indice, cenario in enumerate(cenarios):
+            try:
+                validados.append(_cenario(cenario))
+            except ErroRequisicao as erro:
+                raise ErroRequisicao(
+                    erro.status, f"cenarios[{indice}]: {erro.mensagem}"
+                ) from None
+        cenarios = validados
+        partes = await asyncio.gather(
+            *(
+                self._no_pool(_cenarios_json, cenarios[i : i + CENARIOS_POR_TAREFA])
+                for i in range(0, len(cenarios), CENARIOS_POR_TAREFA)
+            )
+        )
+        return b"[" + b",".join(partes) + b"]"
+
+    async def _responder(self, metodo, caminho, corpo):
+        """(status, tipo de conteúdo, corpo) da resposta a uma requisição."""
+        rota = caminho.split("?", 1)[0].rstrip("/") or "/"
+        if rota == "/saude":
+            return 200, "application/json", b'{"status": "ok"}'
+        if rota == "/metricas":
+            return 200, "text/plain; version=0.0.4", METRICAS.prometheus().encode()
+
+        tratadores = {
+            "/cumulativo": self._cumulativo,
+            "/area": self._area,
+            "/plano": self._plano,
+            "/lote": self._lote,
+        }
+        tratador = tratadores.get(rota)
+        if tratador is None:
+            raise ErroRequisicao(404, f"Rota desconhecida: {rota}")
+        if metodo != "POST":
+            raise ErroRequisicao(405, "Use POST com um corpo JSON.")
+        try:
+            dados = json.loads(corpo or b"{}")
+        except ValueError:
+            raise ErroRequisicao(400, "Corpo não é um JSON válido.") from None
+        if not isinstance(dados, dict):
+            raise ErroRequisicao(400, "O corpo deve ser um objeto JSON.")
+
+        with medir(f"servico{rota}"):
+            # Chave de coalescência: a rota e o corpo canônico
+            chave = (rota, json.dumps(dados, sort_keys=True))
+            resposta = await self._coalescer(chave, lambda: tratador(dados))
+        return 200, "application/json", resposta
+
+    async def _tratar_conexao(self, leitor, escritor):
+        try:
+            while True:
+                try:
+                    requisicao = await _ler_requisicao(leitor)
+                except ErroRequisicao as erro:
+                    await _escrever_resposta(
+                        escritor, erro.status, _json({"erro": erro.mensagem}), False
+                    )
+                    break
+                if requisicao is None:
+                    break
+                metodo, caminho, manter_conexao, corpo = requisicao
+                try:
+                    status, tipo, resposta = await self._responder(
+                        metodo, caminho, corpo
+                    )
+                except ErroRequisicao as erro:
+                    status, tipo = erro.status, "application/json"
+                    resposta = _json({"erro": erro.mensagem})
+                except Exception as erro:  # vira um 500 para o cliente
+                    print(f"Erro ao tratar {caminho}: {erro!r}", file=sys.stderr)
+                    status, tipo = 500, "application/json"
+                    resposta = _json({"erro": str(erro)})
+                contar(f"servico.status_{status}")
+                await _escrever_resposta(
+                    escritor, status, resposta, manter_conexao, tipo
+                )
+                if not manter_conexao:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+
+async def _ler_requisicao(leitor):
+    """(método, caminho, keep-alive, corpo), ou None se a conexão fechou."""
+    linha = await leitor.readline()
+    if not linha:
+        return None
+    try:
+        metodo, caminho, versao = linha.decode("latin-1").split()
+    except ValueError:
+        raise ErroRequisicao(400, "Linha de requisição inválida.") from None
+
+    cabecalhos = {}
+    while True:
+        linha = await leitor.readline()
+        if linha in (b"\r\n", b"\n", b""):
+            break
+        nome, _, valor = linha.decode("latin-1").partition(":")
+        cabecalhos[nome.strip().lower()] = valor.strip()
+
+    try:
+        tamanho = int(cabecalhos.get("content-length") or 0)
+    except ValueError:
+        tamanho = -1
+    if tamanho < 0:
+        raise ErroRequisicao(400, "Content-Length inválido.")
+    if tamanho > TAMANHO_MAXIMO_CORPO:
+        raise ErroRequisicao(413, "Corpo da requisição grande demais.")
+    corpo = await leitor.readexactly(tamanho) if tamanho else b""
+
+    conexao = cabecalhos.get("connection", "").lower()
+    if versao == "HTTP/1.0":
+        manter_conexao = conexao == "keep-alive"
+    else:
+        manter_conexao = conexao != "close"
+    return metodo.upper(), caminho, manter_conexao, corpo
+
+
+async def _escrever_resposta(
+    escritor, status, corpo, manter_conexao, tipo="application/json"
+):
+    cabecalho = (
+        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+        f"Content-Type: {tipo}\r\n"
+        f"Content-Length: {len(corpo)}\r\n"
+        f"Connection: {'keep-alive' if manter_conexao else 'close'}\r\n\r\n"
+    )
+    escritor.write(cabecalho.encode("latin-1") + corpo)
+    await escritor.drain()
+
+
+async def _servir(host, porta, processos):
+    servico = ServicoBaunilha(processos)
+    await servico.iniciar(host, porta)
+    host, porta = servico.endereco
+    print(f"Servindo em http://{host}:{porta}", file=sys.stderr, flush=True)
+
+    # Encerra de forma ordenada (inclusive o pool) em SIGINT e SIGTERM
+    parar = asyncio.Event()
+    laco = asyncio.get_running_loop()
+    for sinal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            laco.add_signal_handler(sinal, parar.set)
+        except NotImplementedError:  # Windows
+            pass
+    try:
+        await parar.wait()
+    finally:
+        await servico.fechar()
+
+
+def executar_servico(host="127.0.0.1", porta=8000, processos=None):
+    try:
+        asyncio.run(_servir(host, porta, processos))
+    except KeyboardInterrupt:
+        pass
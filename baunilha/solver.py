@@ -0,0 +1,219 @@
+"""Solver exato do plano de ação (mudas mínimas, taxa de crescimento e anos)."""
+
+import time
+
+import numpy as np
+
+from .coortes import (
+    calcular_faturamento_anual_coortes,
+    calcular_faturamento_total_coortes,
+)
+from .modelo import MARGEM_LUCRO_PLANO
+
+
+def _brent(funcao, a, b, tolerancia, max_iteracoes=100):
+    """Raiz de `funcao` em [a, b] pelo método de Brent.
+
+    Retorna a raiz e o número de iterações. Exige mudança de sinal no
+    intervalo.
+    """
+    fa, fb = funcao(a), funcao(b)
+    if fa * fb > 0:
+        raise ValueError("A função não muda de sinal no intervalo informado.")
+    if fa == 0:
+        return a, 0
+    if fb == 0:
+        return b, 0
+
+    x_ant, x_atual, x_oposto = a, b, a
+    f_ant, f_atual, f_oposto = fa, fb, fa
+    passo_ant = passo_atual = 0.0
+    for iteracao in range(1, max_iteracoes + 1):
+        if f_ant * f_atual < 0:
+            x_oposto, f_oposto = x_ant, f_ant
+            passo_ant = passo_atual = x_atual - x_ant
+        if abs(f_oposto) < abs(f_atual):
+            x_ant, x_atual, x_oposto = x_atual, x_oposto, x_atual
+            f_ant, f_atual, f_oposto = f_atual, f_oposto, f_atual
+
+        delta = (tolerancia + 4 * np.finfo(float).eps * abs(x_atual)) / 2
+        passo_bissecao = (x_oposto - x_atual) / 2
+        if f_atual == 0 or abs(passo_bissecao) < delta:
+            return x_atual, iteracao
+
+        if abs(passo_ant) > delta and abs(f_atual) < abs(f_ant):
+            if x_ant == x_oposto:
+                # Interpolação linear (secante)
+                passo = -f_atual * (x_atual - x_ant) / (f_atual - f_ant)
+            else:
+                # Interpolação quadrática inversa
+                d_ant = (f_ant - f_atual) / (x_ant - x_atual)
+                d_oposto = (f_oposto - f_atual) / (x_oposto - x_atual)
+                passo = (
+                    -f_atual
+                    * (f_oposto * d_oposto - f_ant * d_ant)
+                    / (d_oposto * d_ant * (f_oposto - f_ant))
+                )
+            if 2 * abs(passo) < min(abs(passo_ant), 3 * abs(passo_bissecao) - delta):
+                passo_ant, passo_atual = passo_atual, passo
+            else:
+                passo_ant = passo_atual = passo_bissecao
+        else:
+            passo_ant = passo_atual = passo_bissecao
+
+        x_ant, f_ant = x_atual, f_atual
+        if abs(passo_atual) > delta:
+            x_atual += passo_atual
+        else:
+            x_atual += delta if passo_bissecao > 0 else -delta
+        f_atual = funcao(x_atual)
+
+    return x_atual, max_iteracoes
+
+
+def resolver_mudas_minimas(faturamento_objetivo, taxa_crescimento, anos, margem, curva):
+    """Menor número de mudas iniciais que atinge o faturamento objetivo.
+
+    O faturamento total é linear nas mudas iniciais, então a solução é exata:
+    objetivo dividido pelo faturamento de uma única muda inicial.
+    """
+    faturamento_por_muda = float(
+        calcular_faturamento_total_coortes(1, taxa_crescimento, anos, margem, curva)
+    )
+    if faturamento_por_muda <= 0:
+        return float("inf")
+    return faturamento_objetivo / faturamento_por_muda
+
+
+def resolver_anos_necessarios(
+    mudas_inicial,
+    faturamento_objetivo,
+    taxa_crescimento,
+    anos_inicial,
+    anos_maximo,
+    margem,
+    curva,
+):
+    """Primeiro horizonte entre `anos_inicial` e `anos_maximo` que atinge o objetivo.
+
+    O faturamento acumulado de todos os horizontes sai de uma única
+    convolução. Retorna None se o objetivo não for atingido.
+    """
+    if anos_maximo < 1:
+        return None
+    faturamento_acumulado = np.cumsum(
+        calcular_faturamento_anual_coortes(
+            mudas_inicial, taxa_crescimento, anos_maximo, margem, curva
+        )
+    )
+    for anos in range(max(anos_inicial, 1), anos_maximo + 1):
+        if faturamento_acumulado[anos - 1] >= faturamento_objetivo:
+            return anos
+    return None
+
+
+def resolver_taxa_crescimento(
+    mudas_inicial,
+    faturamento_objetivo,
+    anos,
+    margem,
+    curva,
+    taxa_minima=1.0,
+    taxa_maxima=1.5,
+    tolerancia=1e-8,
+):
+    """Taxa de crescimento que atinge exatamente o faturamento objetivo.
+
+    O faturamento é crescente na taxa, então a raiz é única no intervalo.
+    Retorna a taxa e o número de iterações; se a taxa mínima já atinge o
+    objetivo ela é retornada diretamente.
+    """
+
+    def diferenca(taxa):
+        return (
+            float(
+                calcular_faturamento_total_coortes(
+                    mudas_inicial, taxa, anos, margem, curva
+                )
+            )
+            - faturamento_objetivo
+        )
+
+    if diferenca(taxa_minima) >= 0:
+        return taxa_minima, 0
+    return _brent(diferenca, taxa_minima, taxa_maxima, tolerancia)
+
+
+def resolver_plano(
+    mudas_inicial,
+    faturamento_objetivo,
+    anos,
+    curva,
+    taxa_crescimento_maxima=1.5,
+    margem=MARGEM_LUCRO_PLANO,
+    anos_maximo=15,
+    tolerancia=1e-8,
+):
+    """Resolve o plano de ação: taxa de crescimento ou, se inviável, os ajustes.
+
+    Retorna um dicionário com `possivel`, `faturamento_maximo`,
+    `taxa_crescimento`, `mudas_minimas`, `anos_necessarios` e, para cada
+    etapa, o número de iterações (`iteracoes`) e o tempo em segundos
+    (`tempos`).
+    """
+    iteracoes = {}
+    tempos = {}
+
+    inicio = time.perf_counter()
+    faturamento_maximo = float(
+        calcular_faturamento_total_coortes(
+            mudas_inicial, taxa_crescimento_maxima, anos, margem, curva
+        )
+    )
+    possivel = faturamento_maximo >= faturamento_objetivo
+    tempos["faturamento_maximo"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    mudas_minimas = resolver_mudas_minimas(
+        faturamento_objetivo, taxa_crescimento_maxima, anos, margem, curva
+    )
+    iteracoes["mudas_minimas"] = 1
+    tempos["mudas_minimas"] = time.perf_counter() - inicio
+
+    taxa_crescimento = None
+    anos_necessarios = anos
+    if possivel:
+        inicio = time.perf_counter()
+        taxa_crescimento, iteracoes["taxa_crescimento"] = resolver_taxa_crescimento(
+            mudas_inicial,
+            faturamento_objetivo,
+            anos,
+            margem,
+            curva,
+            taxa_maxima=taxa_crescimento_maxima,
+            tolerancia=tolerancia,
+        )
+        tempos["taxa_crescimento"] = time.perf_counter() - inicio
+    else:
+        inicio = time.perf_counter()
+        anos_necessarios = resolver_anos_necessarios(
+            mudas_inicial,
+            faturamento_objetivo,
+            taxa_crescimento_maxima,
+            anos,
+            anos_maximo,
+            margem,
+            curva,
+        )
+        iteracoes["anos_necessarios"] = 1
+        tempos["anos_necessarios"] = time.perf_counter() - inicio
+
+    return {
+        "possivel": possivel,
+        "faturamento_maximo": faturamento_maximo,
+        "taxa_crescimento": taxa_crescimento,
+        "mudas_minimas": mudas_minimas,
+        "anos_necessarios": anos_necessarios,
+        "iteracoes": iteracoes,
+        "tempos": tempos,
+    }
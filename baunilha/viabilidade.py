@@ -0,0 +1,227 @@
+"""Tabelas de viabilidade do plano de ação, pré-calculadas em paralelo.
+
+O ramo inviável de `calcular_plano_acao` pergunta sempre as mesmas coisas:
+o faturamento máximo com a taxa de crescimento máxima, as mudas mínimas e
+os anos necessários. Todas saem do faturamento acumulado de uma única muda
+inicial à taxa máxima, para cada horizonte. Como o faturamento é linear nas
+mudas iniciais e na margem, a grade de mudas não precisa ser guardada: a
+tabela tem forma (modelo linear, taxa máxima, horizonte) e as mudas e a
+margem entram como multiplicação na consulta.
+
+`gerar_tabela_viabilidade` preenche a grade em paralelo (blocos de taxas em
+um pool de processos) e grava um `.npy` mais um `.json` com os metadados.
+`TabelaViabilidade.carregar` abre o `.npy` mapeado em memória
+(`mmap_mode="r"`), então vários processos compartilham as mesmas páginas:
+
+    python -m baunilha viabilidade viabilidade.npy --anos-max 50 --processos 4
+
+    tabela = TabelaViabilidade.carregar("viabilidade.npy")
+    tabela.consultar(4000, 1e6, 6)
+
+`calcular_plano_acao(..., tabela_viabilidade="viabilidade.npy")` usa a
+tabela no lugar do solver quando o plano é inviável.
+
+Taxas fora da grade são interpoladas em escala log-log, que é exata para
+o termo dominante (uma potência da taxa).
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from .coortes import calcular_curva_receita_por_muda
+from .modelo import CULTURA_PADRAO
+
+VERSAO_FORMATO = 1
+TAXAS_PADRAO = np.linspace(1.0, 3.0, 201)
+
+
+def _caminho_metadados(caminho):
+    return os.path.splitext(caminho)[0] + ".json"
+
+
+def _assinatura(cultura):
+    return json.dumps(cultura.chave, default=float)
+
+
+# Perfil do processo do pool, recebido uma vez pelo `initializer`: enviado
+# com cada bloco, seria recompilado a cada tarefa (veja `PerfilCultura.__reduce__`)
+_cultura_processo = None
+
+
+def _iniciar_processo(cultura):
+    global _cultura_processo
+    _cultura_processo = cultura
+
+
+def _calcular_bloco(taxas, anos_maximo, cultura=None):
+    """Faturamento bruto acumulado por muda inicial: forma (2, taxas, anos)."""
+    cultura = cultura or _cultura_processo
+    bloco = np.empty((2, len(taxas), anos_maximo))
+    expoentes = np.arange(anos_maximo)
+    for indice_linear, linear in enumerate((False, True)):
+        curva = calcular_curva_receita_por_muda(anos_maximo, linear, cultura)
+        for indice, taxa in enumerate(taxas):
+            anuais = np.convolve(taxa**expoentes, curva)[:anos_maximo]
+            bloco[indice_linear, indice] = np.cumsum(anuais)
+    return bloco
+
+
+class TabelaViabilidade:
+    """Faturamento acumulado por muda inicial à taxa máxima, por horizonte.
+
+    `valores` tem forma (2, len(taxas), anos_maximo): o primeiro eixo é o
+    modelo linear (`False`, `True`) e o último os horizontes 1 a
+    `anos_maximo`. Os valores são brutos; a margem entra na consulta.
+    """
+
+    def __init__(self, taxas, valores, margem_padrao):
+        self.taxas = np.asarray(taxas, dtype=float)
+        self.valores = valores
+        self.margem_padrao = margem_padrao
+
+    @property
+    def anos_maximo(self):
+        return self.valores.shape[2]
+
+    def por_muda(self, taxa_crescimento_maxima=1.5, usar_modelo_linear=False):
+        """Vetor do faturamento bruto acumulado de uma muda, horizonte a horizonte."""
+        taxas = self.taxas
+        if not taxas[0] <= taxa_crescimento_maxima <= taxas[-1]:
+            raise ValueError("Taxa de crescimento fora da grade da tabela.")
+        linhas = self.valores[int(bool(usar_modelo_linear))]
+        direita = int(np.searchsorted(taxas, taxa_crescimento_maxima))
+        if taxas[direita] == taxa_crescimento_maxima:
+            return np.array(linhas[direita])
+        esquerda = direita - 1
+        baixo, alto = np.array(linhas[esquerda]), np.array(linhas[direita])
+        peso = np.log(taxa_crescimento_maxima / taxas[esquerda]) / np.log(
+            taxas[direita] / taxas[esquerda]
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            interpolado = baixo * (alto / baixo) ** peso
+        # Horizontes ainda sem produção ficam em zero
+        return np.where(baixo > 0, interpolado, 0.0)
+
+    def consultar(
+        self,
+        num_mudas,
+        faturamento_objetivo,
+        anos,
+        taxa_crescimento_maxima=1.5,
+        margem=None,
+        usar_modelo_linear=False,
+        anos_maximo=15,
+    ):
+        """Viabilidade, mudas mínimas e anos necessários, como em `resolver_plano`."""
+        if not 1 <= anos <= self.anos_maximo or anos_maximo > self.anos_maximo:
+            raise ValueError("Horizonte fora da grade da tabela.")
+        if margem is None:
+            margem = self.margem_padrao
+        por_muda = margem * self.por_muda(taxa_crescimento_maxima, usar_modelo_linear)
+
+        faturamento_maximo = float(num_mudas * por_muda[anos - 1])
+        if por_muda[anos - 1] > 0:
+            mudas_minimas = faturamento_objetivo / float(por_muda[anos - 1])
+        else:
+            mudas_minimas = float("inf")
+        possivel = faturamento_maximo >= faturamento_objetivo
+
+        anos_necessarios = anos
+        if not possivel:
+            candidatos = num_mudas * por_muda[anos - 1 : anos_maximo]
+            posicao = int(np.searchsorted(candidatos, faturamento_objetivo))
+            anos_necessarios = anos + posicao if posicao < len(candidatos) else None
+        return {
+            "possivel": possivel,
+            "faturamento_maximo": faturamento_maximo,
+            "mudas_minimas": mudas_minimas,
+            "anos_necessarios": anos_necessarios,
+        }
+
+    @classmethod
+    def carregar(cls, caminho, cultura=None):
+        """Abre uma tabela gravada, mapeada em memória.
+
+        Com `cultura`, confere se a tabela foi gerada com os mesmos
+        parâmetros; sem ela, confere contra o perfil padrão.
+        """
+        cultura = cultura or CULTURA_PADRAO
+        with open(_caminho_metadados(caminho), encoding="utf-8") as arquivo:
+            metadados = json.load(arquivo)
+        if metadados.get("versao") != VERSAO_FORMATO:
+            raise ValueError("Tabela de viabilidade em formato antigo; gere de novo.")
+        if metadados["cultura"] != _assinatura(cultura):
+            raise ValueError(
+                "Tabela de viabilidade gerada com outros parâmetros do modelo."
+            )
+        valores = np.load(caminho, mmap_mode="r")
+        return cls(metadados["taxas"], valores, metadados["margem_padrao"])
+
+
+@lru_cache(maxsize=8)
+def _carregar(caminho, modificado, cultura):
+    return TabelaViabilidade.carregar(caminho, cultura)
+
+
+def carregar_tabela(caminho, cultura=None):
+    """Tabela de um arquivo; reabre só se o arquivo mudar."""
+    caminho = os.path.abspath(caminho)
+    return _carregar(caminho, os.stat(caminho).st_mtime_ns, cultura or CULTURA_PADRAO)
+
+
+def gerar_tabela_viabilidade(
+    caminho,
+    taxas=TAXAS_PADRAO,
+    anos_maximo=50,
+    processos=None,
+    tamanho_bloco=16,
+    cultura=None,
+):
+    """Calcula a tabela em paralelo, grava `caminho` (.npy) e os metadados.
+
+    `processos=1` roda tudo no processo atual. Cada bloco de taxas é escrito
+    direto no arquivo assim que fica pronto. Retorna a tabela já carregada.
+    """
+    cultura = cultura or CULTURA_PADRAO
+    # Arredonda para que taxas "redondas" (1.5, 1.14) caiam exatamente na grade
+    taxas = np.unique(np.round(np.asarray(taxas, dtype=float), 10))
+    if taxas[0] <= 0:
+        raise ValueError("As taxas de crescimento devem ser positivas.")
+    processos = processos or os.cpu_count() or 1
+
+    valores = np.lib.format.open_memmap(
+        caminho, mode="w+", dtype=np.float64, shape=(2, len(taxas), anos_maximo)
+    )
+    inicios = range(0, len(taxas), tamanho_bloco)
+    blocos = [taxas[inicio : inicio + tamanho_bloco] for inicio in inicios]
+    if processos == 1:
+        resultados = (_calcular_bloco(bloco, anos_maximo, cultura) for bloco in blocos)
+        for inicio, resultado in zip(inicios, resultados):
+            valores[:, inicio : inicio + resultado.shape[1]] = resultado
+    else:
+        with ProcessPoolExecutor(
+            max_workers=processos, initializer=_iniciar_processo, initargs=(cultura,)
+        ) as executor:
+            futuros = [
+                executor.submit(_calcular_bloco, bloco, anos_maximo) for bloco in blocos
+            ]
+            for inicio, futuro in zip(inicios, futuros):
+                resultado = futuro.result()
+                valores[:, inicio : inicio + resultado.shape[1]] = resultado
+    valores.flush()
+    del valores
+
+    metadados = {
+        "versao": VERSAO_FORMATO,
+        "taxas": taxas.tolist(),
+        "anos_maximo": anos_maximo,
+        "margem_padrao": cultura.margem_lucro_plano,
+        "cultura": _assinatura(cultura),
+    }
+    with open(_caminho_metadados(caminho), "w", encoding="utf-8") as arquivo:
+        json.dump(metadados, arquivo, ensure_ascii=False, indent=2)
+    return TabelaViabilidade.carregar(caminho, cultura)
@@ -0,0 +1,214 @@
+"""Benchmarks dos caminhos críticos do motor de cálculo.
+
+Mede projeção, plano de ação (ramos viável e inviável) e exportação para
+Excel, registrando tempo de parede, contadores do motor e pico de memória.
+O resultado é gravado em JSON e pode ser comparado com uma linha de base
+salva anteriormente:
+
+    python -m benchmarks.bench_motor --saida bench.json
+    python -m benchmarks.bench_motor --baseline bench.json --limite 0.25
+
+Com `--baseline`, o processo termina com código 1 se algum caso ficar mais
+lento que a base além do limite relativo.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+
+import baunilha
+from baunilha.instrumentacao import requisicao
+
+MUDAS = (100, 4000, 100_000)
+HORIZONTES = (6, 15, 30)
+
+# (mudas iniciais, faturamento objetivo, anos): os dois primeiros são viáveis;
+# os demais caem no ramo inviável e exigem mudas mínimas e anos necessários
+PLANOS = (
+    ("viavel", 4000, 2e6, 10),
+    ("viavel", 1000, 5e6, 15),
+    ("inviavel", 4000, 1e6, 6),
+    ("inviavel", 100, 5e5, 10),
+    ("inviavel", 500, 1e7, 15),
+)
+
+
+@contextmanager
+def contar_chamadas():
+    """Contadores do motor (`instrumentacao.contar`) enquanto o bloco executa.
+
+    O bloco roda dentro de uma requisição da instrumentação, que acumula os
+    contadores de qualquer função chamada, por qualquer nome importado.
+    """
+    contagem = {}
+    with requisicao("bench_motor") as registro:
+        yield contagem
+    contagem.update(registro.contadores)
+
+
+def medir(nome, parametros, funcao, repeticoes):
+    """Executa `funcao` várias vezes e devolve o registro do benchmark.
+
+    O cache de curvas é limpo antes de cada repetição, então os tempos
+    incluem a falha no cache. As curvas de até `cultura.ANOS_PRECALCULADOS` anos
+    vêm compiladas no perfil da cultura; só horizontes maiores incluem o
+    cálculo das curvas por muda.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        baunilha.obter_cache_curvas().limpar()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    baunilha.obter_cache_curvas().limpar()
+    with contar_chamadas() as chamadas:
+        tracemalloc.start()
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "nome": nome,
+        "parametros": parametros,
+        "repeticoes": repeticoes,
+        "tempo_mediano_s": statistics.median(tempos),
+        "tempo_minimo_s": min(tempos),
+        "chamadas": chamadas,
+        "pico_memoria_bytes": pico,
+    }
+
+
+def casos(repeticoes):
+    anos = np.tile(np.arange(1, 16), 1000)
+    yield medir(
+        "produtividade_escalar",
+        {"chamadas": len(anos)},
+        lambda: [baunilha.calcular_produtividade_baunilha(4000, int(a)) for a in anos],
+        max(1, repeticoes // 5),
+    )
+    yield medir(
+        "produtividade_vetorizada",
+        {"chamadas": len(anos)},
+        lambda: baunilha.calcular_produtividade_baunilha_vetorizado(4000, anos),
+        repeticoes,
+    )
+
+    for num_mudas in MUDAS:
+        for horizonte in HORIZONTES:
+            yield medir(
+                "cumulativo",
+                {"num_mudas": num_mudas, "anos": horizonte},
+                lambda n=num_mudas, h=horizonte: baunilha.calcular_cumulativo(
+                    n, h, True
+                ),
+                repeticoes,
+            )
+
+    for ramo, num_mudas, objetivo, horizonte in PLANOS:
+        yield medir(
+            f"plano_{ramo}",
+            {"num_mudas": num_mudas, "objetivo": objetivo, "anos": horizonte},
+            lambda n=num_mudas, o=objetivo, h=horizonte: baunilha.calcular_plano_acao(
+                n, o, h
+            ),
+            repeticoes,
+        )
+
+    resultados_cumulativos, resultados_anuais = baunilha.calcular_cumulativo(4000, 15)
+    yield medir(
+        "gerar_excel",
+        {"linhas": 15},
+        lambda: baunilha.gerar_excel(resultados_anuais, resultados_cumulativos),
+        repeticoes,
+    )
+    plano_acao, resultados_detalhados, _, _ = baunilha.calcular_plano_acao(
+        1000, 1e9, 200, taxa_crescimento_maxima=1.5
+    )
+    if plano_acao is not None:
+        yield medir(
+            "gerar_excel_plano",
+            {"linhas": len(resultados_detalhados)},
+            lambda: baunilha.gerar_excel_plano(plano_acao, resultados_detalhados),
+            max(1, repeticoes // 5),
+        )
+
+
+def chave(resultado):
+    return resultado["nome"], json.dumps(resultado["parametros"], sort_keys=True)
+
+
+def comparar(resultados, baseline, limite):
+    """Casos cuja mediana piorou mais que `limite` (fração) em relação à base."""
+    base = {chave(r): r for r in baseline["resultados"]}
+    regressoes = []
+    for resultado in resultados:
+        anterior = base.get(chave(resultado))
+        if anterior is None:
+            continue
+        razao = resultado["tempo_mediano_s"] / anterior["tempo_mediano_s"]
+        if razao > 1 + limite:
+            regressoes.append(
+                {
+                    "nome": resultado["nome"],
+                    "parametros": resultado["parametros"],
+                    "razao": razao,
+                }
+            )
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--saida", help="Arquivo JSON com os resultados")
+    parser.add_argument("--baseline", help="Resultados anteriores para comparação")
+    parser.add_argument(
+        "--limite", type=float, default=0.2, help="Piora relativa tolerada (0.2 = 20%%)"
+    )
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    resultados = []
+    for resultado in casos(args.repeticoes):
+        resultados.append(resultado)
+        print(
+            f"{resultado['nome']:<26} {json.dumps(resultado['parametros']):<50} "
+            f"{resultado['tempo_mediano_s'] * 1e3:10.3f} ms "
+            f"{resultado['pico_memoria_bytes'] / 1024:10.1f} KiB",
+            file=sys.stderr,
+        )
+
+    relatorio = {
+        "ambiente": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "plataforma": platform.platform(),
+        },
+        "resultados": resultados,
+    }
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as arquivo:
+            regressoes = comparar(resultados, json.load(arquivo), args.limite)
+        for regressao in regressoes:
+            print(
+                f"REGRESSÃO {regressao['nome']} {json.dumps(regressao['parametros'])}: "
+                f"{regressao['razao']:.2f}x",
+                file=sys.stderr,
+            )
+        return 1 if regressoes else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,178 @@
+"""Teste de carga do serviço HTTP (`baunilha.servico`).
+
+Abre várias conexões keep-alive, dispara requisições para uma rota com
+corpos sorteados de um conjunto de `--distintos` entradas (conjuntos
+pequenos exercitam a coalescência) e relata latência p50/p90/p99 e vazão:
+
+    python -m benchmarks.carga_servico --rota plano --requisicoes 2000
+    python -m benchmarks.carga_servico --url http://127.0.0.1:8000 --rota lote
+
+Sem `--url`, sobe o serviço em um subprocesso numa porta livre e o encerra
+no fim.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+ROTAS = ("cumulativo", "area", "plano", "lote")
+
+
+def gerar_corpos(rota, distintos, gerador, cenarios_por_lote=100):
+    def cenario():
+        return {
+            "num_mudas": gerador.choice((100, 1000, 4000, 20_000)),
+            "anos": gerador.randint(1, 15),
+            "usar_modelo_linear": gerador.random() < 0.5,
+            "sistema": gerador.choice(("SAF", "Semi-intensivo")),
+        }
+
+    corpos = []
+    for _ in range(distintos):
+        if rota == "plano":
+            corpo = {
+                "num_mudas": gerador.choice((100, 1000, 4000)),
+                "faturamento_objetivo": gerador.choice((1e4, 1e5, 1e6, 5e6)),
+                "anos": gerador.randint(3, 15),
+            }
+        elif rota == "lote":
+            corpo = {"cenarios": [cenario() for _ in range(cenarios_por_lote)]}
+        else:
+            corpo = cenario()
+        corpos.append(json.dumps(corpo).encode("utf-8"))
+    return corpos
+
+
+async def _requisitar(leitor, escritor, host, caminho, corpo):
+    cabecalho = (
+        f"POST {caminho} HTTP/1.1\r\nHost: {host}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(corpo)}\r\n\r\n"
+    )
+    escritor.write(cabecalho.encode("latin-1") + corpo)
+    await escritor.drain()
+    status = int((await leitor.readline()).split()[1])
+    tamanho = 0
+    while (linha := await leitor.readline()) not in (b"\r\n", b""):
+        nome, _, valor = linha.decode("latin-1").partition(":")
+        if nome.strip().lower() == "content-length":
+            tamanho = int(valor)
+    await leitor.readexactly(tamanho)
+    return status
+
+
+async def _cliente(host, porta, caminho, fila, latencias, erros):
+    leitor, escritor = await asyncio.open_connection(host, porta)
+    try:
+        while fila:
+            corpo = fila.pop()
+            inicio = time.perf_counter()
+            status = await _requisitar(leitor, escritor, host, caminho, corpo)
+            latencias.append(time.perf_counter() - inicio)
+            if status != 200:
+                erros.append(status)
+    finally:
+        escritor.close()
+
+
+async def executar_carga(host, porta, rota, corpos, requisicoes, concorrencia, semente):
+    gerador = random.Random(semente)
+    fila = [gerador.choice(corpos) for _ in range(requisicoes)]
+    latencias, erros = [], []
+    inicio = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _cliente(host, porta, f"/{rota}", fila, latencias, erros)
+            for _ in range(concorrencia)
+        )
+    )
+    segundos = time.perf_counter() - inicio
+
+    p50, p90, p99 = np.quantile(latencias, (0.5, 0.9, 0.99)) * 1e3
+    return {
+        "rota": rota,
+        "requisicoes": requisicoes,
+        "concorrencia": concorrencia,
+        "distintos": len(corpos),
+        "segundos": segundos,
+        "requisicoes_por_segundo": requisicoes / segundos,
+        "p50_ms": p50,
+        "p90_ms": p90,
+        "p99_ms": p99,
+        "maximo_ms": max(latencias) * 1e3,
+        "erros": len(erros),
+    }
+
+
+def _subir_servico(processos):
+    comando = [sys.executable, "-m", "baunilha", "servico", "--porta", "0"]
+    if processos:
+        comando += ["--processos", str(processos)]
+    processo = subprocess.Popen(comando, stderr=subprocess.PIPE, text=True)
+    linha = processo.stderr.readline()
+    encontrado = re.search(r"http://([^:]+):(\d+)", linha)
+    if encontrado is None:
+        processo.kill()
+        raise RuntimeError(f"O serviço não iniciou: {linha!r}")
+    # Repassa o restante do stderr para que o pipe nunca encha
+    threading.Thread(
+        target=lambda: sys.stderr.writelines(processo.stderr), daemon=True
+    ).start()
+    return processo, encontrado.group(1), int(encontrado.group(2))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Serviço já em execução (padrão: sobe um)")
+    parser.add_argument("--rota", choices=ROTAS, default="plano")
+    parser.add_argument("--requisicoes", type=int, default=1000)
+    parser.add_argument("--concorrencia", type=int, default=32)
+    parser.add_argument("--distintos", type=int, default=200)
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--saida", help="Arquivo JSON com o relatório")
+    args = parser.parse_args(argv)
+
+    processo = None
+    if args.url:
+        endereco = urlsplit(args.url)
+        host, porta = endereco.hostname, endereco.port or 80
+    else:
+        processo, host, porta = _subir_servico(args.processos)
+
+    try:
+        corpos = gerar_corpos(args.rota, args.distintos, random.Random(args.semente))
+        relatorio = asyncio.run(
+            executar_carga(
+                host,
+                porta,
+                args.rota,
+                corpos,
+                args.requisicoes,
+                args.concorrencia,
+                args.semente,
+            )
+        )
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait()
+
+    texto = json.dumps(relatorio, ensure_ascii=False, indent=2)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto + "\n")
+    print(texto)
+    return 1 if relatorio["erros"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,452 @@
+"""Equivalência numérica dos motores atuais com a implementação original.
+
+Gera um corpus de entradas sorteadas mais casos de borda (modelo linear nos
+anos 1 e 2, `fator_producao` limitado a 1, patamar de 2750 kg/ha, planos
+viáveis, inviáveis e no limite, horizontes nulos, negativos e além de 15
+anos), registra as saídas da implementação escalar original
+(`benchmarks.referencia`) e compara com elas, em bloco, cada motor de
+`MOTORES`. O relatório traz, por função,
+motor e campo, o maior erro absoluto e relativo, e por motor o tempo e o
+ganho sobre a referência:
+
+    python -m benchmarks.equivalencia --gravar referencia.json
+    python -m benchmarks.equivalencia --referencia referencia.json --saida eq.json
+
+Com `--referencia`, o corpus, as saídas e os tempos da referência vêm do
+arquivo em vez de serem recalculados. O processo termina com código 1 se
+algum campo de algum motor passar da tolerância.
+
+A tolerância é relativa (`RTOL`) em todos os campos, exceto onde a versão
+original é propositalmente menos precisa (`TOLERANCIAS`): a busca binária da
+taxa para com intervalo de 1e-4. As mudas mínimas da versão original sobem de
+10% em 10%, então só podem passar do valor exato, e em menos de 10%
+(`EXCESSOS`): atual <= referência <= 1,1 * atual.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+
+import baunilha
+
+from . import referencia
+
+VERSAO_FORMATO = 1
+RTOL = 1e-9
+# (absoluta, relativa) por função e campo. O faturamento do plano herda o erro
+# da taxa, ampliado pelo expoente (até 20 anos no corpus)
+TOLERANCIAS = {
+    ("plano", "taxa_crescimento"): (1e-4, 0.0),
+    ("plano", "faturamento_acumulado"): (0.0, 2e-3),
+}
+# Campos em que a referência fica entre o valor atual e `fator` vezes ele
+EXCESSOS = {("plano", "mudas_minimas"): 1.1}
+COLUNAS_CUMULATIVO = [
+    "Produção Total (kg)",
+    "Número de Favas",
+    "Peso Favas Verdes (kg)",
+    "Peso Favas Curadas (kg)",
+    "Valor Favas Verdes (US$)",
+    "Valor Favas Curadas (US$)",
+    "Valor Extrato (US$)",
+    "Volume Extrato (kg)",
+    "Faturamento Bruto (US$)",
+    "Faturamento Líquido (US$)",
+]
+
+# Campos do plano definidos em cada ramo (viável, inviável)
+CAMPOS_PLANO = {
+    True: ("taxa_crescimento", "faturamento_acumulado"),
+    False: ("faturamento_maximo", "mudas_minimas", "anos_necessarios"),
+}
+
+
+def _colunas(linhas, nomes):
+    return {nome: np.array(valores) for nome, valores in zip(nomes, zip(*linhas))}
+
+
+def _concatenar(*partes):
+    return {
+        nome: np.concatenate([parte[nome] for parte in partes]) for nome in partes[0]
+    }
+
+
+def gerar_corpus(casos=1000, planos=200, semente=0):
+    """Entradas de cada função: casos de borda seguidos de casos sorteados."""
+    rng = np.random.default_rng(semente)
+
+    # Idades 1 a 8 cobrem o modelo linear, a tabela, o corte de favas (idade
+    # 6) e o patamar; mudas fracionárias aparecem nas coortes do plano
+    nomes = ("num_mudas", "ano", "usar_modelo_linear")
+    borda = [
+        (mudas, ano, linear)
+        for mudas in (1, 2.5, 3999, 4000, 4001, 123456.789)
+        for ano in (*range(1, 9), 50)
+        for linear in (False, True)
+    ]
+    sorteados = (
+        10 ** rng.uniform(0, 6, casos),
+        rng.integers(1, 41, casos),
+        rng.random(casos) < 0.5,
+    )
+    produtividade = _concatenar(_colunas(borda, nomes), dict(zip(nomes, sorteados)))
+
+    nomes = ("num_mudas", "anos", "usar_modelo_linear")
+    borda = [
+        (mudas, anos, linear)
+        for mudas in (1, 2.5, 4000)
+        for anos in (-3, 0, 1, 2, 3, 6, 7, 15, 40)
+        for linear in (False, True)
+    ]
+    sorteados = (
+        10 ** rng.uniform(0, 6, casos),
+        rng.integers(1, 41, casos),
+        rng.random(casos) < 0.5,
+    )
+    cumulativo = _concatenar(_colunas(borda, nomes), dict(zip(nomes, sorteados)))
+
+    # O objetivo é uma fração do faturamento máximo (com a taxa máxima), então
+    # o sorteio cai nos dois ramos. O máximo só define as entradas; a conta
+    # usa o motor de coortes para o corpus sair rápido. Antes do terceiro ano
+    # não há faturamento e a referência não termina com objetivo positivo, então
+    # esses horizontes (inclusive nulos e negativos) entram só com objetivo zero.
+    nomes = ("num_mudas", "faturamento_objetivo", "anos", "taxa_crescimento_maxima")
+    curva = baunilha.calcular_curva_receita_por_muda(40)
+
+    def maximo(mudas, anos, taxa):
+        return float(
+            baunilha.calcular_faturamento_total_coortes(
+                mudas, taxa, anos, baunilha.MARGEM_LUCRO_PLANO, curva
+            )
+        )
+
+    borda = []
+    for mudas, anos in ((4000, 3), (4000, 6), (1000, 15), (250.5, 16), (100, 20)):
+        fatores = (
+            1 - 1e-9,  # viável por pouco
+            1 + 1e-9,  # inviável por pouco
+            1e-3,  # abaixo do faturamento sem crescimento: taxa 1
+            50.0,  # muito além: várias rodadas de +10% nas mudas
+        )
+        borda += [(mudas, maximo(mudas, anos, 1.5) * f, anos, 1.5) for f in fatores]
+    borda += [(4000, 0.0, anos, 1.5) for anos in (-2, 0, 1, 2)]
+    sorteados = (
+        10 ** rng.uniform(1, 5, planos),
+        10 ** rng.uniform(-1, 1, planos),
+        rng.integers(3, 21, planos),
+        rng.uniform(1.05, 2.0, planos),
+    )
+    sorteados[1][:] *= [
+        maximo(mudas, int(anos), taxa)
+        for mudas, anos, taxa in zip(sorteados[0], sorteados[2], sorteados[3])
+    ]
+    plano = _concatenar(_colunas(borda, nomes), dict(zip(nomes, sorteados)))
+
+    return {"produtividade": produtividade, "cumulativo": cumulativo, "plano": plano}
+
+
+def _casos(entradas):
+    """Itera as linhas do corpus como tuplas de escalares Python."""
+    return zip(*(valores.tolist() for valores in entradas.values()))
+
+
+def _produtividade(funcao, entradas):
+    resultados = [funcao(*caso) for caso in _casos(entradas)]
+    return {
+        chave: np.array([r[chave] for r in resultados], dtype=float)
+        for chave in resultados[0]
+    }
+
+
+def _cumulativo(funcao, entradas):
+    saida = {coluna: [] for coluna in COLUNAS_CUMULATIVO}
+    anuais = {coluna: [] for coluna in COLUNAS_CUMULATIVO}
+    for caso in _casos(entradas):
+        cumulativos, resultados_anuais = funcao(*caso)
+        if isinstance(resultados_anuais, list):  # formato da referência
+            resultados_anuais = {
+                coluna: [linha[coluna] for linha in resultados_anuais]
+                for coluna in COLUNAS_CUMULATIVO
+            }
+        for coluna in COLUNAS_CUMULATIVO:
+            saida[coluna].append(cumulativos[coluna])
+            anuais[coluna].append(np.asarray(resultados_anuais[coluna], dtype=float))
+    return {
+        **{coluna: np.array(valores) for coluna, valores in saida.items()},
+        **{f"{coluna} anual": np.concatenate(v) for coluna, v in anuais.items()},
+    }
+
+
+def _plano(funcao, entradas):
+    resultados = [funcao(*caso) for caso in _casos(entradas)]
+    saida = {}
+    for campo in ("possivel", *CAMPOS_PLANO[True], *CAMPOS_PLANO[False]):
+        if not any(campo in resultado for resultado in resultados):
+            continue  # o motor não calcula esse campo
+        valores = []
+        for resultado in resultados:
+            # Cada ramo só define os seus campos, como na versão original
+            valor = None
+            if campo == "possivel" or campo in CAMPOS_PLANO[resultado["possivel"]]:
+                valor = resultado.get(campo)
+            valores.append(float("nan") if valor is None else float(valor))
+        saida[campo] = np.array(valores)
+    return saida
+
+
+def _plano_referencia(num_mudas, faturamento_objetivo, anos, taxa_maxima):
+    plano, _, taxa_crescimento, info = referencia.calcular_plano_acao(
+        num_mudas, faturamento_objetivo, anos, taxa_maxima
+    )
+    if plano is None:
+        return info
+    return {
+        "possivel": True,
+        "taxa_crescimento": taxa_crescimento,
+        "faturamento_acumulado": (
+            plano[-1]["Faturamento Acumulado (US$)"] if plano else 0.0
+        ),
+    }
+
+
+def _plano_atual(num_mudas, faturamento_objetivo, anos, taxa_maxima):
+    plano, _, taxa_crescimento, info = baunilha.calcular_plano_acao(
+        num_mudas, faturamento_objetivo, anos, taxa_maxima
+    )
+    if plano is None:
+        return info
+    return {
+        "possivel": True,
+        "taxa_crescimento": taxa_crescimento,
+        "faturamento_acumulado": (
+            plano["Faturamento Acumulado (US$)"].iloc[-1] if len(plano) else 0.0
+        ),
+    }
+
+
+def _produtividade_vetorizada(entradas):
+    num_mudas = entradas["num_mudas"]
+    linear = np.asarray(entradas["usar_modelo_linear"], dtype=bool)
+    saida = None
+    for valor in (False, True):
+        grupo = linear == valor
+        resultado = baunilha.calcular_produtividade_baunilha_vetorizado(
+            num_mudas[grupo], entradas["ano"][grupo], valor
+        )
+        if saida is None:
+            saida = {chave: np.empty(len(num_mudas)) for chave in resultado}
+        for chave, valores in resultado.items():
+            saida[chave][grupo] = valores
+    return saida
+
+
+REFERENCIAS = {
+    "produtividade": lambda entradas: _produtividade(
+        referencia.calcular_produtividade_baunilha, entradas
+    ),
+    "cumulativo": lambda entradas: _cumulativo(
+        referencia.calcular_cumulativo, entradas
+    ),
+    "plano": lambda entradas: _plano(_plano_referencia, entradas),
+}
+
+# Motores comparados com a referência, por função; cada um recebe as colunas
+# de entrada do corpus e devolve um dicionário campo -> array
+MOTORES = {
+    "produtividade": {
+        "escalar": lambda entradas: _produtividade(
+            baunilha.calcular_produtividade_baunilha, entradas
+        ),
+        "vetorizado": _produtividade_vetorizada,
+    },
+    "cumulativo": {
+        "calcular_cumulativo": lambda entradas: _cumulativo(
+            baunilha.calcular_cumulativo, entradas
+        ),
+    },
+    "plano": {
+        "calcular_plano_acao": lambda entradas: _plano(_plano_atual, entradas),
+    },
+}
+
+
+def cronometrar(motor, entradas, repeticoes=1):
+    """Saída e menor tempo de `repeticoes` execuções sobre o corpus inteiro.
+
+    O cache de curvas é limpo antes de cada execução, como em `bench_motor`.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        baunilha.obter_cache_curvas().limpar()
+        inicio = time.perf_counter()
+        saida = motor(entradas)
+        tempos.append(time.perf_counter() - inicio)
+    return saida, min(tempos)
+
+
+def comparar(funcao, esperado, obtido):
+    """Erros máximos de cada campo de `obtido` em relação a `esperado`.
+
+    Um valor ausente (NaN) de um lado e presente do outro conta como
+    divergência.
+    """
+    campos = []
+    for campo, referencia_campo in esperado.items():
+        if campo not in obtido:
+            continue
+        valores = np.asarray(obtido[campo], dtype=float)
+        ausentes = np.isnan(referencia_campo)
+        divergentes = ausentes != np.isnan(valores)
+        presentes = ~ausentes & ~divergentes
+
+        escala = np.abs(referencia_campo[presentes])
+        erro_absoluto = np.abs(valores[presentes] - referencia_campo[presentes])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            erro_relativo = np.where(erro_absoluto > 0, erro_absoluto / escala, 0.0)
+        fator = EXCESSOS.get((funcao, campo))
+        if fator is None:
+            absoluta, relativa = TOLERANCIAS.get((funcao, campo), (0.0, RTOL))
+            fora = erro_absoluto > absoluta + relativa * escala
+        else:
+            # Unilateral, com RTOL de folga para o arredondamento
+            absoluta, relativa = 0.0, fator - 1
+            atual = valores[presentes]
+            fora = (atual > escala * (1 + RTOL)) | (escala > fator * atual * (1 + RTOL))
+        campos.append(
+            {
+                "campo": campo,
+                "erro_absoluto_max": float(erro_absoluto.max(initial=0.0)),
+                "erro_relativo_max": float(erro_relativo.max(initial=0.0)),
+                "tolerancia": [absoluta, relativa],
+                "unilateral": fator is not None,
+                "divergencias": int(divergentes.sum() + fora.sum()),
+            }
+        )
+    return campos
+
+
+def _serializar(colunas):
+    return {nome: np.asarray(valores).tolist() for nome, valores in colunas.items()}
+
+
+def _desserializar(colunas):
+    return {nome: np.asarray(valores) for nome, valores in colunas.items()}
+
+
+def carregar_referencia(caminho):
+    with open(caminho, encoding="utf-8") as arquivo:
+        dados = json.load(arquivo)
+    if dados.get("versao") != VERSAO_FORMATO:
+        raise ValueError("Arquivo de referência em formato antigo; grave de novo.")
+    return {
+        funcao: {
+            "entradas": _desserializar(dados["corpus"][funcao]),
+            "saidas": {
+                campo: np.asarray(valores, dtype=float)
+                for campo, valores in dados["saidas"][funcao].items()
+            },
+            "segundos": dados["segundos"][funcao],
+        }
+        for funcao in dados["corpus"]
+    }
+
+
+def gravar_referencia(caminho, gabarito, semente):
+    dados = {
+        "versao": VERSAO_FORMATO,
+        "semente": semente,
+        "corpus": {f: _serializar(g["entradas"]) for f, g in gabarito.items()},
+        "saidas": {f: _serializar(g["saidas"]) for f, g in gabarito.items()},
+        "segundos": {f: g["segundos"] for f, g in gabarito.items()},
+    }
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(dados, arquivo, ensure_ascii=False)
+
+
+def calcular_referencia(corpus):
+    gabarito = {}
+    for funcao, entradas in corpus.items():
+        saidas, segundos = cronometrar(REFERENCIAS[funcao], entradas)
+        gabarito[funcao] = {
+            "entradas": entradas,
+            "saidas": saidas,
+            "segundos": segundos,
+        }
+    return gabarito
+
+
+def avaliar_motores(gabarito, repeticoes=3):
+    """Compara todos os motores com o gabarito; um registro por motor."""
+    for funcao, motores in MOTORES.items():
+        esperado = gabarito[funcao]
+        for nome, motor in motores.items():
+            saida, segundos = cronometrar(motor, esperado["entradas"], repeticoes)
+            campos = comparar(funcao, esperado["saidas"], saida)
+            yield {
+                "funcao": funcao,
+                "motor": nome,
+                "casos": len(next(iter(esperado["entradas"].values()))),
+                "segundos": segundos,
+                "segundos_referencia": esperado["segundos"],
+                "ganho": esperado["segundos"] / segundos,
+                "ok": all(campo["divergencias"] == 0 for campo in campos),
+                "campos": campos,
+            }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--referencia", help="Gabarito gravado com --gravar")
+    parser.add_argument("--gravar", help="Grava o corpus e as saídas da referência")
+    parser.add_argument("--saida", help="Arquivo JSON com o relatório")
+    parser.add_argument("--casos", type=int, default=1000)
+    parser.add_argument("--planos", type=int, default=200)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.referencia:
+        gabarito = carregar_referencia(args.referencia)
+    else:
+        corpus = gerar_corpus(args.casos, args.planos, args.semente)
+        gabarito = calcular_referencia(corpus)
+    if args.gravar:
+        gravar_referencia(args.gravar, gabarito, args.semente)
+
+    resultados = []
+    for resultado in avaliar_motores(gabarito, args.repeticoes):
+        resultados.append(resultado)
+        print(
+            f"{resultado['funcao']:<14} {resultado['motor']:<20} "
+            f"{resultado['casos']:>6} casos {resultado['segundos'] * 1e3:10.3f} ms "
+            f"{resultado['ganho']:9.1f}x {'ok' if resultado['ok'] else 'FALHOU'}",
+            file=sys.stderr,
+        )
+        for campo in resultado["campos"]:
+            print(
+                f"    {campo['campo']:<40} abs {campo['erro_absoluto_max']:10.3e} "
+                f"rel {campo['erro_relativo_max']:10.3e}"
+                + (f"  {campo['divergencias']} fora" if campo["divergencias"] else ""),
+                file=sys.stderr,
+            )
+
+    if args.saida:
+        relatorio = {
+            "ambiente": {
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "plataforma": platform.platform(),
+            },
+            "resultados": resultados,
+        }
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    return 0 if all(resultado["ok"] for resultado in resultados) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
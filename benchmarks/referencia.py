@@ -0,0 +1,233 @@
+"""Implementação escalar original do modelo, usada como referência numérica.
+
+Cópia das funções `calcular_produtividade_baunilha`, `calcular_cumulativo` e
+`calcular_plano_acao` como estavam antes da extração para o pacote
+`baunilha`: laços em Python, um ano e uma coorte por vez, busca binária da
+taxa e aumento de 10% nas mudas mínimas. A única mudança é que o plano
+devolve listas de dicionários em vez de DataFrames, para não depender do
+pandas. Não otimize este módulo: ele é o gabarito de `benchmarks.equivalencia`.
+"""
+
+CUSTO_POR_MUDA = 0.85  # US$
+PRECO_EXTRATO_POR_TONELADA = 135435.20  # US$
+
+
+def calcular_produtividade_baunilha(num_mudas, ano, usar_modelo_linear=False):
+    producao_por_hectare = {
+        3: 500,
+        4: 1000,
+        5: 1600,
+        6: 2500,
+    }
+
+    hectares = num_mudas / 4000  # Agora usamos um valor fixo de mudas por hectare
+
+    if usar_modelo_linear and ano <= 2:
+        coef = (500 - 0) / (3 - 0)
+        producao = max(0, coef * (ano - 0)) * hectares
+    elif ano <= 6:
+        producao = producao_por_hectare.get(ano, 0) * hectares
+    else:
+        producao = 2750 * hectares
+
+    producao_kg = producao
+    produtividade_por_pe = producao_kg / num_mudas
+
+    # Cálculo do número de favas
+    favas_por_pe_max = 30
+    fator_producao = min(1, producao_kg / (2500 * hectares))
+    favas_por_pe = favas_por_pe_max * fator_producao
+    numero_favas = favas_por_pe * num_mudas
+
+    # Cálculo do peso das favas
+    peso_favas_verdes = numero_favas * 20 / 1000  # em kg
+    peso_favas_curadas = numero_favas * 4 / 1000  # em kg
+
+    # Cálculo do preço de cada fava
+    unidade_fava_verde = (20 * 15) / 1000  # US$/kg
+    unidade_fava_curada = (4 * 139.75) / 1000  # US$/kg
+
+    # Cálculo do valor de mercado das favas
+    valor_favas_verdes = unidade_fava_verde * numero_favas  # US$
+    valor_favas_curadas = unidade_fava_curada * numero_favas  # US$
+
+    # Cálculo do volume e valor do extrato
+    volume_extrato = peso_favas_curadas / 0.25  # kg de extrato (25% de favas)
+    valor_extrato = (volume_extrato / 1000) * PRECO_EXTRATO_POR_TONELADA  # US$
+
+    return {
+        "producao_kg": producao_kg,
+        "produtividade_por_pe": produtividade_por_pe,
+        "numero_favas": numero_favas,
+        "peso_favas_verdes": peso_favas_verdes,
+        "peso_favas_curadas": peso_favas_curadas,
+        "valor_favas_verdes": valor_favas_verdes,
+        "valor_favas_curadas": valor_favas_curadas,
+        "valor_extrato": valor_extrato,
+        "volume_extrato": volume_extrato,
+    }
+
+
+def calcular_cumulativo(num_mudas, anos, usar_modelo_linear=False):
+    resultados_cumulativos = {
+        "Produção Total (kg)": 0,
+        "Número de Favas": 0,
+        "Peso Favas Verdes (kg)": 0,
+        "Peso Favas Curadas (kg)": 0,
+        "Valor Favas Verdes (US$)": 0,
+        "Valor Favas Curadas (US$)": 0,
+        "Valor Extrato (US$)": 0,
+        "Volume Extrato (kg)": 0,
+        "Faturamento Bruto (US$)": 0,
+        "Custo Inicial Mudas (US$)": num_mudas * CUSTO_POR_MUDA,
+    }
+    resultados_anuais = []
+
+    for ano in range(1, anos + 1):
+        res = calcular_produtividade_baunilha(num_mudas, ano, usar_modelo_linear)
+        faturamento_bruto = res["valor_extrato"]
+        lucro_bruto = faturamento_bruto * 0.2130  # 21.30% do faturamento bruto
+        custo_inicial_mudas = num_mudas * CUSTO_POR_MUDA if ano == 1 else 0
+        lucro_liquido = lucro_bruto - custo_inicial_mudas
+
+        resultados_anuais.append(
+            {
+                "Ano": ano,
+                "Produção Total (kg)": res["producao_kg"],
+                "Número de Favas": res["numero_favas"],
+                "Peso Favas Verdes (kg)": res["peso_favas_verdes"],
+                "Peso Favas Curadas (kg)": res["peso_favas_curadas"],
+                "Valor Favas Verdes (US$)": res["valor_favas_verdes"],
+                "Valor Favas Curadas (US$)": res["valor_favas_curadas"],
+                "Valor Extrato (US$)": res["valor_extrato"],
+                "Volume Extrato (kg)": res["volume_extrato"],
+                "Faturamento Bruto (US$)": faturamento_bruto,
+                "Faturamento Líquido (US$)": lucro_liquido,
+            }
+        )
+
+        for key in resultados_cumulativos:
+            if key != "Custo Inicial Mudas (US$)":
+                resultados_cumulativos[key] += resultados_anuais[-1][key]
+
+    # Calcular o faturamento líquido cumulativo
+    faturamento_bruto_total = resultados_cumulativos["Faturamento Bruto (US$)"]
+    custo_inicial_mudas = resultados_cumulativos["Custo Inicial Mudas (US$)"]
+    lucro_bruto = faturamento_bruto_total * 0.2130  # 21.30% do faturamento bruto
+    lucro_liquido = lucro_bruto - custo_inicial_mudas
+
+    resultados_cumulativos["Faturamento Líquido (US$)"] = lucro_liquido
+
+    return resultados_cumulativos, resultados_anuais
+
+
+def calcular_plano_acao(
+    num_mudas_inicial, faturamento_objetivo, anos, taxa_crescimento_maxima=1.5
+):
+    def calcular_faturamento_total(mudas_inicial, taxa_crescimento, anos_calc):
+        fat_total = 0
+        mudas = mudas_inicial
+        for ano in range(1, anos_calc + 1):
+            fat_anual = 0
+            for ano_impl in range(1, ano + 1):
+                mudas_impl = mudas_inicial * (taxa_crescimento ** (ano_impl - 1))
+                resultado = calcular_produtividade_baunilha(
+                    mudas_impl, ano - ano_impl + 1
+                )
+                valor_extrato = resultado["valor_extrato"]
+                fat_anual += valor_extrato * 0.22
+            fat_total += fat_anual
+            mudas *= taxa_crescimento
+        return fat_total
+
+    # Verificar se é possível atingir o objetivo com o crescimento máximo
+    faturamento_maximo = calcular_faturamento_total(
+        num_mudas_inicial, taxa_crescimento_maxima, anos
+    )
+    if faturamento_maximo < faturamento_objetivo:
+        # Calcular o número mínimo de mudas iniciais necessárias
+        mudas_min = num_mudas_inicial
+        while (
+            calcular_faturamento_total(mudas_min, taxa_crescimento_maxima, anos)
+            < faturamento_objetivo
+        ):
+            mudas_min *= 1.1  # Aumentar em 10% e tentar novamente
+
+        # Calcular o número de anos necessários com as mudas iniciais fornecidas
+        anos_necessarios = anos
+        while (
+            anos_necessarios <= 15
+            and calcular_faturamento_total(
+                num_mudas_inicial, taxa_crescimento_maxima, anos_necessarios
+            )
+            < faturamento_objetivo
+        ):
+            anos_necessarios += 1
+
+        return (
+            None,
+            None,
+            None,
+            {
+                "possivel": False,
+                "faturamento_maximo": faturamento_maximo,
+                "mudas_minimas": mudas_min,
+                "anos_necessarios": (
+                    anos_necessarios if anos_necessarios <= 15 else None
+                ),
+            },
+        )
+
+    # Encontrar a taxa de crescimento ideal usando busca binária
+    taxa_min, taxa_max = 1.0, taxa_crescimento_maxima
+    while taxa_max - taxa_min > 0.0001:
+        taxa_meio = (taxa_min + taxa_max) / 2
+        if (
+            calcular_faturamento_total(num_mudas_inicial, taxa_meio, anos)
+            < faturamento_objetivo
+        ):
+            taxa_min = taxa_meio
+        else:
+            taxa_max = taxa_meio
+
+    taxa_crescimento = (taxa_min + taxa_max) / 2
+
+    # Calcular o plano com a taxa de crescimento encontrada
+    resultados_plano = []
+    resultados_detalhados = []
+    num_mudas = num_mudas_inicial
+    faturamento_acumulado = 0
+
+    for ano in range(1, anos + 1):
+        faturamento_liquido_anual = 0
+        for ano_impl in range(1, ano + 1):
+            mudas_impl = num_mudas_inicial * (taxa_crescimento ** (ano_impl - 1))
+            resultado = calcular_produtividade_baunilha(mudas_impl, ano - ano_impl + 1)
+            valor_extrato = resultado["valor_extrato"]
+            faturamento_liquido_anual += valor_extrato * 0.213
+            resultados_detalhados.append(
+                {
+                    "Ano de Implementação": ano_impl,
+                    "Ano": ano,
+                    "Número de Mudas": mudas_impl,
+                    "Faturamento Líquido (US$)": valor_extrato * 0.213,
+                }
+            )
+
+        faturamento_acumulado += faturamento_liquido_anual
+        resultados_plano.append(
+            {
+                "Ano": ano,
+                "Número de Mudas": num_mudas,
+                "Faturamento Líquido (US$)": faturamento_liquido_anual,
+                "Faturamento Acumulado (US$)": faturamento_acumulado,
+            }
+        )
+        num_mudas = num_mudas * taxa_crescimento
+
+    return (
+        resultados_plano,
+        resultados_detalhados,
+        taxa_crescimento,
+        {"possivel": True},
+    )
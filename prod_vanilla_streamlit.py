@@ -1,558 +1,672 @@
+import atexit
+import os
+
 import streamlit as st
 import pandas as pd
 import altair as alt
-import numpy as np
-from io import BytesIO
-
-CUSTO_POR_MUDA = 0.85  # US$
-PRECO_EXTRATO_POR_TONELADA = 135435.20  # US$
-
-
-def calcular_produtividade_baunilha(num_mudas, ano, usar_modelo_linear=False):
-    producao_por_hectare = {
-        3: 500,
-        4: 1000,
-        5: 1600,
-        6: 2500,
-    }
-
-    hectares = num_mudas / 4000  # Agora usamos um valor fixo de mudas por hectare
-
-    if usar_modelo_linear and ano <= 2:
-        coef = (500 - 0) / (3 - 0)
-        producao = max(0, coef * (ano - 0)) * hectares
-    elif ano <= 6:
-        producao = producao_por_hectare.get(ano, 0) * hectares
-    else:
-        producao = 2750 * hectares
-
-    producao_kg = producao
-    produtividade_por_pe = producao_kg / num_mudas
-
-    # Cálculo do número de favas
-    favas_por_pe_max = 30
-    fator_producao = min(1, producao_kg / (2500 * hectares))
-    favas_por_pe = favas_por_pe_max * fator_producao
-    numero_favas = favas_por_pe * num_mudas
-
-    # Cálculo do peso das favas
-    peso_favas_verdes = numero_favas * 20 / 1000  # em kg
-    peso_favas_curadas = numero_favas * 4 / 1000  # em kg
-
-    # Cálculo do preço de cada fava
-    unidade_fava_verde = (20 * 15) / 1000  # US$/kg
-    unidade_fava_curada = (4 * 139.75) / 1000  # US$/kg
-
-    # Cálculo do valor de mercado das favas
-    valor_favas_verdes = unidade_fava_verde * numero_favas  # US$
-    valor_favas_curadas = unidade_fava_curada * numero_favas  # US$
-
-    # Cálculo do volume e valor do extrato
-    volume_extrato = peso_favas_curadas / 0.25  # kg de extrato (25% de favas)
-    valor_extrato = (volume_extrato / 1000) * PRECO_EXTRATO_POR_TONELADA  # US$
-
-    return {
-        "producao_kg": producao_kg,
-        "produtividade_por_pe": produtividade_por_pe,
-        "numero_favas": numero_favas,
-        "peso_favas_verdes": peso_favas_verdes,
-        "peso_favas_curadas": peso_favas_curadas,
-        "valor_favas_verdes": valor_favas_verdes,
-        "valor_favas_curadas": valor_favas_curadas,
-        "valor_extrato": valor_extrato,
-        "volume_extrato": volume_extrato
-    }
-
-
-def calcular_cumulativo(num_mudas, anos, usar_modelo_linear=False):
-    resultados_cumulativos = {
-        "Produção Total (kg)": 0,
-        "Número de Favas": 0,
-        "Peso Favas Verdes (kg)": 0,
-        "Peso Favas Curadas (kg)": 0,
-        "Valor Favas Verdes (US$)": 0,
-        "Valor Favas Curadas (US$)": 0,
-        "Valor Extrato (US$)": 0,
-        "Volume Extrato (kg)": 0,
-        "Faturamento Bruto (US$)": 0,
-        "Custo Inicial Mudas (US$)": num_mudas * CUSTO_POR_MUDA,
-    }
-    resultados_anuais = []
-
-    for ano in range(1, anos + 1):
-        res = calcular_produtividade_baunilha(num_mudas, ano, usar_modelo_linear)
-        faturamento_bruto = res["valor_extrato"]
-        lucro_bruto = faturamento_bruto * 0.2130  # 21.30% do faturamento bruto
-        custo_inicial_mudas = num_mudas * CUSTO_POR_MUDA if ano == 1 else 0
-        lucro_liquido = lucro_bruto - custo_inicial_mudas
-
-        resultados_anuais.append(
-            {
-                "Ano": ano,
-                "Produção Total (kg)": res["producao_kg"],
-                "Número de Favas": res["numero_favas"],
-                "Peso Favas Verdes (kg)": res["peso_favas_verdes"],
-                "Peso Favas Curadas (kg)": res["peso_favas_curadas"],
-                "Valor Favas Verdes (US$)": res["valor_favas_verdes"],
-                "Valor Favas Curadas (US$)": res["valor_favas_curadas"],
-                "Valor Extrato (US$)": res["valor_extrato"],
-                "Volume Extrato (kg)": res["volume_extrato"],
-                "Faturamento Bruto (US$)": faturamento_bruto,
-                "Faturamento Líquido (US$)": lucro_liquido,
-            }
-        )
-
-        for key in resultados_cumulativos:
-            if key != "Custo Inicial Mudas (US$)":
-                resultados_cumulativos[key] += resultados_anuais[-1][key]
-
-    # Calcular o faturamento líquido cumulativo
-    faturamento_bruto_total = resultados_cumulativos["Faturamento Bruto (US$)"]
-    custo_inicial_mudas = resultados_cumulativos["Custo Inicial Mudas (US$)"]
-    lucro_bruto = faturamento_bruto_total * 0.2130  # 21.30% do faturamento bruto
-    lucro_liquido = lucro_bruto - custo_inicial_mudas
-
-    resultados_cumulativos["Faturamento Líquido (US$)"] = lucro_liquido
-
-    return resultados_cumulativos, resultados_anuais
-
-
-def calcular_area_necessaria(num_mudas, sistema):
-    if sistema == "SAF":
-        return (num_mudas * 4) / 10000  # 4m² por muda no SAF
-    else:  # Semi-intensivo
-        return (num_mudas * 2.5) / 10000  # 2.5m² por muda no semi-intensivo
 
+from baunilha import (
+    calcular_area_necessaria,
+    calcular_cumulativo,
+    calcular_plano_acao,
+    gerar_excel,
+    gerar_excel_plano,
+)
+from baunilha.armazenamento import ArmazenamentoResultados
+from baunilha.exportacao import MIME_XLSX
+from baunilha.graficos import dados_grafico
+from baunilha.instrumentacao import (
+    METRICAS,
+    MODOS_PERFIL,
+    medido,
+    medir,
+    modo_perfil,
+    requisicao,
+)
+from baunilha.montecarlo import histograma, simular_cumulativo, tabela_quantis
+from baunilha.otimizador import otimizar_cronograma
+from baunilha.sensibilidade import calcular_superficie
+from baunilha.viabilidade import carregar_tabela
+
+ANOS_MAXIMO = 15  # limite do controle de anos de projeção
+
+# Os resultados ficam em cache por combinação de entradas e são
+# compartilhados entre as sessões: cada rerun só recalcula o que mudou.
+# Com BAUNILHA_ARMAZENAMENTO apontando para um arquivo SQLite, os resultados
+# também ficam em disco, compartilhados entre workers e reinícios. Com
+# BAUNILHA_VIABILIDADE apontando para uma tabela de `python -m baunilha
+# viabilidade`, os planos inviáveis são lidos dela em vez de resolvidos.
+
+
+@st.cache_resource
+def obter_armazenamento():
+    caminho = os.environ.get("BAUNILHA_ARMAZENAMENTO")
+    if not caminho:
+        return None
+    armazenamento = ArmazenamentoResultados(caminho)
+    # Contadores e acessos ficam em memória entre descargas: grava ao sair
+    atexit.register(armazenamento.fechar)
+    return armazenamento
+
+
+@st.cache_resource
+def obter_superficie():
+    # Cenários de sensibilidade por muda para todos os horizontes do controle
+    # de anos e todas as variações do controle de sensibilidade: mover um
+    # deles é só uma consulta
+    return calcular_superficie([1.0], anos_maximo=ANOS_MAXIMO)
+
+
+@st.cache_resource
+def obter_tabela_viabilidade():
+    caminho = os.environ.get("BAUNILHA_VIABILIDADE")
+    if not caminho or not os.path.exists(caminho):
+        return None
+    return carregar_tabela(caminho)
+
+
+def armazenado(tipo, entradas, calcular):
+    armazenamento = obter_armazenamento()
+    if armazenamento is None:
+        return calcular()
+    return armazenamento.obter(tipo, entradas, calcular)
+
+
+@st.cache_data(show_spinner=False, max_entries=512)
+@medido("calculo.projetar")
+def projetar(num_mudas, anos_projecao, usar_modelo_linear):
+    resultados_cumulativos, resultados_anuais = armazenado(
+        "cumulativo",
+        {"num_mudas": num_mudas, "anos": anos_projecao, "linear": usar_modelo_linear},
+        lambda: calcular_cumulativo(num_mudas, anos_projecao, usar_modelo_linear),
+    )
 
-def gerar_excel(resultados_anuais, resultados_cumulativos):
-    output = BytesIO()
-    writer = pd.ExcelWriter(output, engine="openpyxl")
+    df_cumulativo = pd.DataFrame(resultados_anuais)
+    df_cumulativo = df_cumulativo.cumsum().reset_index()
+    df_cumulativo["Ano"] = range(1, anos_projecao + 1)
 
-    df_anuais = pd.DataFrame(resultados_anuais)
-    df_cumulativos = pd.DataFrame([resultados_cumulativos])
+    df_resultados_anuais = pd.DataFrame(resultados_anuais).set_index("Ano")
 
-    df_anuais.to_excel(writer, sheet_name="Anuais", index=False)
-    df_cumulativos.to_excel(writer, sheet_name="Cumulativos", index=False)
+    return (
+        resultados_cumulativos,
+        resultados_anuais,
+        df_cumulativo,
+        df_resultados_anuais,
+    )
 
-    writer.close()
-    output.seek(0)
 
-    return output
+@st.cache_data(show_spinner=False, max_entries=512)
+@medido("calculo.plano_acao")
+def gerar_plano(num_mudas, faturamento_objetivo, anos_projecao):
+    return armazenado(
+        "plano",
+        {
+            "num_mudas": num_mudas,
+            "objetivo": faturamento_objetivo,
+            "anos": anos_projecao,
+        },
+        lambda: calcular_plano_acao(
+            num_mudas,
+            faturamento_objetivo,
+            anos_projecao,
+            tabela_viabilidade=obter_tabela_viabilidade(),
+        ),
+    )
 
 
-def calcular_plano_acao(
-    num_mudas_inicial, faturamento_objetivo, anos, taxa_crescimento_maxima=1.5
+@st.cache_data(show_spinner=False, max_entries=256)
+@medido("calculo.otimizar_cronograma")
+def otimizar_plantio(
+    faturamento_objetivo,
+    anos_projecao,
+    sistema,
+    mudas_maximas_por_ano=None,
+    orcamento_custo=None,
+    orcamento_area=None,
 ):
-    def calcular_faturamento_total(mudas_inicial, taxa_crescimento, anos_calc):
-        fat_total = 0
-        mudas = mudas_inicial
-        for ano in range(1, anos_calc + 1):
-            fat_anual = 0
-            for ano_impl in range(1, ano + 1):
-                mudas_impl = mudas_inicial * (taxa_crescimento ** (ano_impl - 1))
-                resultado = calcular_produtividade_baunilha(
-                    mudas_impl, ano - ano_impl + 1
-                )
-                valor_extrato = resultado["valor_extrato"]
-                fat_anual += valor_extrato * 0.22
-            fat_total += fat_anual
-            mudas *= taxa_crescimento
-        return fat_total
-
-    # Verificar se é possível atingir o objetivo com o crescimento máximo
-    faturamento_maximo = calcular_faturamento_total(
-        num_mudas_inicial, taxa_crescimento_maxima, anos
+    return otimizar_cronograma(
+        faturamento_objetivo,
+        anos_projecao,
+        orcamento_custo,
+        orcamento_area,
+        mudas_maximas_por_ano,
+        sistema=sistema,
     )
-    if faturamento_maximo < faturamento_objetivo:
-        # Calcular o número mínimo de mudas iniciais necessárias
-        mudas_min = num_mudas_inicial
-        while (
-            calcular_faturamento_total(mudas_min, taxa_crescimento_maxima, anos)
-            < faturamento_objetivo
-        ):
-            mudas_min *= 1.1  # Aumentar em 10% e tentar novamente
-
-        # Calcular o número de anos necessários com as mudas iniciais fornecidas
-        anos_necessarios = anos
-        while (
-            anos_necessarios <= 15
-            and calcular_faturamento_total(
-                num_mudas_inicial, taxa_crescimento_maxima, anos_necessarios
-            )
-            < faturamento_objetivo
-        ):
-            anos_necessarios += 1
-
-        return (
-            None,
-            None,
-            None,
-            {
-                "possivel": False,
-                "faturamento_maximo": faturamento_maximo,
-                "mudas_minimas": mudas_min,
-                "anos_necessarios": (
-                    anos_necessarios if anos_necessarios <= 15 else None
-                ),
-            },
-        )
 
-    # Encontrar a taxa de crescimento ideal usando busca binária
-    taxa_min, taxa_max = 1.0, taxa_crescimento_maxima
-    while taxa_max - taxa_min > 0.0001:
-        taxa_meio = (taxa_min + taxa_max) / 2
-        if (
-            calcular_faturamento_total(num_mudas_inicial, taxa_meio, anos)
-            < faturamento_objetivo
-        ):
-            taxa_min = taxa_meio
-        else:
-            taxa_max = taxa_meio
-
-    taxa_crescimento = (taxa_min + taxa_max) / 2
-
-    # Calcular o plano com a taxa de crescimento encontrada
-    resultados_plano = []
-    resultados_detalhados = []
-    num_mudas = num_mudas_inicial
-    faturamento_acumulado = 0
-
-    for ano in range(1, anos + 1):
-        faturamento_liquido_anual = 0
-        for ano_impl in range(1, ano + 1):
-            mudas_impl = num_mudas_inicial * (taxa_crescimento ** (ano_impl - 1))
-            resultado = calcular_produtividade_baunilha(mudas_impl, ano - ano_impl + 1)
-            valor_extrato = resultado["valor_extrato"]
-            faturamento_liquido_anual += valor_extrato * 0.213
-            resultados_detalhados.append(
-                {
-                    "Ano de Implementação": ano_impl,
-                    "Ano": ano,
-                    "Número de Mudas": mudas_impl,
-                    "Faturamento Líquido (US$)": valor_extrato * 0.213,
-                }
-            )
 
-        faturamento_acumulado += faturamento_liquido_anual
-        resultados_plano.append(
-            {
-                "Ano": ano,
-                "Número de Mudas": num_mudas,
-                "Faturamento Líquido (US$)": faturamento_liquido_anual,
-                "Faturamento Acumulado (US$)": faturamento_acumulado,
-            }
+@st.cache_data(show_spinner=False, max_entries=64)
+@medido("calculo.excel_projecao")
+def gerar_excel_projecao(num_mudas, anos_projecao, usar_modelo_linear):
+    def calcular():
+        resultados_cumulativos, resultados_anuais, _, _ = projetar(
+            num_mudas, anos_projecao, usar_modelo_linear
         )
-        num_mudas = num_mudas * taxa_crescimento
+        return gerar_excel(resultados_anuais, resultados_cumulativos).getvalue()
 
-    return (
-        pd.DataFrame(resultados_plano),
-        pd.DataFrame(resultados_detalhados),
-        taxa_crescimento,
-        {"possivel": True},
+    return armazenado(
+        "excel_projecao",
+        {"num_mudas": num_mudas, "anos": anos_projecao, "linear": usar_modelo_linear},
+        calcular,
     )
 
 
-st.set_page_config(
-    page_title="Calculadora de Produtividade de Baunilha", page_icon="🌿", layout="wide"
-)
-
-st.title("Calculadora de Produtividade de Baunilha 🌿")
-
-col1, col2 = st.columns(2)
+@st.cache_data(show_spinner=False, max_entries=64)
+@medido("calculo.excel_plano")
+def gerar_excel_plano_acao(num_mudas, faturamento_objetivo, anos_projecao):
+    def calcular():
+        plano_acao, resultados_detalhados, _, _ = gerar_plano(
+            num_mudas, faturamento_objetivo, anos_projecao
+        )
+        return gerar_excel_plano(plano_acao, resultados_detalhados).getvalue()
 
-with col1:
-    st.subheader("Parâmetros de Entrada")
-    num_mudas = st.number_input("Número de Mudas", min_value=1, value=4000, step=100)
-    anos_projecao = st.slider("Anos de Projeção", min_value=1, max_value=15, value=6)
-    sistema = st.radio("Sistema de Cultivo", ["SAF", "Semi-intensivo"])
-    usar_modelo_linear = st.checkbox("Usar modelo linear para anos 1 e 2", value=True)
-    faturamento_objetivo = st.number_input(
-        "Faturamento Líquido Objetivo (US$)", min_value=1.0, value=10000.0, step=1000.0
+    return armazenado(
+        "excel_plano",
+        {
+            "num_mudas": num_mudas,
+            "objetivo": faturamento_objetivo,
+            "anos": anos_projecao,
+        },
+        calcular,
     )
 
-with col2:
-    st.subheader("Informações de Mercado")
-    st.write("Preços de referência:")
-    st.write("- Fava verde: US$ 15/kg")
-    st.write("- Fava verde (unidade): US$ 0.30")
-    st.write("- Fava curada: US$ 139.75/kg")
-    st.write("- Fava curada (unidade): US$ 0.56")
-    st.write("- Extrato de baunilha: US$ 135,435.20 por tonelada")
-    # st.write("- Extrato 1-fold: 2,25x o preço da fava curada")
-    st.write("- Margem de lucro: 21,30% do faturamento bruto")
-
-resultados_cumulativos, resultados_anuais = calcular_cumulativo(
-    num_mudas, anos_projecao, usar_modelo_linear
-)
-area_necessaria = calcular_area_necessaria(num_mudas, sistema)
-
-st.header(f"Resultados Cumulativos após {anos_projecao} anos")
-col1, col2, col3 = st.columns(3)
-col1.metric(
-    "Produção Total Acumulada",
-    f"{resultados_cumulativos['Produção Total (kg)']:,.2f} kg",
-)
-col2.metric(
-    "Número Total de Favas", f"{resultados_cumulativos['Número de Favas']:,.0f}"
-)
-col3.metric("Área Necessária", f"{area_necessaria:,.0f} hectares")
-
-st.subheader("Projeção Cumulativa de Favas")
-col1, col2 = st.columns(2)
-col1.metric(
-    "Peso Total Favas Verdes",
-    f"{resultados_cumulativos['Peso Favas Verdes (kg)']:,.2f} kg",
-)
-col2.metric(
-    "Peso Total Favas Curadas",
-    f"{resultados_cumulativos['Peso Favas Curadas (kg)']:,.2f} kg",
-)
-
-st.subheader("Projeção Cumulativa de Valor de Mercado e Lucro (US$)")
-col1, col2, col3 = st.columns(3)
-col1.metric(
-    "Valor Total Extrato",
-    f"$ {resultados_cumulativos['Valor Extrato (US$)']:,.2f}",
-)
-col2.metric(
-    "Volume Total Extrato",
-    f"{resultados_cumulativos['Volume Extrato (kg)']:,.2f} kg",
-)
-col3.metric(
-    "Faturamento Líquido",
-    f"$ {resultados_cumulativos['Faturamento Líquido (US$)']:,.2f}",
-)
-
-st.header("Gráficos de Produção Cumulativa")
-
-df_cumulativo = pd.DataFrame(resultados_anuais)
-df_cumulativo = df_cumulativo.cumsum().reset_index()
-df_cumulativo["Ano"] = range(1, anos_projecao + 1)
 
-# Gráfico de Produção Cumulativa
-chart_producao = (
-    alt.Chart(df_cumulativo)
-    .mark_area()
-    .encode(x="Ano", y="Produção Total (kg)", tooltip=["Ano", "Produção Total (kg)"])
-    .properties(title="Produção Total Cumulativa (kg)", width=600, height=400)
-)
-st.altair_chart(chart_producao, use_container_width=True)
-
-# Gráfico de Valor de Mercado Cumulativo
-chart_valor = (
-    alt.Chart(df_cumulativo)
-    .mark_line()
-    .encode(
-        x="Ano",
-        y="Valor Favas Curadas (US$)",
-        tooltip=["Ano", "Valor Favas Curadas (US$)"],
+@st.cache_data(show_spinner=False, max_entries=64)
+@medido("calculo.monte_carlo")
+def simular_incerteza(num_mudas, anos_projecao, usar_modelo_linear, sorteios):
+    amostras = simular_cumulativo(
+        num_mudas, anos_projecao, usar_modelo_linear, sorteios=sorteios, semente=0
     )
-    .properties(
-        title="Valor de Mercado Cumulativo - Favas Curadas (US$)", width=600, height=400
+    quantis = pd.DataFrame(tabela_quantis(amostras)).T.rename(
+        index={
+            "producao_total_kg": "Produção Total (kg)",
+            "faturamento_bruto": "Faturamento Bruto (US$)",
+            "faturamento_liquido": "Faturamento Líquido (US$)",
+        },
+        columns={"media": "Média"},
     )
-)
-st.altair_chart(chart_valor, use_container_width=True)
-
-st.header("Tabela de Resultados Anuais")
-df_resultados_anuais = pd.DataFrame(resultados_anuais).set_index("Ano")
-st.dataframe(
-    df_resultados_anuais.style.format(
+    hist = histograma(amostras["faturamento_liquido"])
+    df_histograma = pd.DataFrame(
         {
-            "Produção Total (kg)": "{:,.2f}",
-            "Número de Favas": "{:,.0f}",
-            "Peso Favas Verdes (kg)": "{:,.2f}",
-            "Peso Favas Curadas (kg)": "{:,.2f}",
-            "Valor Favas Verdes (US$)": "{:,.2f}",
-            "Valor Favas Curadas (US$)": "{:,.2f}",
-            "Valor Extrato 1-fold (US$)": "{:,.2f}",
-            "Faturamento Bruto (US$)": "{:,.2f}",
-            "Faturamento Líquido (US$)": "{:,.2f}",
+            "Faturamento Líquido (US$)": (hist["bordas"][:-1] + hist["bordas"][1:]) / 2,
+            "Sorteios": hist["contagens"],
         }
     )
-)
+    return quantis, df_histograma
 
-if st.button("Gerar Tabela Excel"):
-    excel_data = gerar_excel(resultados_anuais, resultados_cumulativos)
-    st.download_button(
-        label="Baixar Tabela Excel",
-        data=excel_data.getvalue(),
-        file_name="resultados_baunilha.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+
+@st.cache_data(show_spinner=False, max_entries=256)
+@medido("calculo.sensibilidade")
+def calcular_tornado(num_mudas, anos_projecao, usar_modelo_linear, variacao):
+    tornado = pd.DataFrame(
+        obter_superficie().tornado(
+            num_mudas, anos_projecao, usar_modelo_linear, variacao
+        )
+    )
+    return tornado.melt(
+        id_vars=["parametro", "resultado_base"],
+        value_vars=["resultado_baixo", "resultado_alto"],
+        var_name="Variação",
+        value_name="Faturamento Líquido (US$)",
+    ).replace({"resultado_baixo": "Baixo", "resultado_alto": "Alto"})
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+@medido("calculo.graficos_plano")
+def dados_graficos_plano(num_mudas, faturamento_objetivo, anos_projecao):
+    plano_acao, resultados_detalhados, _, _ = gerar_plano(
+        num_mudas, faturamento_objetivo, anos_projecao
     )
+    dados_plano = dados_grafico(
+        plano_acao, "Ano", ["Número de Mudas", "Faturamento Acumulado (US$)"]
+    )
+    # O detalhamento tem anos² linhas: o limite de pontos é dividido entre as
+    # coortes
+    dados_detalhado = dados_grafico(
+        resultados_detalhados,
+        "Ano",
+        "Faturamento Líquido (US$)",
+        serie="Ano de Implementação",
+    )
+    return dados_plano, dados_detalhado
 
-if st.button("Gerar Plano de Ação"):
-    try:
-        plano_acao, resultados_detalhados, taxa_crescimento, info = calcular_plano_acao(
-            num_mudas, faturamento_objetivo, anos_projecao
+
+st.set_page_config(
+    page_title="Calculadora de Produtividade de Baunilha", page_icon="🌿", layout="wide"
+)
+
+st.title("Calculadora de Produtividade de Baunilha 🌿")
+
+# Uma requisição por execução da página; os fragmentos registram só os seus
+# trechos. O perfil vem de BAUNILHA_PERFIL ou do painel de depuração
+# (?depuracao=1 na URL)
+with requisicao(
+    "pagina", perfil=st.session_state.get("perfil_depuracao") or modo_perfil()
+) as registro:
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("Parâmetros de Entrada")
+        num_mudas = st.number_input(
+            "Número de Mudas", min_value=1, value=4000, step=100
+        )
+        anos_projecao = st.slider(
+            "Anos de Projeção", min_value=1, max_value=ANOS_MAXIMO, value=6
+        )
+        sistema = st.radio("Sistema de Cultivo", ["SAF", "Semi-intensivo"])
+        usar_modelo_linear = st.checkbox(
+            "Usar modelo linear para anos 1 e 2", value=True
+        )
+        faturamento_objetivo = st.number_input(
+            "Faturamento Líquido Objetivo (US$)",
+            min_value=1.0,
+            value=10000.0,
+            step=1000.0,
         )
 
-        if info["possivel"]:
-            st.success(
-                f"Plano de ação gerado para atingir o faturamento objetivo em {anos_projecao} anos."
-            )
-            st.info(
-                f"Taxa de crescimento anual necessária: {(taxa_crescimento - 1) * 100:,.2f}%"
-            )
+    with col2:
+        st.subheader("Informações de Mercado")
+        st.write("Preços de referência:")
+        st.write("- Fava verde: US$ 15/kg")
+        st.write("- Fava verde (unidade): US$ 0.30")
+        st.write("- Fava curada: US$ 139.75/kg")
+        st.write("- Fava curada (unidade): US$ 0.56")
+        st.write("- Extrato de baunilha: US$ 135,435.20 por tonelada")
+        # st.write("- Extrato 1-fold: 2,25x o preço da fava curada")
+        st.write("- Margem de lucro: 21,30% do faturamento bruto")
+
+    (
+        resultados_cumulativos,
+        resultados_anuais,
+        df_cumulativo,
+        df_resultados_anuais,
+    ) = projetar(num_mudas, anos_projecao, usar_modelo_linear)
+    area_necessaria = calcular_area_necessaria(num_mudas, sistema)
+
+    with medir("render.resultados"):
+        st.header(f"Resultados Cumulativos após {anos_projecao} anos")
+        col1, col2, col3 = st.columns(3)
+        col1.metric(
+            "Produção Total Acumulada",
+            f"{resultados_cumulativos['Produção Total (kg)']:,.2f} kg",
+        )
+        col2.metric(
+            "Número Total de Favas", f"{resultados_cumulativos['Número de Favas']:,.0f}"
+        )
+        col3.metric("Área Necessária", f"{area_necessaria:,.0f} hectares")
 
-            st.write(plano_acao)
-            st.write(resultados_detalhados)
+        st.subheader("Projeção Cumulativa de Favas")
+        col1, col2 = st.columns(2)
+        col1.metric(
+            "Peso Total Favas Verdes",
+            f"{resultados_cumulativos['Peso Favas Verdes (kg)']:,.2f} kg",
+        )
+        col2.metric(
+            "Peso Total Favas Curadas",
+            f"{resultados_cumulativos['Peso Favas Curadas (kg)']:,.2f} kg",
+        )
 
-            # Gráfico de crescimento do número de mudas
-            chart_mudas = (
-                alt.Chart(plano_acao)
-                .mark_line()
-                .encode(
-                    x="Ano", y="Número de Mudas", tooltip=["Ano", "Número de Mudas"]
-                )
-                .properties(
-                    title="Crescimento do Número de Mudas", width=600, height=400
-                )
-            )
-            st.altair_chart(chart_mudas, use_container_width=True)
+        st.subheader("Projeção Cumulativa de Valor de Mercado e Lucro (US$)")
+        col1, col2, col3 = st.columns(3)
+        col1.metric(
+            "Valor Total Extrato",
+            f"$ {resultados_cumulativos['Valor Extrato (US$)']:,.2f}",
+        )
+        col2.metric(
+            "Volume Total Extrato",
+            f"{resultados_cumulativos['Volume Extrato (kg)']:,.2f} kg",
+        )
+        col3.metric(
+            "Faturamento Líquido",
+            f"$ {resultados_cumulativos['Faturamento Líquido (US$)']:,.2f}",
+        )
 
-            # Gráfico de faturamento acumulado
-            chart_faturamento = (
-                alt.Chart(plano_acao)
-                .mark_line()
-                .encode(
-                    x="Ano",
-                    y="Faturamento Acumulado (US$)",
-                    tooltip=["Ano", "Faturamento Acumulado (US$)"],
-                )
-                .properties(title="Faturamento Acumulado", width=600, height=400)
-            )
-            st.altair_chart(chart_faturamento, use_container_width=True)
+    with medir("render.graficos"):
+        st.header("Gráficos de Produção Cumulativa")
 
-            # Botões de download
-            if st.button("Gerar Tabela Excel 2"):
-                excel_data = gerar_excel(
-                    resultados_detalhados, plano_acao.to_dict("records")
-                )
-                st.download_button(
-                    label="Baixar Tabela Excel",
-                    data=excel_data.getvalue(),
-                    file_name="plano_acao_baunilha.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                )
+        # Os dois gráficos compartilham um único conjunto de dados, reduzido às
+        # colunas codificadas, que vai uma vez só para o navegador
+        dados_cumulativos = dados_grafico(
+            df_cumulativo, "Ano", ["Produção Total (kg)", "Valor Favas Curadas (US$)"]
+        )
 
-            # Botão para baixar o plano de ação como CSV
-            st.download_button(
-                label="Baixar Plano de Ação (CSV)",
-                data=plano_acao.to_csv(index=False).encode("utf-8"),
-                file_name="plano_acao.csv",
-                mime="text/csv",
+        # Gráfico de Produção Cumulativa
+        chart_producao = (
+            alt.Chart()
+            .mark_area()
+            .encode(
+                x="Ano", y="Produção Total (kg)", tooltip=["Ano", "Produção Total (kg)"]
             )
+            .properties(title="Produção Total Cumulativa (kg)", width=600, height=400)
+        )
 
-            # Botão para baixar os resultados detalhados como CSV
-            st.download_button(
-                label="Baixar Resultados Detalhados (CSV)",
-                data=resultados_detalhados.to_csv(index=False).encode("utf-8"),
-                file_name="resultados_detalhados.csv",
-                mime="text/csv",
+        # Gráfico de Valor de Mercado Cumulativo
+        chart_valor = (
+            alt.Chart()
+            .mark_line()
+            .encode(
+                x="Ano",
+                y="Valor Favas Curadas (US$)",
+                tooltip=["Ano", "Valor Favas Curadas (US$)"],
             )
-
-            st.header("Gráfico de Detalhamento do Plano de Ação")
-            chart_detalhado = (
-                alt.Chart(resultados_detalhados)
-                .mark_line()
-                .encode(
-                    x="Ano",
-                    y="Faturamento Líquido (US$)",
-                    color="Ano de Implementação:N",
-                    tooltip=["Ano de Implementação", "Ano", "Faturamento Líquido (US$)"],
-                )
-                .properties(
-                    title="Faturamento Líquido por Ano de Implementação",
-                    width=600,
-                    height=400,
-                )
+            .properties(
+                title="Valor de Mercado Cumulativo - Favas Curadas (US$)",
+                width=600,
+                height=400,
             )
-            st.altair_chart(chart_detalhado, use_container_width=True)
+        )
+        st.altair_chart(
+            alt.vconcat(chart_producao, chart_valor, data=dados_cumulativos),
+            use_container_width=True,
+        )
 
-        else:
-            st.warning(
-                "Não é possível atingir o faturamento objetivo com os parâmetros fornecidos."
+    with medir("render.tabela_anuais"):
+        st.header("Tabela de Resultados Anuais")
+        st.dataframe(
+            df_resultados_anuais.style.format(
+                {
+                    "Produção Total (kg)": "{:,.2f}",
+                    "Número de Favas": "{:,.0f}",
+                    "Peso Favas Verdes (kg)": "{:,.2f}",
+                    "Peso Favas Curadas (kg)": "{:,.2f}",
+                    "Valor Favas Verdes (US$)": "{:,.2f}",
+                    "Valor Favas Curadas (US$)": "{:,.2f}",
+                    "Valor Extrato 1-fold (US$)": "{:,.2f}",
+                    "Faturamento Bruto (US$)": "{:,.2f}",
+                    "Faturamento Líquido (US$)": "{:,.2f}",
+                }
             )
-            st.info(f"Faturamento máximo possível: $ {info['faturamento_maximo']:,.2f}")
-
-            if info.get("anos_necessarios"):
-                st.info(
-                    f"Anos necessários para atingir o objetivo com o número atual de mudas: {info['anos_necessarios']}"
-                )
-            else:
-                st.info(
-                    "Não é possível atingir o objetivo mesmo em 15 anos com o número atual de mudas."
-                )
+        )
 
-            st.info(
-                f"Número mínimo de mudas iniciais necessárias: {info['mudas_minimas']:,.0f}"
-            )
+    if st.button("Gerar Tabela Excel"):
+        excel_data = gerar_excel_projecao(num_mudas, anos_projecao, usar_modelo_linear)
+        st.download_button(
+            label="Baixar Tabela Excel",
+            data=excel_data,
+            file_name="resultados_baunilha.xlsx",
+            mime=MIME_XLSX,
+        )
 
-            st.write("Sugestões de ajuste:")
+    @st.fragment
+    @medido("render.incerteza")
+    def secao_incerteza(num_mudas, anos_projecao, usar_modelo_linear):
+        with st.expander("Simulação de Incerteza (Monte Carlo)"):
             st.write(
-                f"1. Aumente o número inicial de mudas para pelo menos {info['mudas_minimas']:,.0f}."
+                "Preço do extrato, margem, produtividade e peso da fava curada "
+                "sorteados em torno dos valores de referência."
             )
-            if info["anos_necessarios"] and info["anos_necessarios"] <= 15:
-                st.write(
-                    f"2. Aumente o número de anos de projeção para {info['anos_necessarios']}."
-                )
-            else:
-                st.write(
-                    "2. Não é possível atingir o objetivo apenas aumentando o número de anos."
-                )
-            st.write("3. Considere reduzir o faturamento objetivo.")
-
-    except Exception as e:
-        st.error(f"Ocorreu um erro ao gerar o plano de ação: {str(e)}")
-        print(f"Erro detalhado: {e}")
-        plano_acao = None
-        resultados_detalhados = None
-
-    # Adicione verificações antes de tentar acessar os atributos
-    if plano_acao is not None and resultados_detalhados is not None:
-        try:
-            st.download_button(
-                label="Baixar Plano de Ação",
-                data=plano_acao.to_csv(index=False).encode("utf-8"),
-                file_name="plano_acao.csv",
-                mime="text/csv",
+            sorteios = st.select_slider(
+                "Número de sorteios",
+                options=[1_000, 10_000, 100_000, 1_000_000],
+                value=10_000,
             )
-            st.download_button(
-                label="Baixar Resultados Detalhados",
-                data=resultados_detalhados.to_csv(index=False).encode("utf-8"),
-                file_name="resultados_detalhados.csv",
-                mime="text/csv",
+            quantis, df_histograma = simular_incerteza(
+                num_mudas, anos_projecao, usar_modelo_linear, sorteios
             )
+            st.dataframe(quantis.style.format("{:,.2f}"))
 
-            st.header("Gráfico de Detalhamento do Plano de Ação")
-            chart_detalhado = (
-                alt.Chart(resultados_detalhados)
-                .mark_line()
+            chart_histograma = (
+                alt.Chart(df_histograma)
+                .mark_bar()
                 .encode(
-                    x="Ano",
-                    y="Faturamento Líquido (US$)",
-                    color="Ano de Implementação:N",
-                    tooltip=[
-                        "Ano de Implementação",
-                        "Ano",
-                        "Faturamento Líquido (US$)",
-                    ],
+                    x=alt.X("Faturamento Líquido (US$)", bin=alt.Bin(binned=True)),
+                    y="Sorteios",
+                    tooltip=["Faturamento Líquido (US$)", "Sorteios"],
                 )
                 .properties(
-                    title="Faturamento Líquido por Ano de Implementação",
-                    width=600,
-                    height=400,
+                    title=f"Faturamento Líquido após {anos_projecao} anos", height=300
                 )
             )
-            st.altair_chart(chart_detalhado, use_container_width=True)
-        except Exception as e:
-            st.error("Ocorreu um erro ao gerar os downloads ou o gráfico.")
-            # Se quiser ver o erro no console para depuração:
-            # print(f"Erro: {e}")
-
-st.header("Sobre a Cultura da Baunilheira")
-st.write(
-    """
+            st.altair_chart(chart_histograma, use_container_width=True)
+
+    secao_incerteza(num_mudas, anos_projecao, usar_modelo_linear)
+
+    with medir("render.sensibilidade"), st.expander("Análise de Sensibilidade"):
+        variacao = st.slider("Variação dos parâmetros (%)", 1, 50, 10) / 100
+        df_tornado = calcular_tornado(
+            num_mudas, anos_projecao, usar_modelo_linear, variacao
+        )
+        chart_tornado = (
+            alt.Chart(df_tornado)
+            .mark_bar()
+            .encode(
+                y=alt.Y("parametro:N", sort=None, title="Parâmetro"),
+                x=alt.X("Faturamento Líquido (US$):Q", scale=alt.Scale(zero=False)),
+                x2="resultado_base:Q",
+                color="Variação:N",
+                tooltip=["parametro", "Variação", "Faturamento Líquido (US$)"],
+            )
+            .properties(title="Sensibilidade do Faturamento Líquido", height=250)
+        )
+        st.altair_chart(chart_tornado, use_container_width=True)
+
+    # Fragmento: os botões do plano só reexecutam esta seção, não a página toda
+    @st.fragment
+    @medido("render.plano_acao")
+    def secao_plano_acao(num_mudas, faturamento_objetivo, anos_projecao, sistema):
+        entradas_plano = (num_mudas, faturamento_objetivo, anos_projecao)
+
+        if st.button("Gerar Plano de Ação"):
+            st.session_state["entradas_plano"] = entradas_plano
+
+        # O plano fica na sessão enquanto as entradas não mudarem, para que os
+        # botões internos (como "Gerar Tabela Excel 2") não o descartem
+        if st.session_state.get("entradas_plano") == entradas_plano:
+            try:
+                plano_acao, resultados_detalhados, taxa_crescimento, info = gerar_plano(
+                    num_mudas, faturamento_objetivo, anos_projecao
+                )
+
+                if info["possivel"]:
+                    st.success(
+                        f"Plano de ação gerado para atingir o faturamento objetivo em {anos_projecao} anos."
+                    )
+                    st.info(
+                        f"Taxa de crescimento anual necessária: {(taxa_crescimento - 1) * 100:,.2f}%"
+                    )
+
+                    st.write(plano_acao)
+                    st.write(resultados_detalhados)
+
+                    dados_plano, dados_detalhado = dados_graficos_plano(
+                        num_mudas, faturamento_objetivo, anos_projecao
+                    )
+
+                    # Gráfico de crescimento do número de mudas
+                    chart_mudas = (
+                        alt.Chart()
+                        .mark_line()
+                        .encode(
+                            x="Ano",
+                            y="Número de Mudas",
+                            tooltip=["Ano", "Número de Mudas"],
+                        )
+                        .properties(
+                            title="Crescimento do Número de Mudas",
+                            width=600,
+                            height=400,
+                        )
+                    )
+
+                    # Gráfico de faturamento acumulado
+                    chart_faturamento = (
+                        alt.Chart()
+                        .mark_line()
+                        .encode(
+                            x="Ano",
+                            y="Faturamento Acumulado (US$)",
+                            tooltip=["Ano", "Faturamento Acumulado (US$)"],
+                        )
+                        .properties(
+                            title="Faturamento Acumulado", width=600, height=400
+                        )
+                    )
+                    st.altair_chart(
+                        alt.vconcat(chart_mudas, chart_faturamento, data=dados_plano),
+                        use_container_width=True,
+                    )
+
+                    # Botões de download
+                    if st.button("Gerar Tabela Excel 2"):
+                        excel_data = gerar_excel_plano_acao(
+                            num_mudas, faturamento_objetivo, anos_projecao
+                        )
+                        st.download_button(
+                            label="Baixar Tabela Excel",
+                            data=excel_data,
+                            file_name="plano_acao_baunilha.xlsx",
+                            mime=MIME_XLSX,
+                        )
+
+                    # Botão para baixar o plano de ação como CSV
+                    st.download_button(
+                        label="Baixar Plano de Ação (CSV)",
+                        data=plano_acao.to_csv(index=False).encode("utf-8"),
+                        file_name="plano_acao.csv",
+                        mime="text/csv",
+                    )
+
+                    # Botão para baixar os resultados detalhados como CSV
+                    st.download_button(
+                        label="Baixar Resultados Detalhados (CSV)",
+                        data=resultados_detalhados.to_csv(index=False).encode("utf-8"),
+                        file_name="resultados_detalhados.csv",
+                        mime="text/csv",
+                    )
+
+                    st.header("Gráfico de Detalhamento do Plano de Ação")
+                    chart_detalhado = (
+                        alt.Chart(dados_detalhado)
+                        .mark_line()
+                        .encode(
+                            x="Ano",
+                            y="Faturamento Líquido (US$)",
+                            color="Ano de Implementação:N",
+                            tooltip=[
+                                "Ano de Implementação",
+                                "Ano",
+                                "Faturamento Líquido (US$)",
+                            ],
+                        )
+                        .properties(
+                            title="Faturamento Líquido por Ano de Implementação",
+                            width=600,
+                            height=400,
+                        )
+                    )
+                    st.altair_chart(chart_detalhado, use_container_width=True)
+
+                else:
+                    st.warning(
+                        "Não é possível atingir o faturamento objetivo com os parâmetros fornecidos."
+                    )
+                    st.info(
+                        f"Faturamento máximo possível: $ {info['faturamento_maximo']:,.2f}"
+                    )
+
+                    if info.get("anos_necessarios"):
+                        st.info(
+                            f"Anos necessários para atingir o objetivo com o número atual de mudas: {info['anos_necessarios']}"
+                        )
+                    else:
+                        st.info(
+                            "Não é possível atingir o objetivo mesmo em 15 anos com o número atual de mudas."
+                        )
+
+                    st.info(
+                        f"Número mínimo de mudas iniciais necessárias: {info['mudas_minimas']:,.0f}"
+                    )
+
+                    st.write("Sugestões de ajuste:")
+                    st.write(
+                        f"1. Aumente o número inicial de mudas para pelo menos {info['mudas_minimas']:,.0f}."
+                    )
+                    if info["anos_necessarios"] and info["anos_necessarios"] <= 15:
+                        st.write(
+                            f"2. Aumente o número de anos de projeção para {info['anos_necessarios']}."
+                        )
+                    else:
+                        st.write(
+                            "2. Não é possível atingir o objetivo apenas aumentando o número de anos."
+                        )
+                    st.write("3. Considere reduzir o faturamento objetivo.")
+
+                    # Cronograma livre (não geométrico) de menor custo. Sem
+                    # limites a resposta é sempre plantar tudo no primeiro
+                    # ano, então ela só aparece depois que o usuário define um
+                    st.write(
+                        "4. Cronograma livre de menor custo dentro dos limites "
+                        "abaixo (0 = sem limite):"
+                    )
+                    col_mudas, col_custo, col_area = st.columns(3)
+                    mudas_por_ano = col_mudas.number_input(
+                        "Mudas por ano", min_value=0, value=0, step=500
+                    )
+                    orcamento_custo = col_custo.number_input(
+                        "Orçamento (US$)", min_value=0.0, value=0.0, step=1000.0
+                    )
+                    orcamento_area = col_area.number_input(
+                        "Área disponível (ha)", min_value=0.0, value=0.0, step=1.0
+                    )
+                    if mudas_por_ano or orcamento_custo or orcamento_area:
+                        cronograma = otimizar_plantio(
+                            faturamento_objetivo,
+                            anos_projecao,
+                            sistema,
+                            mudas_por_ano or None,
+                            orcamento_custo or None,
+                            orcamento_area or None,
+                        )
+                        plantios = ", ".join(
+                            f"{mudas:,.0f} no ano {ano}"
+                            for ano, mudas in enumerate(
+                                cronograma["cronograma"], start=1
+                            )
+                            if mudas > 0
+                        )
+                        resumo = (
+                            f"{cronograma['mudas']:,.0f} mudas ({plantios or '-'}), "
+                            f"custo de $ {cronograma['custo']:,.2f} e "
+                            f"{cronograma['area']:,.2f} hectares"
+                        )
+                        if cronograma["possivel"]:
+                            st.write(f"Plante {resumo}.")
+                        else:
+                            maximo = cronograma["faturamento"]
+                            st.write(
+                                "Com esses limites o objetivo não é atingido; o "
+                                f"maior faturamento é $ {maximo:,.2f}, com {resumo}."
+                            )
+
+            except Exception as e:
+                st.error(f"Ocorreu um erro ao gerar o plano de ação: {str(e)}")
+                print(f"Erro detalhado: {e}")
+                plano_acao = None
+                resultados_detalhados = None
+
+            # Adicione verificações antes de tentar acessar os atributos
+            if plano_acao is not None and resultados_detalhados is not None:
+                try:
+                    st.download_button(
+                        label="Baixar Plano de Ação",
+                        data=plano_acao.to_csv(index=False).encode("utf-8"),
+                        file_name="plano_acao.csv",
+                        mime="text/csv",
+                    )
+                    st.download_button(
+                        label="Baixar Resultados Detalhados",
+                        data=resultados_detalhados.to_csv(index=False).encode("utf-8"),
+                        file_name="resultados_detalhados.csv",
+                        mime="text/csv",
+                    )
+                except Exception as e:
+                    st.error("Ocorreu um erro ao gerar os downloads.")
+                    # Se quiser ver o erro no console para depuração:
+                    # print(f"Erro: {e}")
+
+    secao_plano_acao(num_mudas, faturamento_objetivo, anos_projecao, sistema)
+
+    st.header("Sobre a Cultura da Baunilheira")
+    st.write("""
 - A baunilha fica produtiva durante 15 anos, chegando à máxima produção depois de seis anos.
 - Em um sistema de produção semi intensivo, com 4000 mudas por hectare, os seguintes rendimentos podem ser esperados:
   - Ano 3: 500 kilos
@@ -572,5 +686,32 @@ st.write(
   - Fava curada: US$ 139.75/kg
   - Extrato de baunilha: US$ 135,435.20 por tonelada
 - O extrato de baunilha é feito com 25% de favas curadas.
-"""
-)
+""")
+
+
+if st.query_params.get("depuracao") == "1":
+    with st.expander("Depuração", expanded=True):
+        st.selectbox(
+            "Perfil da próxima execução",
+            [None, *MODOS_PERFIL],
+            format_func=lambda modo: modo or "desligado",
+            key="perfil_depuracao",
+        )
+        st.write(f"Execução da página: {registro.segundos * 1000:,.1f} ms")
+        st.dataframe(
+            pd.DataFrame(registro.trechos, columns=["Trecho", "Segundos"]),
+            hide_index=True,
+        )
+        st.json(registro.contadores)
+        if registro.perfil:
+            st.code(registro.perfil)
+        if registro.memoria:
+            st.json(registro.memoria)
+        metricas = METRICAS.prometheus()
+        st.code(metricas)
+        st.download_button(
+            "Baixar métricas (Prometheus)",
+            data=metricas.encode("utf-8"),
+            file_name="metricas_baunilha.txt",
+            mime="text/plain",
+        )
@@ -0,0 +1,87 @@
+"""Armazenamento em SQLite: gravação, leitura, descarte e contadores."""
+
+import sqlite3
+import threading
+
+import pytest
+
+from baunilha.armazenamento import ArmazenamentoResultados, calcular_chave
+
+
+@pytest.fixture
+def armazenamento(tmp_path):
+    with ArmazenamentoResultados(
+        str(tmp_path / "resultados.db"), tamanho_maximo_bytes=10_000
+    ) as armazenamento:
+        yield armazenamento
+
+
+def _soma_tamanhos(armazenamento):
+    with sqlite3.connect(armazenamento.caminho) as conexao:
+        return conexao.execute(
+            "SELECT COALESCE(SUM(tamanho), 0) FROM resultados"
+        ).fetchone()[0]
+
+
+def test_gravar_ler_descartar(armazenamento):
+    chaves = [calcular_chave("teste", {"i": i}) for i in range(6)]
+    for chave in chaves[:4]:
+        armazenamento.gravar(chave, "teste", b"x" * 3000)
+    # 4 x 3000 bytes passam do limite: o menos recente sai
+    assert armazenamento.ler(chaves[0]) is None
+    assert armazenamento.ler(chaves[1]) == b"x" * 3000
+
+    # A leitura de chaves[1] é descarregada antes do próximo descarte
+    armazenamento.gravar(chaves[4], "teste", b"y" * 3000)
+    assert armazenamento.ler(chaves[1]) is not None
+    assert armazenamento.ler(chaves[2]) is None
+
+    estatisticas = armazenamento.estatisticas()
+    assert estatisticas["bytes"] == _soma_tamanhos(armazenamento)
+    assert estatisticas["bytes"] <= 10_000
+    assert (estatisticas["acertos"], estatisticas["falhas"]) == (2, 2)
+
+
+def test_regravar_atualiza_o_total(armazenamento):
+    chave = calcular_chave("teste", {})
+    armazenamento.gravar(chave, "teste", b"a" * 100)
+    armazenamento.gravar(chave, "teste", b"a" * 500)
+    assert armazenamento.estatisticas()["bytes"] == _soma_tamanhos(armazenamento)
+    armazenamento.limpar()
+    assert armazenamento.estatisticas()["bytes"] == 0
+
+
+def test_leitura_nao_escreve_no_banco(armazenamento):
+    chave = calcular_chave("teste", {})
+    armazenamento.gravar(chave, "teste", {"valor": 1})
+    conexao = armazenamento._conexao()
+    antes = conexao.total_changes
+    for _ in range(50):
+        assert armazenamento.obter("teste", {}, lambda: None) == {"valor": 1}
+    assert conexao.total_changes == antes
+    assert armazenamento.estatisticas()["acertos"] == 50
+
+
+def test_contadores_de_varias_threads(armazenamento):
+    chave = calcular_chave("teste", {})
+    armazenamento.gravar(chave, "teste", 1)
+
+    def ler():
+        for _ in range(100):
+            armazenamento.ler(chave)
+
+    threads = [threading.Thread(target=ler) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert armazenamento.estatisticas()["acertos"] == 400
+
+
+def test_fechar_grava_pendentes(tmp_path):
+    caminho = str(tmp_path / "resultados.db")
+    with ArmazenamentoResultados(caminho) as armazenamento:
+        armazenamento.ler("inexistente")
+    assert armazenamento._conexoes == []
+    with ArmazenamentoResultados(caminho) as reaberto:
+        assert reaberto.estatisticas()["falhas"] == 1
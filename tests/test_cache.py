@@ -0,0 +1,46 @@
+"""Cache LRU: ordem de descarte e contadores de acertos e falhas."""
+
+from baunilha.cache import CacheLRU
+
+
+def _obter(cache, chave, calculadas):
+    def calcular():
+        calculadas.append(chave)
+        return chave * 10
+
+    return cache.obter(chave, calcular)
+
+
+def test_descarta_o_menos_usado_recentemente():
+    cache = CacheLRU(tamanho_maximo=2)
+    calculadas = []
+    assert _obter(cache, 1, calculadas) == 10
+    assert _obter(cache, 2, calculadas) == 20
+    # O acesso a 1 torna 2 o menos recente, que sai com a entrada de 3
+    assert _obter(cache, 1, calculadas) == 10
+    assert _obter(cache, 3, calculadas) == 30
+    assert _obter(cache, 1, calculadas) == 10
+    assert _obter(cache, 2, calculadas) == 20
+    assert calculadas == [1, 2, 3, 2]
+    assert cache.info() == {
+        "acertos": 2,
+        "falhas": 4,
+        "tamanho": 2,
+        "tamanho_maximo": 2,
+    }
+
+
+def test_limpar_zera_itens_e_contadores():
+    cache = CacheLRU(tamanho_maximo=4)
+    calculadas = []
+    for chave in (1, 1, 2):
+        _obter(cache, chave, calculadas)
+    cache.limpar()
+    assert cache.info() == {
+        "acertos": 0,
+        "falhas": 0,
+        "tamanho": 0,
+        "tamanho_maximo": 4,
+    }
+    _obter(cache, 1, calculadas)
+    assert calculadas == [1, 2, 1]
@@ -0,0 +1,14 @@
+"""Saída da linha de comando."""
+
+import json
+
+from baunilha import cli
+
+
+def test_plano_inviavel_gera_json_valido(capsys):
+    cli.main(["plano", "--mudas", "4000", "--objetivo", "1e6", "--anos", "2"])
+    saida = capsys.readouterr().out
+    assert "Infinity" not in saida and "NaN" not in saida
+    resultado = json.loads(saida)
+    assert resultado["info"]["mudas_minimas"] is None
+    assert resultado["taxa_crescimento"] is None
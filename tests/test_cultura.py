@@ -0,0 +1,135 @@
+"""Perfis de cultura: validação, chave de cache, pickle e produtividade."""
+
+import os
+import pickle
+import tomllib
+
+import numpy as np
+import pytest
+
+import baunilha
+from baunilha.cultura import (
+    ANOS_PRECALCULADOS,
+    CAMPOS_NUMERICOS,
+    carregar_perfil,
+    compilar_perfil,
+)
+from baunilha.modelo import CULTURA_PADRAO
+
+PERFIL = os.path.join(os.path.dirname(baunilha.__file__), "perfis", "baunilha.toml")
+
+
+def _definicao(**alteracoes):
+    with open(PERFIL, "rb") as arquivo:
+        return {**tomllib.load(arquivo), **alteracoes}
+
+
+def test_arquivo_igual_ao_padrao():
+    perfil = carregar_perfil(PERFIL)
+    assert perfil == CULTURA_PADRAO and hash(perfil) == hash(CULTURA_PADRAO)
+    assert carregar_perfil(PERFIL) is perfil
+
+
+def test_compilar_perfil_normaliza():
+    perfil = compilar_perfil(
+        _definicao(producao_por_hectare={"6": 2500, "3": 500, "4": 1000, "5": 1600})
+    )
+    assert list(perfil.producao_por_hectare) == [3, 4, 5, 6]
+    assert perfil.idade_maxima_tabela == 6
+    np.testing.assert_array_equal(
+        perfil.tabela_producao, [0, 0, 0, 500, 1000, 1600, 2500, 2750]
+    )
+    assert perfil.area_por_muda_m2("Outro") == 2.5
+    with pytest.raises(AttributeError):
+        perfil.margem_lucro = 0.5
+
+
+@pytest.mark.parametrize(
+    "alteracoes, mensagem",
+    [
+        ({"margem_lucro": 1.5}, "fração"),
+        ({"custo_por_muda": -1}, "maior ou igual a zero"),
+        ({"mudas_por_hectare": 0}, "maior que zero"),
+        ({"peso_fava_verde": "20"}, "número"),
+        ({"favas_por_pe_max": True}, "número"),
+        ({"producao_por_hectare": {"zero": 1}}, "Chave inválida"),
+        ({"producao_por_hectare": {0: 1}}, "começam em 1"),
+        ({"producao_por_hectare": {}}, "não vazia"),
+        ({"idade_referencia_linear": 2}, "idade da tabela"),
+        ({"preco_da_lua": 1}, "desconhecidos"),
+    ],
+)
+def test_compilar_perfil_rejeita(alteracoes, mensagem):
+    with pytest.raises(ValueError, match=mensagem):
+        compilar_perfil(_definicao(**alteracoes))
+
+
+def test_compilar_perfil_exige_campos():
+    definicao = _definicao()
+    del definicao["area_por_muda"]
+    with pytest.raises(ValueError, match="ausentes"):
+        compilar_perfil(definicao)
+
+
+def test_pickle_recompila_o_perfil():
+    perfil = compilar_perfil(_definicao(nome="Cacau", preco_extrato_por_tonelada=9e4))
+    copia = pickle.loads(pickle.dumps(perfil))
+    assert copia is not perfil
+    assert copia == perfil and copia.chave == perfil.chave
+    assert copia.nome == "Cacau"
+    for linear in (False, True):
+        for nome, curva in perfil.curvas_precalculadas(20, linear).items():
+            np.testing.assert_array_equal(
+                copia.curvas_precalculadas(20, linear)[nome], curva
+            )
+
+
+@pytest.mark.parametrize("campo", sorted(CAMPOS_NUMERICOS))
+def test_chave_muda_com_cada_parametro(campo):
+    base = compilar_perfil(_definicao())
+    valor = base._definicao[campo]
+    alterado = compilar_perfil(_definicao(**{campo: valor / 2 if valor else 0.5}))
+    assert alterado.chave != base.chave and alterado != base
+
+
+def test_chave_das_tabelas_e_do_nome():
+    base = compilar_perfil(_definicao())
+    chaves = {
+        compilar_perfil(_definicao(**alteracoes)).chave
+        for alteracoes in (
+            {},
+            {"producao_por_hectare": {3: 500, 4: 1000, 5: 1600, 6: 2400}},
+            {"producao_por_hectare": {3: 500, 4: 1000, 5: 1600, 6: 2500, 7: 2750}},
+            {"area_por_muda": {"SAF": 4, "Semi-intensivo": 2}},
+            {"area_por_muda_outros": 3},
+            {"idade_referencia_linear": 4},
+        )
+    }
+    assert len(chaves) == 6
+    # O nome não altera resultados: perfis iguais dividem o cache
+    assert compilar_perfil(_definicao(nome="Outro nome")).chave == base.chave
+
+
+@pytest.mark.parametrize("linear", [False, True])
+def test_escalar_igual_ao_vetorizado(linear):
+    perfil = compilar_perfil(
+        _definicao(producao_por_hectare={2: 100, 3: 500, 8: 3000}, favas_por_pe_max=12)
+    )
+    idades = np.arange(0, ANOS_PRECALCULADOS + 10)
+    for num_mudas in (0.5, 4000, 123456.789):
+        vetorizado = perfil.produtividade(num_mudas, idades, linear)
+        for indice, idade in enumerate(idades):
+            escalar = baunilha.calcular_produtividade_baunilha(
+                num_mudas, int(idade), linear, perfil
+            )
+            for nome, valor in escalar.items():
+                assert type(valor) is float
+                assert valor == pytest.approx(vetorizado[nome][indice], rel=1e-12)
+
+
+def test_idade_fracionaria():
+    with pytest.raises(ValueError, match="inteiro"):
+        baunilha.calcular_produtividade_baunilha(4000, 2.5)
+    assert baunilha.calcular_produtividade_baunilha(
+        4000, 6.0
+    ) == baunilha.calcular_produtividade_baunilha(4000, 6)
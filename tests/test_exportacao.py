@@ -0,0 +1,79 @@
+"""Exportação: os arquivos gravados, lidos de volta, reproduzem as tabelas."""
+
+import io
+
+import pandas as pd
+import pytest
+
+from baunilha.exportacao import (
+    abas_projecao,
+    exportar_em_partes,
+    exportar_resultados,
+    gerar_excel,
+)
+from baunilha.modelo import calcular_cumulativo
+
+
+@pytest.fixture
+def projecao():
+    resultados_cumulativos, resultados_anuais = calcular_cumulativo(4000, 8, False)
+    return resultados_anuais, resultados_cumulativos
+
+
+def _esperadas(resultados_anuais, resultados_cumulativos):
+    return {
+        "Anuais": pd.DataFrame(resultados_anuais),
+        "Cumulativos": pd.DataFrame([resultados_cumulativos]),
+    }
+
+
+def test_excel_ida_e_volta(projecao):
+    lidas = pd.read_excel(gerar_excel(*projecao), sheet_name=None)
+    esperadas = _esperadas(*projecao)
+    assert list(lidas) == list(esperadas)
+    for nome, tabela in esperadas.items():
+        # O Excel não distingue 500.0 de 500: só os valores precisam bater
+        pd.testing.assert_frame_equal(lidas[nome], tabela, check_dtype=False)
+
+
+@pytest.mark.parametrize("formato", ["csv", "parquet"])
+def test_um_arquivo_por_aba_ida_e_volta(tmp_path, projecao, formato):
+    if formato == "parquet":
+        pytest.importorskip("pyarrow")
+    ler = pd.read_csv if formato == "csv" else pd.read_parquet
+    exportar_resultados(abas_projecao(*projecao), tmp_path / f"resultados.{formato}")
+    for nome, tabela in _esperadas(*projecao).items():
+        lida = ler(tmp_path / f"resultados_{nome}.{formato}")
+        pd.testing.assert_frame_equal(lida, tabela)
+
+
+@pytest.mark.parametrize("formato", ["xlsx", "csv", "parquet"])
+def test_dataframe_e_gerador_de_linhas(formato):
+    if formato == "parquet":
+        pytest.importorskip("pyarrow")
+    tabela = pd.DataFrame(
+        {
+            "Ano": [1, 2, 3],
+            "Sistema": ["SAF", "Monocultivo", "SAF"],
+            "Valor": [0.1, 2.5, -3.0],
+        }
+    )
+    linhas = (linha for linha in tabela.to_dict("records"))
+    for entrada in (tabela, linhas):
+        conteudo = io.BytesIO(b"".join(exportar_em_partes({"Dados": entrada}, formato)))
+        if formato == "xlsx":
+            lida = pd.read_excel(conteudo)
+        elif formato == "csv":
+            lida = pd.read_csv(conteudo)
+        else:
+            lida = pd.read_parquet(conteudo)
+        pd.testing.assert_frame_equal(lida, tabela)
+
+
+def test_aba_vazia_ida_e_volta(tmp_path):
+    pytest.importorskip("pyarrow")
+    caminho = tmp_path / "vazio.parquet"
+    exportar_resultados({"Dados": {"Ano": [], "Valor": []}}, caminho)
+    lida = pd.read_parquet(caminho)
+    assert list(lida.columns) == ["Ano", "Valor"]
+    assert lida.empty
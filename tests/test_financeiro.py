@@ -0,0 +1,89 @@
+"""VPL, TIR e payback contra casos de forma fechada."""
+
+import numpy as np
+import pytest
+
+from baunilha.financeiro import fluxos_plano, payback, tir, vpl, vpl_por_cenario
+
+
+def _anuidade(valor, taxa, anos):
+    """Investimento cuja TIR é `taxa` com `anos` parcelas iguais de `valor`."""
+    investimento = valor * (1 - (1 + taxa) ** -anos) / taxa
+    return [-investimento, *[valor] * anos]
+
+
+def test_vpl_forma_fechada():
+    fluxos = np.array([[-100.0, 110.0, 0.0], [-100.0, 0.0, 121.0], [50, 50, 50]])
+    np.testing.assert_allclose(
+        vpl(fluxos, [0.0, 0.1]),
+        [[10.0, 0.0], [21.0, 0.0], [150.0, 50 + 50 / 1.1 + 50 / 1.21]],
+        atol=1e-12,
+    )
+    np.testing.assert_allclose(
+        vpl(fluxos, 0.1), [0.0, 0.0, 50 + 50 / 1.1 + 50 / 1.21], atol=1e-12
+    )
+    np.testing.assert_allclose(
+        vpl_por_cenario(fluxos, [0.0, 0.1, 0.0]), [10.0, 0.0, 150.0], atol=1e-12
+    )
+
+
+@pytest.mark.parametrize("taxa", [-0.5, -0.05, 0.0001, 0.08, 0.35, 3.0])
+def test_tir_de_anuidades(taxa):
+    assert tir([_anuidade(100.0, taxa, 7)])[0] == pytest.approx(taxa, abs=1e-9)
+
+
+def test_tir_em_bloco():
+    fluxos = np.array([[-100.0, 110.0, 0.0], [-100.0, 0.0, 121.0], [-100, 60, 60]])
+    # -100 + 60 x + 60 x² = 0, com x = 1 / (1 + taxa)
+    raiz = (-60 + np.sqrt(60**2 + 4 * 60 * 100)) / (2 * 60)
+    np.testing.assert_allclose(tir(fluxos), [0.1, 0.1, 1 / raiz - 1], rtol=1e-9)
+    assert tir(fluxos.reshape(3, 1, 3)).shape == (3, 1)
+
+
+@pytest.mark.parametrize(
+    "fluxos",
+    [
+        [100.0, 50.0, 10.0],  # sem investimento
+        [-100.0, -50.0, -10.0],  # nunca entra dinheiro
+        [0.0, 0.0, 0.0],
+        [-100.0, 0.5, 0.5],  # raiz abaixo da taxa mínima (-90%)
+    ],
+)
+def test_tir_sem_troca_de_sinal_e_nan(fluxos):
+    assert np.isnan(tir([fluxos])[0])
+
+
+@pytest.mark.parametrize(
+    "fluxos, esperado",
+    [
+        ([-100.0, 50.0, 50.0, 50.0], 2.0),
+        ([-100.0, 30.0, 30.0, 80.0], 2.5),  # acumulado -40 -> +40
+        ([0.0, 10.0], 0.0),
+        ([10.0, -5.0, 5.0], 0.0),  # nunca fica negativo
+        # Paga no ano 1, volta a ficar negativo e só se paga de novo no ano 3
+        ([-100.0, 150.0, -100.0, 100.0], 2.5),
+        ([-100.0, 50.0, 10.0], np.nan),
+        ([-100.0, 150.0, -100.0], np.nan),  # termina negativo
+    ],
+)
+def test_payback(fluxos, esperado):
+    np.testing.assert_allclose(payback([fluxos]), [esperado])
+
+
+def test_payback_descontado():
+    # Acumulado descontado: -100, -50, +50
+    assert payback([[-100.0, 55.0, 121.0]], 0.1)[0] == pytest.approx(1.5)
+    assert np.isnan(payback([[-100.0, 105.0]], 0.1)[0])
+
+
+@pytest.mark.parametrize("anos", [0, -4])
+def test_fluxos_plano_sem_horizonte(anos):
+    fluxos = fluxos_plano(4000, [1.0, 1.5], anos)
+    np.testing.assert_array_equal(fluxos, np.zeros((2, 1)))
+
+
+def test_fluxos_plano_uma_coorte():
+    # Taxa 1: só a coorte inicial é comprada a cada ano
+    fluxos = fluxos_plano(4000, 1.0, 3)
+    assert fluxos.shape == (1, 4)
+    assert fluxos[0, 0] < 0 and fluxos[0, -1] > 0
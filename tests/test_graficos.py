@@ -0,0 +1,62 @@
+"""Redução dos dados dos gráficos: limite global de pontos e picos."""
+
+import numpy as np
+import pytest
+
+from baunilha.graficos import dados_grafico, lttb
+
+
+def _tabela(series, pontos, colunas=("a", "b")):
+    gerador = np.random.default_rng(7)
+    total = series * pontos
+    tabela = {
+        "x": np.tile(np.arange(pontos, dtype=float), series),
+        "serie": np.repeat(np.arange(series), pontos),
+    }
+    for escala, nome in enumerate(colunas, start=1):
+        tabela[nome] = gerador.normal(size=total) * 10**escala
+    return tabela
+
+
+@pytest.mark.parametrize("series, pontos", [(1, 5000), (4, 2000), (600, 40)])
+@pytest.mark.parametrize("colunas", [("a",), ("a", "b"), ("a", "b", "c")])
+def test_limite_global(series, pontos, colunas):
+    tabela = _tabela(series, pontos, colunas)
+    dados = dados_grafico(tabela, "x", list(colunas), serie="serie", limite=1000)
+    assert len(dados) <= 1000
+    if series * 3 <= 1000:
+        # Todas as séries continuam no gráfico
+        assert dados["serie"].nunique() == series
+
+
+def test_sem_serie_com_varias_colunas():
+    tabela = _tabela(1, 5000, ("a", "b", "c"))
+    assert len(dados_grafico(tabela, "x", ["a", "b", "c"], limite=500)) == 500
+
+
+def test_picos_de_cada_coluna():
+    x = np.arange(10_000, dtype=float)
+    a = np.sin(x / 500) * 1e6
+    b = np.zeros_like(x)
+    b[1234] = 1.0  # pico pequeno perto da escala de `a`
+    dados = dados_grafico({"x": x, "a": a, "b": b}, "x", ["a", "b"], limite=200)
+    assert len(dados) <= 200
+    assert 1234.0 in set(dados["x"])
+    assert dados["a"].max() == pytest.approx(a.max(), rel=1e-3)
+
+
+def test_uma_coluna_igual_ao_lttb():
+    tabela = _tabela(1, 3000, ("a",))
+    dados = dados_grafico(tabela, "x", "a", limite=300)
+    np.testing.assert_array_equal(
+        dados["x"], tabela["x"][lttb(tabela["x"], tabela["a"], 300)]
+    )
+
+
+def test_series_curtas_ficam_inteiras():
+    curta = {"x": np.arange(10.0), "a": np.arange(10.0), "serie": np.zeros(10)}
+    longa = {"x": np.arange(5000.0), "a": np.ones(5000), "serie": np.ones(5000)}
+    tabela = {nome: np.concatenate([curta[nome], longa[nome]]) for nome in curta}
+    dados = dados_grafico(tabela, "x", "a", serie="serie", limite=100)
+    assert (dados["serie"] == 0).sum() == 10
+    assert len(dados) == 100
@@ -0,0 +1,47 @@
+"""Contadores por thread do registro de métricas."""
+
+import threading
+
+from baunilha.instrumentacao import RegistroMetricas, contar, requisicao
+
+
+def _em_threads(funcao, quantidade=8):
+    threads = [threading.Thread(target=funcao) for _ in range(quantidade)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_contadores_de_varias_threads():
+    registro = RegistroMetricas()
+
+    def somar():
+        for _ in range(10_000):
+            registro.contar("a")
+        registro.contar("b", 5)
+
+    _em_threads(somar)
+    registro.contar("a")
+    assert registro.contadores == {"a": 80_001, "b": 40}
+    # As threads encerradas foram consolidadas e não contam em dobro
+    assert registro.instantaneo()["contadores"] == {"a": 80_001, "b": 40}
+    assert len(registro._parciais) == 1
+
+
+def test_limpar_com_threads_ativas():
+    registro = RegistroMetricas()
+    registro.contar("a", 3)
+    _em_threads(lambda: registro.contar("a", 2), 2)
+    registro.limpar()
+    assert registro.contadores == {}
+    registro.contar("a")
+    _em_threads(lambda: registro.contar("c"), 3)
+    assert registro.contadores == {"a": 1, "c": 3}
+
+
+def test_contar_alimenta_a_requisicao():
+    with requisicao("teste") as registro:
+        contar("teste.eventos", 2)
+        contar("teste.eventos")
+    assert registro.contadores == {"teste.eventos": 3}
@@ -0,0 +1,74 @@
+"""Execução em lote: leitura da tabela e gravação dos resultados."""
+
+import csv
+import json
+
+from baunilha.lote import executar_lote
+
+CENARIOS = [
+    {"num_mudas": 4000, "anos": 8, "faturamento_objetivo": 3e6},
+    {
+        "num_mudas": 4000,
+        "anos": 8,
+        "faturamento_objetivo": 3e6,
+        "taxa_crescimento_maxima": 2.5,
+    },
+    # Dois anos não faturam: mudas mínimas infinitas
+    {"num_mudas": 4000, "anos": 2, "faturamento_objetivo": 1e6},
+    {"num_mudas": 250, "anos": 15, "sistema": "Monocultivo"},
+]
+
+
+def _tabela(caminho, cenarios):
+    colunas = [
+        "num_mudas",
+        "anos",
+        "sistema",
+        "usar_modelo_linear",
+        "faturamento_objetivo",
+        "taxa_crescimento_maxima",
+        "taxa_desconto",
+    ]
+    with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+        escritor = csv.DictWriter(arquivo, fieldnames=colunas)
+        escritor.writeheader()
+        escritor.writerows(cenarios)
+    return str(caminho)
+
+
+def _jsonl(caminho):
+    with open(caminho, encoding="utf-8") as arquivo:
+        return [json.loads(linha) for linha in arquivo]
+
+
+def test_jsonl_sem_valores_nao_finitos(tmp_path):
+    saida = str(tmp_path / "resultados.jsonl")
+    executar_lote(_tabela(tmp_path / "cenarios.csv", CENARIOS), saida, processos=1)
+    with open(saida, encoding="utf-8") as arquivo:
+        texto = arquivo.read()
+    assert "Infinity" not in texto and "NaN" not in texto
+    assert _jsonl(saida)[2]["mudas_minimas"] is None
+
+
+def test_taxa_crescimento_maxima_da_tabela(tmp_path):
+    saida = str(tmp_path / "resultados.jsonl")
+    executar_lote(_tabela(tmp_path / "cenarios.csv", CENARIOS), saida, processos=1)
+    padrao, acelerado, *_ = _jsonl(saida)
+    assert padrao["taxa_crescimento_maxima"] == 1.5
+    assert not padrao["plano_possivel"]
+    assert acelerado["taxa_crescimento_maxima"] == 2.5
+    assert acelerado["plano_possivel"]
+    assert acelerado["faturamento_maximo"] > padrao["faturamento_maximo"]
+    assert 1.5 < acelerado["taxa_crescimento"] <= 2.5
+
+
+def test_processos_paralelos_igual_sequencial(tmp_path):
+    entrada = _tabela(tmp_path / "cenarios.csv", CENARIOS * 5)
+    sequencial = str(tmp_path / "sequencial.jsonl")
+    paralelo = str(tmp_path / "paralelo.jsonl")
+    executar_lote(entrada, sequencial, processos=1)
+    resumo = executar_lote(entrada, paralelo, processos=2, tamanho_bloco=3)
+    assert resumo["linhas"] == len(CENARIOS) * 5
+    resultados = _jsonl(paralelo)
+    assert [resultado["linha"] for resultado in resultados] == list(range(20))
+    assert resultados == _jsonl(sequencial)
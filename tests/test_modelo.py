@@ -0,0 +1,50 @@
+"""Modelo e projeção cumulativa comparados com a implementação original."""
+
+import numpy as np
+import pytest
+
+import baunilha
+from benchmarks import referencia
+
+# Idades 1 e 2 (modelo linear), 6 (corte de favas), 7 e 50 (patamar)
+IDADES = [1, 2, 3, 4, 5, 6, 7, 8, 50]
+MUDAS = [1, 2.5, 3999, 4000, 123456.789]
+# Horizontes vazios e negativos entram como no laço original: nenhum ano
+HORIZONTES = [-3, 0, 1, 2, 3, 6, 7, 15, 40, 60]
+
+
+@pytest.mark.parametrize("linear", [False, True])
+@pytest.mark.parametrize("ano", IDADES)
+@pytest.mark.parametrize("num_mudas", MUDAS)
+def test_produtividade_igual_a_referencia(num_mudas, ano, linear):
+    esperado = referencia.calcular_produtividade_baunilha(num_mudas, ano, linear)
+    escalar = baunilha.calcular_produtividade_baunilha(num_mudas, ano, linear)
+    vetorizado = baunilha.calcular_produtividade_baunilha_vetorizado(
+        num_mudas, np.array([ano]), linear
+    )
+    for chave, valor in esperado.items():
+        assert escalar[chave] == pytest.approx(valor, rel=1e-12)
+        assert vetorizado[chave][0] == pytest.approx(valor, rel=1e-12)
+
+
+@pytest.mark.parametrize("linear", [False, True])
+@pytest.mark.parametrize("anos", HORIZONTES)
+@pytest.mark.parametrize("num_mudas", [1, 2.5, 4000])
+def test_cumulativo_igual_a_referencia(num_mudas, anos, linear):
+    cumulativos, anuais = baunilha.calcular_cumulativo(num_mudas, anos, linear)
+    esperado, esperado_anuais = referencia.calcular_cumulativo(num_mudas, anos, linear)
+
+    assert cumulativos.keys() == esperado.keys()
+    for coluna, valor in esperado.items():
+        assert cumulativos[coluna] == pytest.approx(valor, rel=1e-12, abs=1e-9)
+    assert len(anuais["Ano"]) == len(esperado_anuais)
+    for coluna in esperado_anuais[0] if esperado_anuais else ():
+        valores = [linha[coluna] for linha in esperado_anuais]
+        np.testing.assert_allclose(anuais[coluna], valores, rtol=1e-12, atol=1e-9)
+
+
+def test_cumulativo_sem_anos_desconta_so_as_mudas():
+    cumulativos, anuais = baunilha.calcular_cumulativo(4000, 0)
+    assert cumulativos["Faturamento Bruto (US$)"] == 0
+    assert cumulativos["Faturamento Líquido (US$)"] == -4000 * baunilha.CUSTO_POR_MUDA
+    assert all(len(valores) == 0 for valores in anuais.values())
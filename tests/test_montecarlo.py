@@ -0,0 +1,53 @@
+"""Monte Carlo: a mesma semente dá os mesmos sorteios em qualquer divisão."""
+
+import numpy as np
+import pytest
+
+from baunilha.montecarlo import (
+    SORTEIOS_POR_GERADOR,
+    simular_cumulativo,
+    simular_plano,
+)
+
+SORTEIOS = 2 * SORTEIOS_POR_GERADOR + 1000
+
+
+def _iguais(a, b):
+    assert list(a) == list(b)
+    for chave in a:
+        np.testing.assert_array_equal(a[chave], b[chave])
+
+
+@pytest.mark.parametrize(
+    "simular, argumentos",
+    [(simular_cumulativo, (4000, 10)), (simular_plano, (1000, 1.3, 8))],
+)
+@pytest.mark.parametrize(
+    "tamanho_bloco, processos", [(1000, 1), (SORTEIOS_POR_GERADOR + 7, 1), (9999, 2)]
+)
+def test_mesma_semente_independe_dos_blocos(
+    simular, argumentos, tamanho_bloco, processos
+):
+    referencia = simular(*argumentos, sorteios=SORTEIOS, semente=3)
+    _iguais(
+        simular(
+            *argumentos,
+            sorteios=SORTEIOS,
+            semente=3,
+            processos=processos,
+            tamanho_bloco=tamanho_bloco,
+        ),
+        referencia,
+    )
+
+
+def test_menos_sorteios_sao_o_inicio_da_sequencia():
+    completo = simular_cumulativo(4000, 10, sorteios=SORTEIOS, semente=5)
+    parcial = simular_cumulativo(4000, 10, sorteios=500, semente=5)
+    _iguais(parcial, {chave: valores[:500] for chave, valores in completo.items()})
+
+
+def test_sementes_diferentes_dao_sorteios_diferentes():
+    a = simular_cumulativo(4000, 10, sorteios=100, semente=1)
+    b = simular_cumulativo(4000, 10, sorteios=100, semente=2)
+    assert not np.array_equal(a["faturamento_bruto"], b["faturamento_bruto"])
@@ -0,0 +1,82 @@
+"""Cronogramas de menor custo e fronteira de Pareto."""
+
+import numpy as np
+import pytest
+
+from baunilha.modelo import CULTURA_PADRAO, calcular_area_necessaria
+from baunilha.otimizador import (
+    explorar_fronteira,
+    fronteira_pareto,
+    otimizar_cronograma,
+    pesos_cronograma,
+)
+
+
+def _nao_dominados(pontos):
+    return np.array(
+        [
+            not np.any(np.all(pontos <= ponto, axis=1) & np.any(pontos < ponto, axis=1))
+            for ponto in pontos
+        ]
+    )
+
+
+def test_fronteira_pareto_contra_forca_bruta():
+    gerador = np.random.default_rng(3)
+    custo, faturamento, area = gerador.random((3, 300))
+    mascara = fronteira_pareto(custo, faturamento, area)
+    esperado = _nao_dominados(np.column_stack([custo, -faturamento, area]))
+    np.testing.assert_array_equal(mascara, esperado)
+    # Três objetivos independentes: muitos pontos em compromisso
+    assert mascara.sum() > 10
+
+
+def test_troca_entre_custo_e_faturamento():
+    # Com limite por ano, cada dólar a mais vai para um ano mais tardio, que
+    # fatura menos por muda: a fronteira tem retornos decrescentes
+    fronteira = explorar_fronteira(
+        10, np.linspace(0, 1e6, 41)[1:], mudas_maximas_por_ano=2000
+    )
+    custo, faturamento = fronteira["custo"], fronteira["faturamento"]
+    assert len(custo) >= 5
+    assert np.all(np.diff(custo) > 0) and np.all(np.diff(faturamento) > 0)
+    inclinacoes = np.diff(faturamento) / np.diff(custo)
+    assert np.all(np.diff(inclinacoes) <= 1e-9 * inclinacoes[0])
+    assert inclinacoes[-1] < inclinacoes[0] / 2
+    # O último ponto é o máximo com o plantio limitado
+    assert faturamento[-1] == pytest.approx(pesos_cronograma(10) @ np.full(10, 2000))
+
+
+def test_area_so_separa_os_sistemas():
+    # Custo e área são proporcionais ao total de mudas em cada sistema: dentro
+    # dele a área não cria compromisso, e o sistema mais denso domina o outro
+    alvos = np.linspace(0, 1e6, 11)[1:]
+    fronteira = explorar_fronteira(10, alvos, mudas_maximas_por_ano=2000)
+    assert set(fronteira["sistema"]) == {"Semi-intensivo"}
+    area_por_dolar = calcular_area_necessaria(1, "Semi-intensivo") / (
+        CULTURA_PADRAO.custo_por_muda
+    )
+    np.testing.assert_allclose(fronteira["area"], fronteira["custo"] * area_por_dolar)
+
+    saf = explorar_fronteira(10, alvos, mudas_maximas_por_ano=2000, sistemas=["SAF"])
+    np.testing.assert_allclose(saf["custo"], fronteira["custo"])
+    assert np.all(saf["area"] > fronteira["area"])
+
+
+def test_cronograma_com_limites():
+    pesos = pesos_cronograma(10)
+    livre = otimizar_cronograma(1e6, 10)
+    assert livre["possivel"] and np.count_nonzero(livre["cronograma"]) == 1
+
+    limitado = otimizar_cronograma(1e6, 10, mudas_maximas_por_ano=5000)
+    assert limitado["possivel"]
+    assert limitado["faturamento"] == pytest.approx(1e6)
+    assert np.all(limitado["cronograma"] <= 5000)
+    assert np.count_nonzero(limitado["cronograma"]) > 1
+    assert limitado["custo"] > livre["custo"]
+    np.testing.assert_allclose(limitado["cronograma"] @ pesos, 1e6)
+
+    orcamento = otimizar_cronograma(1e6, 10, orcamento_custo=5000)
+    assert not orcamento["possivel"]
+    assert orcamento["custo"] == pytest.approx(5000)
+    assert orcamento["faturamento"] < 1e6
@@ -0,0 +1,87 @@
+"""Plano de ação comparado com a implementação original.
+
+A versão original busca a taxa por bisseção até um intervalo de 1e-4 e as
+mudas mínimas em passos de 10%, então esses campos têm tolerância própria.
+"""
+
+import pytest
+
+import baunilha
+from benchmarks import referencia
+
+VIAVEIS = [
+    (4000, 2e6, 10, 1.5),
+    (1000, 5e6, 15, 1.5),
+    (4000, 1e3, 6, 1.5),  # atingido sem crescimento: taxa 1
+    (300, 2e5, 12, 1.8),
+]
+INVIAVEIS = [
+    (4000, 1e6, 6, 1.5),
+    (100, 5e5, 10, 1.5),
+    (500, 1e7, 15, 1.5),
+    (250.5, 1e8, 16, 1.5),  # além de 15 anos: sem anos necessários
+]
+
+
+def _sem_estatisticas(info):
+    return {
+        chave: info[chave] for chave in info if chave not in ("iteracoes", "tempos")
+    }
+
+
+@pytest.mark.parametrize("num_mudas, objetivo, anos, taxa_maxima", VIAVEIS)
+def test_plano_viavel(num_mudas, objetivo, anos, taxa_maxima):
+    plano, detalhado, taxa, info = baunilha.calcular_plano_acao(
+        num_mudas, objetivo, anos, taxa_maxima
+    )
+    esperado, esperado_detalhado, taxa_esperada, _ = referencia.calcular_plano_acao(
+        num_mudas, objetivo, anos, taxa_maxima
+    )
+    assert info["possivel"]
+    assert taxa == pytest.approx(taxa_esperada, abs=1e-4)
+    assert len(plano) == len(esperado)
+    assert len(detalhado) == len(esperado_detalhado)
+    assert plano["Faturamento Acumulado (US$)"].iloc[-1] == pytest.approx(
+        esperado[-1]["Faturamento Acumulado (US$)"], rel=2e-3
+    )
+
+
+@pytest.mark.parametrize("num_mudas, objetivo, anos, taxa_maxima", INVIAVEIS)
+def test_plano_inviavel(num_mudas, objetivo, anos, taxa_maxima):
+    plano, _, taxa, info = baunilha.calcular_plano_acao(
+        num_mudas, objetivo, anos, taxa_maxima
+    )
+    _, _, _, esperado = referencia.calcular_plano_acao(
+        num_mudas, objetivo, anos, taxa_maxima
+    )
+    assert plano is None and taxa is None
+    info = _sem_estatisticas(info)
+    assert info.keys() == esperado.keys()
+    assert not info["possivel"]
+    assert info["faturamento_maximo"] == pytest.approx(
+        esperado["faturamento_maximo"], rel=1e-12
+    )
+    assert info["anos_necessarios"] == esperado["anos_necessarios"]
+    # A original só passa do valor exato, e por menos de um passo de 10%
+    assert info["mudas_minimas"] <= esperado["mudas_minimas"] * (1 + 1e-12)
+    assert esperado["mudas_minimas"] <= 1.1 * info["mudas_minimas"] * (1 + 1e-12)
+
+
+@pytest.mark.parametrize("anos", [-2, 0, 1, 2])
+def test_plano_sem_faturamento(anos):
+    # Até o segundo ano não há colheita: a original nem termina (as mudas
+    # mínimas crescem para sempre), então os valores são fixados aqui
+    plano, _, _, info = baunilha.calcular_plano_acao(4000, 1e4, anos)
+    assert plano is None
+    assert info["faturamento_maximo"] == 0
+    assert info["mudas_minimas"] == float("inf")
+    assert info["anos_necessarios"] == 3
+
+
+@pytest.mark.parametrize("anos", [-2, 0])
+def test_plano_sem_anos_com_objetivo_zero(anos):
+    plano, detalhado, taxa, info = baunilha.calcular_plano_acao(4000, 0, anos)
+    _, _, taxa_esperada, _ = referencia.calcular_plano_acao(4000, 0, anos)
+    assert info["possivel"]
+    assert taxa == pytest.approx(taxa_esperada, abs=1e-4)
+    assert len(plano) == len(detalhado) == 0
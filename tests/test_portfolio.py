@@ -0,0 +1,31 @@
+"""Carteira de talhões: horizontes vazios e coerência com a projeção."""
+
+import numpy as np
+import pytest
+
+from baunilha.modelo import calcular_area_necessaria, calcular_cumulativo
+from baunilha.portfolio import calcular_portfolio
+
+
+@pytest.mark.parametrize("anos", [0, -3])
+def test_horizonte_vazio(anos):
+    totais, linha_do_tempo = calcular_portfolio(
+        [4000, 2000], [2020, 2022], ["SAF", "Semi-intensivo"], anos
+    )
+    assert totais["Área Ocupada (ha)"] == 0.0
+    assert totais["Faturamento Bruto (US$)"] == 0.0
+    assert all(len(valores) == 0 for valores in linha_do_tempo.values())
+
+
+def test_um_talhao_igual_a_projecao():
+    totais, linha_do_tempo = calcular_portfolio([4000], [2020], "SAF", 8)
+    cumulativos, anuais = calcular_cumulativo(4000, 8)
+    np.testing.assert_allclose(
+        linha_do_tempo["Produção Total (kg)"], anuais["Produção Total (kg)"]
+    )
+    assert totais["Faturamento Bruto (US$)"] == pytest.approx(
+        cumulativos["Faturamento Bruto (US$)"]
+    )
+    assert totais["Área Ocupada (ha)"] == pytest.approx(
+        calcular_area_necessaria(4000, "SAF")
+    )
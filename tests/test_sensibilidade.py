@@ -0,0 +1,76 @@
+"""Superfície de resposta e tornado de sensibilidade."""
+
+import os
+import tomllib
+
+import numpy as np
+import pytest
+
+import baunilha
+from baunilha.cultura import compilar_perfil
+from baunilha.sensibilidade import (
+    VARIACOES_PADRAO,
+    SuperficieResposta,
+    analise_sensibilidade,
+    calcular_superficie,
+)
+
+PERFIL = os.path.join(os.path.dirname(baunilha.__file__), "perfis", "baunilha.toml")
+
+
+def _perfil(**alteracoes):
+    with open(PERFIL, "rb") as arquivo:
+        return compilar_perfil({**tomllib.load(arquivo), **alteracoes})
+
+
+def _comparar_tornados(esperado, obtido):
+    # Constantes lineares empatam na amplitude: a ordem entre elas é livre
+    obtido = {linha["parametro"]: linha for linha in obtido}
+    assert obtido.keys() == {linha["parametro"] for linha in esperado}
+    for linha in esperado:
+        assert obtido[linha["parametro"]] == pytest.approx(linha, rel=1e-9)
+
+
+@pytest.mark.parametrize("cultura", [None, _perfil(preco_extrato_por_tonelada=9e4)])
+@pytest.mark.parametrize("variacao", [0.01, 0.1, 0.37, 0.5])
+@pytest.mark.parametrize(
+    "anos, linear", [(1, True), (3, False), (6, True), (15, False)]
+)
+def test_tornado_da_superficie(cultura, variacao, anos, linear):
+    superficie = calcular_superficie([1.0], anos_maximo=15, cultura=cultura)
+    for num_mudas in (1, 4000, 123456.7):
+        _comparar_tornados(
+            analise_sensibilidade(num_mudas, anos, linear, variacao, cultura=cultura),
+            superficie.tornado(num_mudas, anos, linear, variacao),
+        )
+
+
+def test_cultura_muda_a_superficie():
+    padrao = calcular_superficie([4000.0], 6)
+    barata = calcular_superficie([4000.0], 6, _perfil(preco_extrato_por_tonelada=9e4))
+    assert barata.consultar(4000, 6)["faturamento_bruto"] == pytest.approx(
+        padrao.consultar(4000, 6)["faturamento_bruto"] * 9e4 / 135435.20
+    )
+    assert (
+        barata.tornado(4000, 6)[0]["resultado_base"]
+        < padrao.tornado(4000, 6)[0]["resultado_base"]
+    )
+
+
+def test_tornado_fora_da_grade():
+    superficie = calcular_superficie([1.0], anos_maximo=10)
+    with pytest.raises(ValueError):
+        superficie.tornado(4000, 11)
+    with pytest.raises(ValueError):
+        superficie.tornado(4000, 6, variacao=VARIACOES_PADRAO[-1] * 2)
+
+
+def test_salvar_e_carregar(tmp_path):
+    superficie = calcular_superficie(np.linspace(1, 1e5, 5), anos_maximo=8)
+    caminho = str(tmp_path / "superficie.npz")
+    superficie.salvar(caminho)
+    carregada = SuperficieResposta.carregar(caminho)
+    assert carregada.consultar(2500, 7, True) == superficie.consultar(2500, 7, True)
+    assert carregada.tornado(2500, 7, True, 0.2) == superficie.tornado(
+        2500, 7, True, 0.2
+    )
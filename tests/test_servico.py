@@ -0,0 +1,154 @@
+"""Validação de entrada e serialização do serviço HTTP, sem abrir portas."""
+
+import asyncio
+import json
+
+import pytest
+
+from baunilha import servico
+
+
+def _responder(rota, dados):
+    return asyncio.run(
+        servico.ServicoBaunilha(processos=1)._responder(
+            "POST", rota, json.dumps(dados).encode()
+        )
+    )
+
+
+def _ler(bruto):
+    async def ler():
+        leitor = asyncio.StreamReader()
+        leitor.feed_data(bruto)
+        leitor.feed_eof()
+        return await servico._ler_requisicao(leitor)
+
+    return asyncio.run(ler())
+
+
+@pytest.mark.parametrize("anos", [0, -3, servico.ANOS_MAXIMO + 1, 10**9])
+@pytest.mark.parametrize(
+    "rota, dados",
+    [
+        ("/cumulativo", {"num_mudas": 4000}),
+        ("/plano", {"num_mudas": 4000, "faturamento_objetivo": 1e4}),
+        ("/lote", None),
+    ],
+)
+def test_anos_fora_do_intervalo(rota, dados, anos):
+    if dados is None:
+        dados = {"cenarios": [{"num_mudas": 4000, "anos": anos}]}
+    else:
+        dados = {**dados, "anos": anos}
+    with pytest.raises(servico.ErroRequisicao) as erro:
+        _responder(rota, dados)
+    assert erro.value.status == 400
+
+
+@pytest.mark.parametrize("anos", [1, servico.ANOS_MAXIMO])
+def test_anos_nos_limites(anos):
+    status, _, corpo = _responder("/cumulativo", {"num_mudas": 4000, "anos": anos})
+    assert status == 200
+    assert len(json.loads(corpo)["anuais"]["Ano"]) == anos
+
+
+def test_numero_nao_finito():
+    with pytest.raises(servico.ErroRequisicao) as erro:
+        _responder("/cumulativo", {"num_mudas": float("nan"), "anos": 6})
+    assert erro.value.status == 400
+
+
+def test_json_troca_nao_finitos_por_null():
+    dados = {"a": float("inf"), "b": [1.5, float("nan")], "c": {"d": -float("inf")}}
+    assert json.loads(servico._json(dados)) == {
+        "a": None,
+        "b": [1.5, None],
+        "c": {"d": None},
+    }
+
+
+@pytest.mark.parametrize("tamanho", ["abc", "-5", "1.5"])
+def test_content_length_invalido(tamanho):
+    with pytest.raises(servico.ErroRequisicao) as erro:
+        _ler(f"POST /plano HTTP/1.1\r\nContent-Length: {tamanho}\r\n\r\n".encode())
+    assert erro.value.status == 400
+
+
+def test_content_length_valido():
+    requisicao = _ler(b"POST /area HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}")
+    assert requisicao == ("POST", "/area", True, b"{}")
+
+
+@pytest.mark.parametrize("linear", ["false", "true", 0, 1, None])
+def test_usar_modelo_linear_so_aceita_booleanos(linear):
+    with pytest.raises(servico.ErroRequisicao) as erro:
+        _responder(
+            "/cumulativo", {"num_mudas": 4000, "anos": 6, "usar_modelo_linear": linear}
+        )
+    assert erro.value.status == 400
+
+
+@pytest.mark.parametrize(
+    "rota, dados",
+    [
+        ("/cumulativo", {"num_mudas": 4000, "anos": 6.5}),
+        ("/cumulativo", {"num_mudas": 4000, "anos": True}),
+        ("/cumulativo", {"num_mudas": -1, "anos": 6}),
+        ("/area", {"num_mudas": -4000}),
+        ("/plano", {"num_mudas": -1, "faturamento_objetivo": 1e4, "anos": 6}),
+        ("/plano", {"num_mudas": 4000, "faturamento_objetivo": -1e4, "anos": 6}),
+        (
+            "/plano",
+            {
+                "num_mudas": 4000,
+                "faturamento_objetivo": 1e4,
+                "anos": 6,
+                "taxa_crescimento_maxima": 0.9,
+            },
+        ),
+    ],
+)
+def test_valores_fora_do_dominio(rota, dados):
+    with pytest.raises(servico.ErroRequisicao) as erro:
+        _responder(rota, dados)
+    assert erro.value.status == 400
+
+
+def test_anos_inteiro_em_ponto_flutuante():
+    status, _, corpo = _responder("/cumulativo", {"num_mudas": 4000, "anos": 6.0})
+    assert status == 200
+    assert len(json.loads(corpo)["anuais"]["Ano"]) == 6
+
+
+@pytest.mark.parametrize(
+    "invalido",
+    [
+        {"faturamento_objetivo": "muito"},
+        {"faturamento_objetivo": 1e4, "taxa_crescimento_maxima": 0.5},
+        {"sistema": "Hidroponia"},
+        {"usar_modelo_linear": "false"},
+        {"num_mudas": -5},
+    ],
+)
+def test_lote_valida_todos_os_campos(invalido):
+    cenarios = [
+        {"num_mudas": 4000, "anos": 6},
+        {"num_mudas": 4000, "anos": 6, **invalido},
+    ]
+    with pytest.raises(servico.ErroRequisicao) as erro:
+        _responder("/lote", {"cenarios": cenarios})
+    assert erro.value.status == 400
+    assert erro.value.mensagem.startswith("cenarios[1]:")
+
+
+def test_lote_valido():
+    cenarios = [
+        {"num_mudas": 4000, "anos": 6},
+        {"num_mudas": 4000, "anos": 6, "faturamento_objetivo": 1e4},
+    ]
+    status, _, corpo = _responder("/lote", {"cenarios": cenarios})
+    assert status == 200
+    primeiro, segundo = json.loads(corpo)
+    assert primeiro["cenario"]["sistema"] == "SAF"
+    assert "plano_acao" not in primeiro
+    assert segundo["plano_acao"]["info"]["possivel"]
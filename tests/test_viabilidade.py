@@ -0,0 +1,74 @@
+"""Tabela de viabilidade: geração em paralelo e uso no plano de ação."""
+
+import json
+
+import numpy as np
+import pytest
+
+import baunilha
+from baunilha.viabilidade import gerar_tabela_viabilidade
+
+from .test_plano import INVIAVEIS, VIAVEIS, _sem_estatisticas
+
+TAXAS = np.linspace(1.0, 2.0, 21)
+
+
+@pytest.fixture(scope="module")
+def caminho_tabela(tmp_path_factory):
+    caminho = str(tmp_path_factory.mktemp("viabilidade") / "viabilidade.npy")
+    gerar_tabela_viabilidade(caminho, TAXAS, anos_maximo=20, processos=1)
+    return caminho
+
+
+def test_pool_igual_ao_processo_atual(caminho_tabela, tmp_path):
+    em_pool = gerar_tabela_viabilidade(
+        str(tmp_path / "pool.npy"), TAXAS, 20, processos=2, tamanho_bloco=4
+    )
+    sequencial = baunilha.viabilidade.carregar_tabela(caminho_tabela)
+    np.testing.assert_array_equal(em_pool.valores, sequencial.valores)
+
+
+@pytest.mark.parametrize("caso", INVIAVEIS)
+def test_plano_inviavel_pela_tabela(caminho_tabela, caso):
+    *_, info_solver = baunilha.calcular_plano_acao(*caso)
+    plano, _, taxa, info = baunilha.calcular_plano_acao(
+        *caso, tabela_viabilidade=caminho_tabela
+    )
+    assert plano is None and taxa is None
+    assert "tabela_viabilidade" in info["tempos"]
+    esperado = _sem_estatisticas(info_solver)
+    assert _sem_estatisticas(info) == pytest.approx(esperado, rel=1e-9)
+
+
+@pytest.mark.parametrize("caso", VIAVEIS)
+def test_plano_viavel_segue_no_solver(caminho_tabela, caso):
+    _, _, taxa_solver, _ = baunilha.calcular_plano_acao(*caso)
+    _, _, taxa, info = baunilha.calcular_plano_acao(
+        *caso, tabela_viabilidade=caminho_tabela
+    )
+    assert info["possivel"] and taxa == taxa_solver
+
+
+def test_fora_da_grade_usa_o_solver(caminho_tabela):
+    # Horizonte além da tabela e taxa acima da grade
+    for caso in [(100, 1e9, 25, 1.5), (100, 1e9, 10, 2.5)]:
+        *_, info = baunilha.calcular_plano_acao(
+            *caso, tabela_viabilidade=caminho_tabela
+        )
+        assert not info["possivel"] and "tabela_viabilidade" not in info["tempos"]
+
+
+def test_servico_carrega_a_tabela(caminho_tabela, monkeypatch):
+    from baunilha import servico
+
+    monkeypatch.delenv("BAUNILHA_VIABILIDADE", raising=False)
+    assert servico._carregar_tabela_viabilidade() is None
+    monkeypatch.setenv("BAUNILHA_VIABILIDADE", caminho_tabela + ".inexistente")
+    assert servico._carregar_tabela_viabilidade() is None
+
+    monkeypatch.setenv("BAUNILHA_VIABILIDADE", caminho_tabela)
+    tabela = servico._carregar_tabela_viabilidade()
+    assert tabela is baunilha.viabilidade.carregar_tabela(caminho_tabela)
+    monkeypatch.setattr(servico, "TABELA_VIABILIDADE", tabela)
+    resposta = json.loads(servico._plano_json(*INVIAVEIS[0]))
+    assert "tabela_viabilidade" in resposta["info"]["tempos"]